@@ -80,7 +80,7 @@ setproctitle(sys.argv[0])
 ## Set global variables
 global i_size, o_size, r_curve, g_curve, b_curve, clip_result, reset, panicgate, reset_on_error
 global periodically, wait_period, fadein_time, fadeout_time, fadein_steps, fadeout_steps
-global monitor_controller, running, continuous_run, panic, _globals_, conf_storage, parser
+global monitor_controller, running, continuous_run, panic, _globals_, conf_storage, parser, change_threshold
 global signal_SIGTERM, signal_SIGUSR1, signal_SIGUSR2, DATADIR, LIBEXECDIR
 
 
@@ -149,6 +149,16 @@ wait_period = 60
 :float  The number of seconds to wait before invoking `periodically` again
 '''
 
+change_threshold = None
+'''
+:float?  If not `None`, ramps applied by `periodically`, outside fading, either with
+         `set_gamma` or with the CRTC:s of the `output` module, are not applied to a CRTC
+         if they differ imperceptibly from the ramps last applied to it, that is, if no
+         sampled stop has changed by this much, measured in ∆E*_ab; a value of about 1
+         is just noticeable. When this is set, the number of times ramps have been
+         applied and skipped is printed when Blueshift exits, see `output.change_threshold`
+'''
+
 ttymode = not (('DISPLAY' in os.environ) and (':' in os.environ['DISPLAY']))
 '''
 :bool  Whether blueshift is running in a TTY, determined by the DISPLAY environment variable
@@ -345,6 +355,7 @@ def continuous_run():
     '''
     global running, wait_period, fadein_time, fadeout_time, reset_on_error
     global fadein_steps, fadeout_steps, trans_delta, p, sleep, panic
+    import output
     
     def p(t, fade = None):
         '''
@@ -356,11 +367,15 @@ def continuous_run():
         try:
             # Extract the current weekday,
             wd = t.isocalendar()[2]
+            # skip imperceptible changes, unless fading,
+            output.change_threshold = change_threshold if fade is None else None
             # and invoke the function used to refresh adjustments.
             periodically(t.year, t.month, t.day, t.hour, t.minute, t.second, wd, fade)
         except KeyboardInterrupt:
             # Emulate `kill -TERM` on Control+c
             signal_SIGTERM(0, None)
+        finally:
+            output.change_threshold = None
     def sleep(seconds):
         '''
         Delay execution for a given number of seconds,
@@ -541,6 +556,10 @@ def continuous_run():
         ## Mark that we ant to reset the colour curves
         reset_on_error = True
     finally:
+        ## Report skipped imperceptible changes
+        if change_threshold:
+            print('%s: curves applied %i times, skipped %i times because of change_threshold' %
+                  (sys.argv[0], output.applied_count, output.skipped_count), file = sys.stderr)
         ## Reset when done, or on error if not stated otherwise
         if reset_on_error:
             reset()
@@ -18,9 +18,11 @@
 # This module contains the implementions of the policies for ad-hoc mode.
 
 import sys
+import math
 import time
 import signal
 import datetime
+from collections import OrderedDict
 
 
 ## Warn if we are using configuration script arguments
@@ -104,6 +106,49 @@ monitor_controller = lambda : (drm if ttymode else randr)(*output_)
 # Interpolation between day and night and between pure and adjusted
 interpol_ = lambda d, p, a, r : d * r + (p[0] * a + p[1] * (1 - a)) * (1 - r)
 
+# White points calculated by `whitepoint_`, or in advance by `plan_whitepoints`,
+# by temperature quantised to `whitepoints_quantum` kelvins, in order of last use
+whitepoints = OrderedDict()
+whitepoints_quantum = 1
+whitepoints_capacity = 256
+
+def whitepoint_(temperature, whitepoint = None):
+    '''
+    Get the white point of a temperature, quantised so that it can be reused
+    
+    @param   temperature:float                    The temperature, it is quantised
+    @param   whitepoint:(float, float, float)?    The white point of the quantised temperature
+                                                  to remember, `None` to look it up or calculate it
+    @return  :(float, float, float)               The white point of the quantised temperature
+    '''
+    key = int(math.floor(temperature / whitepoints_quantum + 0.5))
+    if (whitepoint is None) and (key in whitepoints):
+        whitepoints.move_to_end(key)
+        return whitepoints[key]
+    if whitepoint is None:
+        whitepoint = clip_whitepoint(divide_by_maximum(cmf_10deg(key * whitepoints_quantum)))
+    whitepoints[key] = whitepoint
+    while len(whitepoints) > whitepoints_capacity:
+        whitepoints.popitem(last = False)
+    return whitepoint
+
+def plan_whitepoints(dayness, purenesses):
+    '''
+    Calculate, in one bulk call, the white points that `apply` will need
+    
+    @param  dayness:float           The visibility of the sun
+    @param  purenesses:list<float>  The transitioning progresses `apply` will be invoked with
+    '''
+    temperatures = set()
+    for pureness in purenesses:
+        for p in (rgb_temperatures, cie_temperatures):
+            for i in range(len(p[0])):
+                t = interpol_(6500, [p[0][i], p[1][i]], dayness, pureness)
+                temperatures.add(int(math.floor(t / whitepoints_quantum + 0.5)) * whitepoints_quantum)
+    temperatures = list(temperatures)
+    for t, whitepoint in zip(temperatures, clip_whitepoint_many(divide_by_maximum_many(cmf_10deg_many(temperatures)))):
+        whitepoint_(t, whitepoint)
+
 def apply(dayness, pureness):
     '''
     Apply adjustments
@@ -116,7 +161,7 @@ def apply(dayness, pureness):
     # Interpolation between day and night and between pure and adjusted
     interpol = lambda d, p : [interpol_(d, [p[0][i], p[1][i]], dayness, pureness) for i in range(len(p[0]))]
     # Apply temperature adjustment
-    temperature_algorithm = lambda t : clip_whitepoint(divide_by_maximum(cmf_10deg(t)))
+    temperature_algorithm = whitepoint_
     rgb_temperature(*interpol(6500, rgb_temperatures), algorithm = temperature_algorithm)
     cie_temperature(*interpol(6500, cie_temperatures), algorithm = temperature_algorithm)
     # Apply white point brightness adjustment
@@ -156,6 +201,12 @@ else:
     if not panicgate:
         ## Fade in to settings
         signal.signal(signal.SIGTERM, signal_SIGTERM)
+        # Calculate the white points of all steps at once
+        purenesses, trans = [], 0
+        while trans < 1:
+            purenesses.append(trans if doreset else 1 - trans)
+            trans += 0.05
+        plan_whitepoints(alpha(), purenesses + [1 if doreset else 0])
         trans = 0
         while running and (trans < 1):
             try:
@@ -17,6 +17,9 @@
 
 # This module contains auxiliary functions.
 
+import math
+from collections import OrderedDict
+
 from curve import *
 
 
@@ -86,3 +89,41 @@ def restore(rgb):
     '''
     (r_curve[:], g_curve[:], b_curve[:]) = rgb
 
+
+
+def plan(adjust, quantum = 1 / 1024, capacity = 64):
+    '''
+    Compile an adjustment chain into a memoised plan
+    
+    The curves that the chain produces are kept in a bounded least-recently-used
+    cache keyed by the quantised parameters, so applying the plan again with
+    parameters that have been used recently only costs a dictionary lookup
+    
+    @param   adjust:(*?)→void    The adjustment chain, it is applied to identity curves, for
+                                 example `lambda dayness : gamma(1 + dayness / 4)`
+    @param   quantum:float?      The step with which float parameters are quantised, `None` to
+                                 use them as is. The chain is applied to the quantised values
+                                 so that the cached curves only depend on the key
+    @param   capacity:int        The maximum number of cached curves
+    @return  :(*?)→void          Function to invoke with the chain's parameters to replace the
+                                 current curves with the curves that the chain produces, it
+                                 has the method `clear()` that discards all cached curves
+    '''
+    cache = OrderedDict()
+    quantised = lambda p : (quantum is not None) and isinstance(p, float) and math.isfinite(p)
+    def apply(*parameters):
+        quanta = tuple(int(math.floor(p / quantum + 0.5)) if quantised(p) else p for p in parameters)
+        key = (len(r_curve), len(g_curve), len(b_curve)) + quanta
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            # Apply the chain to the quantised parameters
+            parameters = tuple(q * quantum if quantised(p) else p for p, q in zip(parameters, quanta))
+            start_over()
+            adjust(*parameters)
+            cache[key] = store()
+            while len(cache) > capacity:
+                cache.popitem(last = False)
+        restore(cache[key])
+    apply.clear = cache.clear
+    return apply
@@ -19,10 +19,19 @@
 # calculation of white points
 
 import os
+import sys
 import math
+import mmap
+import struct
 
 from colour import *
 
+have_numpy = True
+try:
+    import numpy
+except:
+    have_numpy = False
+
 
 
 DATADIR = 'res'
@@ -647,23 +656,297 @@ def redshift(temperature, old_version = False, linear_interpolation = False):
 
 
 
+def __temperatures(temperatures):
+    '''
+    Get the temperatures given to a `*_many` function
+    
+    @param   temperatures:itr<float>|ndarray  The temperatures
+    @return  :(list<float>|ndarray, bool)     The temperatures as a list, or as a NumPy
+                                              array, and whether they are a NumPy array
+    '''
+    if have_numpy and isinstance(temperatures, numpy.ndarray):
+        return (numpy.asarray(temperatures, dtype = numpy.float64), True)
+    return (list(temperatures), False)
+
+
+def __whitepoints(r, g, b, ndarray):
+    '''
+    Return the white points from a `*_many` function
+    
+    @param   r:list<float>|ndarray                  The red component of each white point
+    @param   g:list<float>|ndarray                  The green component of each white point
+    @param   b:list<float>|ndarray                  The blue component of each white point
+    @param   ndarray:bool                           Whether the components are NumPy arrays
+    @return  :list<(float, float, float)>|ndarray  The white points, as a N×3 array if `ndarray`
+    '''
+    return numpy.stack((r, g, b), axis = 1) if ndarray else list(zip(r, g, b))
+
+
+def series_d_many(temperatures):
+    '''
+    Calculate the colour for many blackbody temperatures, see `series_d`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins, must be inside [4000, 25000]
+    @return  :list<(float, float, float)>|ndarray  The red, green and blue components of the white points,
+                                                   as a N×3 array if `temperatures` is a NumPy array
+    '''
+    (temperatures, ndarray) = __temperatures(temperatures)
+    (low, high) = ((0.244063, 0.09911, 2.9678, -4.6070), (0.237040, 0.24748, 1.9018, -2.0064))
+    if ndarray:
+        # Calculate the x component with both sets of coefficients and select
+        x_low, x_high = numpy.zeros_like(temperatures), numpy.zeros_like(temperatures)
+        for d, (k_low, k_high) in enumerate(zip(low, high)):
+            scale = 10 ** (d * 3) / temperatures ** d
+            x_low += k_low * scale
+            x_high += k_high * scale
+        x = numpy.where(temperatures > 7000, x_high, x_low)
+        y = 2.870 * x - 3.000 * x ** 2 - 0.275
+        return __whitepoints(*ciexyy_to_srgb_many(x, y, numpy.ones_like(x)), True)
+    xs, ys = [], []
+    for temperature in temperatures:
+        x = 0
+        for d, k in enumerate(high if temperature > 7000 else low):
+            x += k * 10 ** (d * 3) / temperature ** d
+        xs.append(x)
+        ys.append(2.870 * x - 3.000 * x ** 2 - 0.275)
+    return __whitepoints(*ciexyy_to_srgb_many(xs, ys, [1.0] * len(xs)), False)
+
+
+def simple_whitepoint_many(temperatures):
+    '''
+    Calculate the colour for many blackbody temperatures, see `simple_whitepoint`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins
+    @return  :list<(float, float, float)>|ndarray  The red, green and blue components of the white points,
+                                                   as a N×3 array if `temperatures` is a NumPy array
+    '''
+    (temperatures, ndarray) = __temperatures(temperatures)
+    if not ndarray:
+        return [simple_whitepoint(t) for t in temperatures]
+    temp = temperatures / 100
+    with numpy.errstate(invalid = 'ignore', divide = 'ignore'):
+        hot = temp > 66
+        r = numpy.where(hot, 1.292936186 * (temp - 60) ** -0.1332047592, 1.0)
+        g = numpy.where(hot, 1.129890861 * (temp - 60) ** -0.0755148492, 0.390081579 * numpy.log(temp) - 0.631841444)
+        b = numpy.where(temp <= 19, 0.0, 0.543206789 * numpy.log(temp - 10) - 1.196254089)
+        b = numpy.where(temp < 66, b, 1.0)
+    return __whitepoints(*(numpy.clip(c, 0, 1) for c in (r, g, b)), True)
+
+
+def cmf_2deg_many(temperatures):
+    '''
+    Calculate the colour for many blackbody temperatures, see `cmf_2deg`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins, clipped to [1000, 40000]
+    @return  :list<(float, float, float)>|ndarray  The red, green and blue components of the white points,
+                                                   as a N×3 array if `temperatures` is a NumPy array
+    '''
+    global cmf_2deg_cache
+    if cmf_2deg_cache is None:
+        cmf_2deg_cache = get_blackbody_lut('2deg')
+    return cmf_xdeg_many(temperatures, cmf_2deg_cache)
+
+
+def cmf_10deg_many(temperatures):
+    '''
+    Calculate the colour for many blackbody temperatures, see `cmf_10deg`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins, clipped to [1000, 40000]
+    @return  :list<(float, float, float)>|ndarray  The red, green and blue components of the white points,
+                                                   as a N×3 array if `temperatures` is a NumPy array
+    '''
+    global cmf_10deg_cache
+    if cmf_10deg_cache is None:
+        cmf_10deg_cache = get_blackbody_lut('10deg')
+    return cmf_xdeg_many(temperatures, cmf_10deg_cache)
+
+
+def cmf_xdeg_many(temperatures, lut, temp_min = 1000, temp_max = 40000, temp_step = 100):
+    '''
+    Calculate the colour for many blackbody temperatures using raw
+    data in the CIE xyY colour space with interpolation, see `cmf_xdeg`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins
+    @param   lut:list<[x:float, y:float]>           Raw data lookup table
+    @param   temp_min:float                         The lowest temperature in the lookup table
+    @param   temp_max:float                         The highest temperature in the lookup table
+    @param   temp_step:float                        The interval between the temperatures
+    @return  :list<(float, float, float)>|ndarray  The whitepoints in [0, 1] sRGB, as a
+                                                   N×3 array if `temperatures` is a NumPy array
+    '''
+    (temperatures, ndarray) = __temperatures(temperatures)
+    if ndarray:
+        lut = numpy.asarray(lut, dtype = numpy.float64)
+        temp = numpy.clip(temperatures, temp_min, temp_max) - temp_min
+        floor = (temp // temp_step).astype(numpy.intp)
+        ceiling = numpy.minimum(floor + 1, len(lut) - 1)
+        weight = ((temp % temp_step) / temp_step)[:, None]
+        (x, y) = (lut[floor] * (1 - weight) + lut[ceiling] * weight).T
+        return __whitepoints(*ciexyy_to_srgb_many(x, y, numpy.ones_like(x)), True)
+    xs, ys = [], []
+    for temperature in temperatures:
+        temp = min(max(temp_min, temperature), temp_max) - temp_min
+        if temp % temp_step == 0:
+            (x, y) = lut[int(temp // temp_step)]
+        else:
+            (floor, ceiling) = (lut[int(temp // temp_step)], lut[int(temp // temp_step + 1)])
+            temp = (temp % temp_step) / temp_step
+            (x, y) = [c1 * (1 - temp) + c2 * temp for c1, c2 in zip(floor, ceiling)]
+        xs.append(x)
+        ys.append(y)
+    return __whitepoints(*ciexyy_to_srgb_many(xs, ys, [1.0] * len(xs)), False)
+
+
+def redshift_many(temperatures, old_version = False, linear_interpolation = False):
+    '''
+    Calculate the colour for many blackbody temperatures, see `redshift`
+    
+    @param   temperatures:itr<float>|ndarray        The blackbody temperatures in kelvins, clipped to [1000, 25100]
+    @param   old_version:bool                       Whether to the method used in redshift<=1.8, in which case
+                                                    `temperatures` are clipped to [1000, 10000]
+    @param   linear_interpolation:bool              Whether to interpolate one linear RGB instead of sRGB
+    @return  :list<(float, float, float)>|ndarray  The red, green and blue components of the white points,
+                                                   as a N×3 array if `temperatures` is a NumPy array
+    '''
+    (temperatures, ndarray) = __temperatures(temperatures)
+    if not ndarray:
+        return [tuple(redshift(t, old_version, linear_interpolation)) for t in temperatures]
+    if (redshift_old_cache if old_version else redshift_cache) is None:
+        redshift(1000, old_version)
+    lut = numpy.asarray(redshift_old_cache if old_version else redshift_cache, dtype = numpy.float64)
+    if linear_interpolation:
+        lut = numpy.stack(standard_to_linear_many(*lut.T), axis = 1)
+    temp = numpy.clip(temperatures, 1000, 10000 if old_version else 25100) - 1000
+    floor = (temp // 100).astype(numpy.intp)
+    ceiling = numpy.minimum(floor + 1, len(lut) - 1)
+    weight = ((temp % 100) / 100)[:, None]
+    rgb = lut[floor] * (1 - weight) + lut[ceiling] * weight
+    if linear_interpolation:
+        rgb = numpy.stack(linear_to_standard_many(*rgb.T), axis = 1)
+    return rgb
+
+
+def divide_by_maximum_many(rgbs):
+    '''
+    Divide all colour components of many colours by the value of
+    the most prominent colour component, see `divide_by_maximum`
+    
+    @param   rgbs:list<[float, float, float]>|ndarray  The colours
+    @return  :list<[float, float, float]>|ndarray      The colours divided by their maximum
+    '''
+    if have_numpy and isinstance(rgbs, numpy.ndarray):
+        m = numpy.abs(rgbs).max(axis = 1, keepdims = True)
+        return rgbs / numpy.where(m == 0, 1, m)
+    return [divide_by_maximum(rgb) for rgb in rgbs]
+
+
+def clip_whitepoint_many(rgbs):
+    '''
+    Clip all colour components of many colours to fit inside [0, 1], see `clip_whitepoint`
+    
+    @param   rgbs:list<[float, float, float]>|ndarray  The colours
+    @return  :list<[float, float, float]>|ndarray      The colours clipped
+    '''
+    if have_numpy and isinstance(rgbs, numpy.ndarray):
+        return numpy.clip(rgbs, 0, 1)
+    return [clip_whitepoint(rgb) for rgb in rgbs]
+
+
+
+BLACKBODY_LUT_MAGIC = b'BSHFTLUT'
+'''
+:bytes  The first bytes of a compiled blackbody data lookup table, the magic
+        is followed by the number of rows and the number of columns, as
+        unsigned 64-bit little-endian integers, and then all cells, row by
+        row, as little-endian IEEE 754 double precision floats
+'''
+
+
 def get_blackbody_lut(filename):
     '''
     Load and parse a blackbody data lookup table
     
     This function is intended as help functions for the functions above this one in this module
     
-    @param   filename:str        The filename of the lookup table
+    If a compiled version of the lookup table, with the suffix ‘.lut’, is installed,
+    it is memory-mapped rather than parsed, otherwise the text table is parsed
+    
+    @param   filename:str                          The filename of the lookup table
+    @return  :list<list<float>|memoryview<float>>  A float matrix of all values in the lookup table
+    '''
+    pathname = DATADIR + os.sep + filename
+    lut = map_blackbody_lut(pathname + '.lut')
+    return parse_blackbody_lut(pathname) if lut is None else lut
+
+
+def parse_blackbody_lut(pathname):
+    '''
+    Load and parse a blackbody data lookup table in text format
+    
+    @param   pathname:str        The pathname of the lookup table
     @return  :list<list<float>>  A float matrix of all values in the lookup table
     '''
     # Load lookup table
     lut = None
-    with open(DATADIR + os.sep + filename, 'rb') as file:
+    with open(pathname, 'rb') as file:
         lut = file.read().decode('utf-8', 'error').split('\n')
     # Parse lookup table
     return [[float(cell) for cell in line.split(' ')] for line in lut if not line == '']
 
 
+def map_blackbody_lut(pathname):
+    '''
+    Memory-map a compiled blackbody data lookup table
+    
+    The mapping is never unmapped, so the table should be cached by the caller
+    
+    @param   pathname:str               The pathname of the compiled lookup table
+    @return  :list<memoryview<float>>?  The rows of the lookup table, as views of the
+                                        mapped file, or as lists on big-endian machines,
+                                        `None` if the file is missing or malformed
+    '''
+    header = len(BLACKBODY_LUT_MAGIC) + 2 * 8
+    # Map the file, an empty file cannot be mapped
+    try:
+        with open(pathname, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    # Validate the header and the size of the file
+    rows, columns = 0, 0
+    if len(data) >= header and data[:len(BLACKBODY_LUT_MAGIC)] == BLACKBODY_LUT_MAGIC:
+        (rows, columns) = struct.unpack_from('<QQ', data, len(BLACKBODY_LUT_MAGIC))
+    if (columns == 0) or not (len(data) == header + rows * columns * 8):
+        data.close()
+        return None
+    if not sys.byteorder == 'little':
+        # The cells cannot be viewed in place, so decode them
+        lut = [list(struct.unpack_from('<%id' % columns, data, header + r * columns * 8)) for r in range(rows)]
+        data.close()
+        return lut
+    # Create a view of each row
+    cells = memoryview(data)[header:].cast('d')
+    return [cells[r * columns : (r + 1) * columns] for r in range(rows)]
+
+
+def write_blackbody_lut(lut, pathname):
+    '''
+    Compile a blackbody data lookup table into the binary format that `map_blackbody_lut` reads
+    
+    @param  lut:list<list<float>>  A float matrix of all values in the lookup table,
+                                   all rows must have the same number of columns
+    @param  pathname:str           The pathname of the compiled lookup table
+    '''
+    columns = len(lut[0]) if len(lut) > 0 else 0
+    if any(not len(row) == columns for row in lut):
+        raise Exception('All rows in a lookup table must have the same number of columns')
+    cells = [cell for row in lut for cell in row]
+    with open(pathname, 'wb') as file:
+        file.write(BLACKBODY_LUT_MAGIC)
+        file.write(struct.pack('<QQ', len(lut), columns))
+        file.write(struct.pack('<%id' % len(cells), *cells))
+
+
 
 def divide_by_maximum(rgb):
     '''
@@ -703,3 +986,254 @@ def kelvins(temperature):
     # Evaluate (that is, return the named variable)
     return eval(temperature)
 
+
+
+
+whitepoint_algorithms = { 'cmf_2deg'          : (cmf_2deg_many, 1000, 40000)
+                        , 'cmf_10deg'         : (cmf_10deg_many, 1000, 40000)
+                        , 'redshift'          : (redshift_many, 1000, 25100)
+                        , 'redshift_old'      : (lambda ts : redshift_many(ts, True), 1000, 10000)
+                        , 'series_d'          : (series_d_many, 4000, 25000)
+                        , 'simple_whitepoint' : (simple_whitepoint_many, 1000, 40000)
+                        }
+'''
+:dict<str, ((itr<float>)→list<(float, float, float)>, int, int)>  The algorithms `cached_whitepoint` can tabulate,
+                                                                   by name, in their `*_many` form, with the lowest and
+                                                                   highest temperature that is meaningful to them
+'''
+
+whitepoint_postprocessing = { 'divide_by_maximum' : divide_by_maximum_many
+                            , 'clip_whitepoint'   : clip_whitepoint_many
+                            }
+'''
+:dict<str, (list<[float, float, float]>)→list<[float, float, float]>>  The post-processing functions `cached_whitepoint`
+                                                                       can apply to white points, by name, in their
+                                                                       `*_many` form
+'''
+
+whitepoint_tables = {}
+'''
+:dict<(str, tuple<str>), list<[float, float, float]>>  Whitepoint tables created by `cached_whitepoint`,
+                                                       by algorithm and post-processing
+'''
+
+
+def cached_whitepoint(algorithm = 'cmf_10deg', post = ('divide_by_maximum',), pathname = None):
+    '''
+    Create a function that looks up white points in a table with one entry
+    per kelvin, rather than calculating them
+    
+    For example, `cached_whitepoint('cmf_10deg', ('divide_by_maximum', 'clip_whitepoint'))`
+    returns an approximation of `lambda t : clip_whitepoint(divide_by_maximum(cmf_10deg(t)))`
+    that interpolates linearly between whole kelvins, so discontinuities, such as the one
+    in `simple_whitepoint` at 6600 K, are spread over one kelvin. The table is created on
+    first use and shared by all functions returned for the same algorithm and post-processing
+    
+    @param   algorithm:str                        The name of the algorithm, see `whitepoint_algorithms`
+    @param   post:itr<str>                        The names of the functions, see `whitepoint_postprocessing`,
+                                                  to apply to the white points, innermost first
+    @param   pathname:str?                        The pathname of a file in which to persist the table,
+                                                  it is read if it exists and written otherwise, it must
+                                                  not be shared between different algorithms and post-processing
+    @return  :(float)→(float, float, float)       Function that returns the white point for a temperature, in
+                                                  kelvins, clipped to the domain of the algorithm
+    '''
+    post = tuple(post)
+    (function, temp_min, temp_max) = whitepoint_algorithms[algorithm]
+    functions = [whitepoint_postprocessing[name] for name in post]
+    table = whitepoint_tables.get((algorithm, post), None)
+    if (table is None) and (pathname is not None):
+        # Load persisted table, but not if it was created for another domain
+        table = map_blackbody_lut(pathname)
+        if (table is not None) and not ((len(table) == temp_max - temp_min + 1) and (len(table[0]) == 3)):
+            table = None
+    if table is None:
+        # Create table
+        table = range(temp_min, temp_max + 1)
+        table = function(numpy.arange(temp_min, temp_max + 1, dtype = numpy.float64) if have_numpy else table)
+        for f in functions:
+            table = f(table)
+        table = [tuple(rgb) for rgb in (table.tolist() if have_numpy else table)]
+    if (pathname is not None) and not os.path.exists(pathname):
+        # Persist table
+        write_blackbody_lut(table, pathname)
+    table = whitepoint_tables.setdefault((algorithm, post), table)
+    def lookup(temperature):
+        # Clip temperature to definition domain and remove offset
+        temp = min(max(temp_min, temperature), temp_max) - temp_min
+        i = int(temp)
+        if i == temp:
+            # Exact temperature is included in the table
+            return tuple(table[i])
+        # Interpolation between floor and ceiling
+        (floor, ceiling, temp) = (table[i], table[i + 1], temp - i)
+        return tuple(c1 + (c2 - c1) * temp for c1, c2 in zip(floor, ceiling))
+    return lookup
+
+
+
+isotemperature_indices = {}
+'''
+:dict<str, (list<float>, list<float>, list<float>, list<float>, list<float>)>  Indices created by
+                                                                                 `get_isotemperature_index`,
+                                                                                 by lookup table filename
+'''
+
+
+def get_isotemperature_index(filename = '10deg', temp_min = 1000, temp_max = 40000, temp_step = 100):
+    '''
+    Get the isotemperature lines, for Robertson's method, of a blackbody data
+    lookup table in the CIE xyY colour space, see `ciexyy_to_temperature`
+    
+    The isotemperature line of a temperature is the line, in the CIE 1960 UCS
+    colour space, through the temperature's point on the Planckian locus and
+    perpendicular to the locus
+    
+    @param   filename:str      The filename of the lookup table, '10deg' or '2deg'
+    @param   temp_min:float    The lowest temperature in the lookup table
+    @param   temp_max:float    The highest temperature in the lookup table
+    @param   temp_step:float   The interval between the temperatures
+    @return  :(temperatures:list<float>, u:list<float>, v:list<float>, du:list<float>, dv:list<float>)
+                               For each temperature in the lookup table: the temperature, the u and v
+                               coordinates of its point on the Planckian locus, and the unit tangent of
+                               the locus at that point, pointing towards higher temperatures
+    '''
+    index = isotemperature_indices.get(filename, None)
+    if index is not None:
+        return index
+    # Merge runs of equal entries, which the tables have at high
+    # temperatures because of their limited precision, into the
+    # average of their temperatures
+    lut, temperatures, runs = [], [], []
+    for i, (x, y) in enumerate(get_blackbody_lut(filename)):
+        if (len(lut) == 0) or not (lut[-1] == (x, y)):
+            lut.append((x, y))
+            runs.append([])
+        runs[-1].append(min(temp_min + i * temp_step, temp_max))
+    temperatures = [sum(run) / len(run) for run in runs]
+    # Convert the Planckian locus from CIE xyY to CIE 1960 UCS
+    us = [4 * x / (-2 * x + 12 * y + 3) for x, y in lut]
+    vs = [6 * y / (-2 * x + 12 * y + 3) for x, y in lut]
+    # Calculate the tangent of the locus with central differences, widened until the
+    # chord is long enough for the precision of the tables not to affect its direction
+    dus, dvs, n = [], [], len(lut)
+    for i in range(n):
+        (a, b) = (max(i - 1, 0), min(i + 1, n - 1))
+        while (a > 0 or b < n - 1) and (us[b] - us[a]) ** 2 + (vs[b] - vs[a]) ** 2 < 0.005 ** 2:
+            (a, b) = (max(a - 1, 0), min(b + 1, n - 1))
+        (du, dv) = (us[b] - us[a], vs[b] - vs[a])
+        norm = (du ** 2 + dv ** 2) ** 0.5
+        dus.append(du / norm)
+        dvs.append(dv / norm)
+    index = (temperatures, us, vs, dus, dvs)
+    return isotemperature_indices.setdefault(filename, index)
+
+
+def ciexyy_to_temperature(x, y, filename = '10deg'):
+    '''
+    Calculate the correlated colour temperature of a colour using Robertson's method
+    
+    The colour's signed distance to the isotemperature lines decreases with the
+    temperature, so the pair of adjacent lines the colour lies between is found with
+    a binary search, and the reciprocal temperature is interpolated linearly from the
+    distances, as the isotemperature lines are much more evenly spaced in reciprocal
+    temperature than in temperature
+    
+    @param   x:float          The x component of the colour in the CIE xyY colour space
+    @param   y:float          The y component of the colour in the CIE xyY colour space
+    @param   filename:str     The filename of the lookup table, see `get_isotemperature_index`
+    @return  :float           The correlated colour temperature in kelvins, clipped
+                              to the domain of the lookup table
+    '''
+    (temperatures, us, vs, dus, dvs) = get_isotemperature_index(filename)
+    s = -2 * x + 12 * y + 3
+    (u, v) = (4 * x / s, 6 * y / s)
+    distance = lambda i : (u - us[i]) * dus[i] + (v - vs[i]) * dvs[i]
+    # Find the last isotemperature line that the colour is not below
+    (lo, hi) = (0, len(temperatures) - 1)
+    if distance(lo) <= 0:
+        return temperatures[lo]
+    if distance(hi) >= 0:
+        return temperatures[hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if distance(mid) >= 0:
+            lo = mid
+        else:
+            hi = mid
+    # Interpolate between the two isotemperature lines, in reciprocal temperature
+    (d_lo, d_hi) = (distance(lo), distance(hi))
+    (r_lo, r_hi) = (1 / temperatures[lo], 1 / temperatures[hi])
+    return 1 / (r_lo + (r_hi - r_lo) * d_lo / (d_lo - d_hi))
+
+
+def ciexyy_to_temperature_many(x, y, filename = '10deg'):
+    '''
+    Calculate the correlated colour temperatures of many colours using Robertson's method,
+    see `ciexyy_to_temperature`
+    
+    @param   x:itr<float>|ndarray  The x components of the colours in the CIE xyY colour space
+    @param   y:itr<float>|ndarray  The y components of the colours in the CIE xyY colour space
+    @param   filename:str          The filename of the lookup table, see `get_isotemperature_index`
+    @return  :list<float>|ndarray  The correlated colour temperatures in kelvins, clipped to the
+                                   domain of the lookup table, as a NumPy array if `x` is one
+    '''
+    if not (have_numpy and isinstance(x, numpy.ndarray)):
+        return [ciexyy_to_temperature(x_, y_, filename) for x_, y_ in zip(x, y)]
+    (temperatures, us, vs, dus, dvs) = (numpy.array(c, dtype = numpy.float64) for c in get_isotemperature_index(filename))
+    (x, y) = (numpy.asarray(x, dtype = numpy.float64), numpy.asarray(y, dtype = numpy.float64))
+    s = -2 * x + 12 * y + 3
+    (u, v) = (4 * x / s, 6 * y / s)
+    distance = lambda i : (u - us[i]) * dus[i] + (v - vs[i]) * dvs[i]
+    # Binary search all colours in lockstep
+    lo = numpy.zeros(x.shape, dtype = numpy.intp)
+    hi = numpy.full(x.shape, len(temperatures) - 1, dtype = numpy.intp)
+    while True:
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        above = distance(mid) >= 0
+        lo = numpy.where(active & above, mid, lo)
+        hi = numpy.where(active & ~above, mid, hi)
+    # Interpolate between the two isotemperature lines, in reciprocal temperature, and clip
+    (d_lo, d_hi) = (distance(lo), distance(hi))
+    (r_lo, r_hi) = (1 / temperatures[lo], 1 / temperatures[hi])
+    with numpy.errstate(invalid = 'ignore', divide = 'ignore'):
+        rc = 1 / (r_lo + (r_hi - r_lo) * d_lo / (d_lo - d_hi))
+    rc = numpy.where(distance(0) <= 0, temperatures[0], rc)
+    return numpy.where(distance(len(temperatures) - 1) >= 0, temperatures[-1], rc)
+
+
+def srgb_to_temperature(r, g, b, filename = '10deg'):
+    '''
+    Calculate the correlated colour temperature of a white point, for example
+    the last stops of the gamma ramps, using Robertson's method
+    
+    @param   r:float       The red component of the white point
+    @param   g:float       The green component of the white point
+    @param   b:float       The blue component of the white point
+    @param   filename:str  The filename of the lookup table, see `get_isotemperature_index`
+    @return  :float        The correlated colour temperature in kelvins, clipped
+                           to the domain of the lookup table
+    '''
+    (x, y, _Y) = srgb_to_ciexyy(r, g, b)
+    return ciexyy_to_temperature(x, y, filename)
+
+
+def srgb_to_temperature_many(rgbs, filename = '10deg'):
+    '''
+    Calculate the correlated colour temperatures of many white points using
+    Robertson's method, see `srgb_to_temperature`
+    
+    @param   rgbs:list<(float, float, float)>|ndarray  The white points, as a N×3 NumPy array
+                                                     or as a list of triples
+    @param   filename:str                            The filename of the lookup table, see
+                                                     `get_isotemperature_index`
+    @return  :list<float>|ndarray                    The correlated colour temperatures in
+                                                     kelvins, as a NumPy array if `rgbs` is one
+    '''
+    xyys = srgb_to_ciexyy_many(rgbs)
+    if have_numpy and isinstance(xyys, numpy.ndarray):
+        return ciexyy_to_temperature_many(xyys[:, 0], xyys[:, 1], filename)
+    return [ciexyy_to_temperature(x, y, filename) for x, y, _Y in xyys]
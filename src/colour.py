@@ -18,6 +18,16 @@
 # This module implements functions from convertions between colour spaces
 # and comparion of colours.
 
+import math
+from collections import OrderedDict
+
+have_numpy = True
+try:
+    import numpy
+except:
+    have_numpy = False
+
+
 
 def linear_to_standard(*colour):
     '''
@@ -184,3 +194,392 @@ def delta_e(a, b):
     standard_to_cielab = lambda x : ciexyz_to_cielab(*linear_to_ciexyz(*standard_to_linear(*x)))
     return sum([(c1 - c2) ** 2 for c1, c2 in zip(standard_to_cielab(a), standard_to_cielab(b))]) ** 0.5
 
+
+
+linear_to_cielab_matrix = [[c / w for c in row] for row, w in zip(linear_to_ciexyz_matrix, (0.95047, 1, 1.08883))]
+'''
+Multiplication matrix to convert from linear RGB to CIE XYZ normalised by the
+white point, that is, the linear part of the conversion to CIE L*a*b*
+'''
+
+
+def __unpack(a, b, c):
+    '''
+    Get the components of the colours given to a `*_many` function
+    
+    @param   a:itr<float>|list<(float, float, float)>|ndarray  The first component of each colour,
+                                                              or, if `b` and `c` are `None`, the
+                                                              colours, as a list of triples or a
+                                                              N×3 NumPy array
+    @param   b:itr<float>?                                    The second component of each colour
+    @param   c:itr<float>?                                    The third component of each colour
+    @return  :(a, b, c, packed:bool, ndarray:bool)            The first, second and third components,
+                                                              whether the colours were given as triples,
+                                                              and whether the components are NumPy arrays
+    '''
+    ndarray = have_numpy and isinstance(a, numpy.ndarray)
+    if b is None:
+        if ndarray:
+            a = numpy.asarray(a, dtype = numpy.float64)
+            return (a[:, 0], a[:, 1], a[:, 2], True, True)
+        (a, b, c) = zip(*a) if len(a) > 0 else ((), (), ())
+        return (a, b, c, True, False)
+    if ndarray:
+        (a, b, c) = (numpy.asarray(x, dtype = numpy.float64) for x in (a, b, c))
+    return (a, b, c, False, ndarray)
+
+
+def __pack(a, b, c, packed, ndarray):
+    '''
+    Return the converted colours from a `*_many` function in the same form as the input
+    
+    @param   a:list<float>|ndarray   The first component of each colour
+    @param   b:list<float>|ndarray   The second component of each colour
+    @param   c:list<float>|ndarray   The third component of each colour
+    @param   packed:bool             Whether to return the colours as triples
+    @param   ndarray:bool            Whether the components are NumPy arrays
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                     The components, or the colours as triples or as a N×3 array
+    '''
+    if ndarray:
+        return numpy.stack((a, b, c), axis = 1) if packed else (a, b, c)
+    if packed:
+        return [list(colour) for colour in zip(a, b, c)]
+    return (list(a), list(b), list(c))
+
+
+def linear_to_standard_many(r, g = None, b = None):
+    '''
+    Convert many [0, 1] linear RGB colours to [0, 1] sRGB, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   r:itr<float>|list<(float, float, float)>|ndarray  The red components, or the colours
+    @param   g:itr<float>?                                    The green components
+    @param   b:itr<float>?                                    The blue components
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The red, green and blue components, or the colours
+    '''
+    (r, g, b, packed, ndarray) = __unpack(r, g, b)
+    if ndarray:
+        with numpy.errstate(invalid = 'ignore'):
+            f = lambda c : numpy.where(c <= 0.0031308, 12.92 * c, (1 + 0.055) * c ** (1 / 2.4) - 0.055)
+            return __pack(f(r), f(g), f(b), packed, True)
+    f = lambda cs : [12.92 * c if c <= 0.0031308 else (1 + 0.055) * c ** (1 / 2.4) - 0.055 for c in cs]
+    return __pack(f(r), f(g), f(b), packed, False)
+
+
+def standard_to_linear_many(r, g = None, b = None):
+    '''
+    Convert many [0, 1] sRGB colours to [0, 1] linear RGB, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   r:itr<float>|list<(float, float, float)>|ndarray  The red components, or the colours
+    @param   g:itr<float>?                                    The green components
+    @param   b:itr<float>?                                    The blue components
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The red, green and blue components, or the colours
+    '''
+    (r, g, b, packed, ndarray) = __unpack(r, g, b)
+    if ndarray:
+        with numpy.errstate(invalid = 'ignore'):
+            f = lambda c : numpy.where(c <= 0.04045, c / 12.92, ((c + 0.055) / (1 + 0.055)) ** 2.4)
+            return __pack(f(r), f(g), f(b), packed, True)
+    f = lambda cs : [c / 12.92 if c <= 0.04045 else ((c + 0.055) / (1 + 0.055)) ** 2.4 for c in cs]
+    return __pack(f(r), f(g), f(b), packed, False)
+
+
+def matrix_mul_vector_many(matrix, a, b = None, c = None):
+    '''
+    Multiplies a 3×3 matrix with many vectors, see `__unpack` and `__pack`
+    for how the vectors are given and returned
+    
+    @param   matrix:list<list<float>>                         The matrix
+    @param   a:itr<float>|list<(float, float, float)>|ndarray  The first elements, or the vectors
+    @param   b:itr<float>?                                    The second elements
+    @param   c:itr<float>?                                    The third elements
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The elements of the resulting vectors, or the vectors
+    '''
+    (a, b, c, packed, ndarray) = __unpack(a, b, c)
+    ((m11, m12, m13), (m21, m22, m23), (m31, m32, m33)) = matrix
+    if ndarray:
+        x = m11 * a + m12 * b + m13 * c
+        y = m21 * a + m22 * b + m23 * c
+        z = m31 * a + m32 * b + m33 * c
+    else:
+        x = [m11 * p + m12 * q + m13 * r for p, q, r in zip(a, b, c)]
+        y = [m21 * p + m22 * q + m23 * r for p, q, r in zip(a, b, c)]
+        z = [m31 * p + m32 * q + m33 * r for p, q, r in zip(a, b, c)]
+    return __pack(x, y, z, packed, ndarray)
+
+
+def ciexyz_to_linear_many(X, Y = None, Z = None):
+    '''
+    Convert many CIE XYZ colours to [0, 1] linear RGB, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   X:itr<float>|list<(float, float, float)>|ndarray  The X parameters, or the colours
+    @param   Y:itr<float>?                                    The Y parameters
+    @param   Z:itr<float>?                                    The Z parameters
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The red, green and blue components, or the colours
+    '''
+    return matrix_mul_vector_many(ciexyz_to_linear_matrix, X, Y, Z)
+
+
+def linear_to_ciexyz_many(r, g = None, b = None):
+    '''
+    Convert many [0, 1] linear RGB colours to CIE XYZ, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   r:itr<float>|list<(float, float, float)>|ndarray  The red components, or the colours
+    @param   g:itr<float>?                                    The green components
+    @param   b:itr<float>?                                    The blue components
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The X, Y and Z parameters, or the colours
+    '''
+    return matrix_mul_vector_many(linear_to_ciexyz_matrix, r, g, b)
+
+
+def ciexyy_to_ciexyz_many(x, y = None, Y = None):
+    '''
+    Convert many CIE xyY colours to CIE XYZ, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   x:itr<float>|list<(float, float, float)>|ndarray  The x parameters, or the colours
+    @param   y:itr<float>?                                    The y parameters
+    @param   Y:itr<float>?                                    The Y parameters
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The X, Y and Z parameters, or the colours
+    '''
+    (x, y, Y, packed, ndarray) = __unpack(x, y, Y)
+    if ndarray:
+        zero = y == 0
+        y_ = numpy.where(zero, 1, y)
+        X = numpy.where(zero, Y, Y * x / y_)
+        Z = numpy.where(zero, Y, Y * (1 - x - y) / y_)
+        return __pack(X, Y, Z, packed, True)
+    X = [Y_ if y_ == 0 else Y_ * x_ / y_ for x_, y_, Y_ in zip(x, y, Y)]
+    Z = [Y_ if y_ == 0 else Y_ * (1 - x_ - y_) / y_ for x_, y_, Y_ in zip(x, y, Y)]
+    return __pack(X, Y, Z, packed, False)
+
+
+def ciexyz_to_ciexyy_many(X, Y = None, Z = None):
+    '''
+    Convert many CIE XYZ colours to CIE xyY, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   X:itr<float>|list<(float, float, float)>|ndarray  The X parameters, or the colours
+    @param   Y:itr<float>?                                    The Y parameters
+    @param   Z:itr<float>?                                    The Z parameters
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The x, y and Y parameters, or the colours
+    '''
+    (X, Y, Z, packed, ndarray) = __unpack(X, Y, Z)
+    if ndarray:
+        s = X + Y + Z
+        zero = s == 0
+        s = numpy.where(zero, 1, s)
+        x = numpy.where(zero, 0, X / s)
+        y = numpy.where(zero, 0, Y / s)
+        return __pack(x, y, numpy.where(zero, 0, Y), packed, True)
+    S = [X_ + Y_ + Z_ for X_, Y_, Z_ in zip(X, Y, Z)]
+    x = [0 if s == 0 else X_ / s for X_, s in zip(X, S)]
+    y = [0 if s == 0 else Y_ / s for Y_, s in zip(Y, S)]
+    Y = [0 if s == 0 else Y_ for Y_, s in zip(Y, S)]
+    return __pack(x, y, Y, packed, False)
+
+
+def srgb_to_ciexyy_many(r, g = None, b = None):
+    '''
+    Convert many [0, 1] sRGB colours to CIE xyY, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   r:itr<float>|list<(float, float, float)>|ndarray  The red components, or the colours
+    @param   g:itr<float>?                                    The green components
+    @param   b:itr<float>?                                    The blue components
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The x, y and Y parameters, or the colours
+    '''
+    (r, g, b, packed, ndarray) = __unpack(r, g, b)
+    (x, y, Y) = ciexyz_to_ciexyy_many(*linear_to_ciexyz_many(*standard_to_linear_many(r, g, b)))
+    # Black is mapped to the white point, rather than to (0, 0)
+    if ndarray:
+        black = (r == 0) & (g == 0) & (b == 0)
+        x = numpy.where(black, 0.312857, x)
+        y = numpy.where(black, 0.328993, y)
+        Y = numpy.where(black, 0, Y)
+    else:
+        black = [r_ == g_ == b_ == 0 for r_, g_, b_ in zip(r, g, b)]
+        x = [0.312857 if k else v for k, v in zip(black, x)]
+        y = [0.328993 if k else v for k, v in zip(black, y)]
+        Y = [0 if k else v for k, v in zip(black, Y)]
+    return __pack(x, y, Y, packed, ndarray)
+
+
+def ciexyy_to_srgb_many(x, y = None, Y = None):
+    '''
+    Convert many CIE xyY colours to [0, 1] sRGB, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   x:itr<float>|list<(float, float, float)>|ndarray  The x parameters, or the colours
+    @param   y:itr<float>?                                    The y parameters
+    @param   Y:itr<float>?                                    The Y parameters
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The red, green and blue components, or the colours
+    '''
+    (x, y, Y, packed, ndarray) = __unpack(x, y, Y)
+    rgb = linear_to_standard_many(*ciexyz_to_linear_many(*ciexyy_to_ciexyz_many(x, y, Y)))
+    return __pack(*rgb, packed, ndarray)
+
+
+def ciexyz_to_cielab_many(x, y = None, z = None):
+    '''
+    Convert many CIE XYZ colours to CIE L*a*b*, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   x:itr<float>|list<(float, float, float)>|ndarray  The X parameters, or the colours
+    @param   y:itr<float>?                                    The Y parameters
+    @param   z:itr<float>?                                    The Z parameters
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The L*, a* and b* components, or the colours
+    '''
+    (x, y, z, packed, ndarray) = __unpack(x, y, z)
+    if ndarray:
+        (x, z) = (x / 0.95047, z / 1.08883)
+    else:
+        (x, z) = ([c / 0.95047 for c in x], [c / 1.08883 for c in z])
+    return __normalised_ciexyz_to_cielab(x, y, z, packed, ndarray)
+
+
+def __normalised_ciexyz_to_cielab(x, y, z, packed, ndarray):
+    '''
+    Convert many CIE XYZ colours, that have been normalised by the white point, to CIE L*a*b*
+    
+    @param   x:list<float>|ndarray   The X parameters, divided by the X parameter of the white point
+    @param   y:list<float>|ndarray   The Y parameters
+    @param   z:list<float>|ndarray   The Z parameters, divided by the Z parameter of the white point
+    @param   packed:bool             Whether to return the colours as triples
+    @param   ndarray:bool            Whether the parameters are NumPy arrays
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                     The L*, a* and b* components, or the colours
+    '''
+    if ndarray:
+        with numpy.errstate(invalid = 'ignore'):
+            f = lambda c : numpy.where(c > 0.00885642, c ** (1 / 3), (7.78 + 703 / 99900) * c + 0.1379310)
+            (x, y, z) = (f(x), f(y), f(z))
+        return __pack(116 * y - 16, 500 * (x - y), 200 * (y - z), packed, True)
+    f = lambda cs : [c ** (1 / 3) if c > 0.00885642 else (7.78 + 703 / 99900) * c + 0.1379310 for c in cs]
+    (x, y, z) = (f(x), f(y), f(z))
+    l = [116 * y_ - 16 for y_ in y]
+    a = [500 * (x_ - y_) for x_, y_ in zip(x, y)]
+    b = [200 * (y_ - z_) for y_, z_ in zip(y, z)]
+    return __pack(l, a, b, packed, False)
+
+
+def srgb_to_cielab_many(r, g = None, b = None):
+    '''
+    Convert many [0, 1] sRGB colours to CIE L*a*b*, see `__unpack` and `__pack`
+    for how the colours are given and returned
+    
+    @param   r:itr<float>|list<(float, float, float)>|ndarray  The red components, or the colours
+    @param   g:itr<float>?                                    The green components
+    @param   b:itr<float>?                                    The blue components
+    @return  :(list<float>, list<float>, list<float>)|list<[float, float, float]>|(ndarray, ndarray, ndarray)|ndarray
+                                                              The L*, a* and b* components, or the colours
+    '''
+    (r, g, b, packed, ndarray) = __unpack(r, g, b)
+    xyz = matrix_mul_vector_many(linear_to_cielab_matrix, *standard_to_linear_many(r, g, b))
+    return __normalised_ciexyz_to_cielab(*xyz, packed, ndarray)
+
+
+def delta_e_many(a, b):
+    '''
+    Compute the CIE ∆E*_ab distances between many pairs of [0, 1] sRGB colours
+    
+    @param   a:list<(float, float, float)>|ndarray  The first colour of each pair, as a N×3 NumPy array if `b` is one
+    @param   b:list<(float, float, float)>|ndarray  The second colour of each pair, as a N×3 NumPy array if `a` is one
+    @return  :list<float>|ndarray                   The difference of each pair
+    '''
+    (l1, a1, b1) = srgb_to_cielab_many(*__unpack(a, None, None)[:3])
+    (l2, a2, b2) = srgb_to_cielab_many(*__unpack(b, None, None)[:3])
+    if have_numpy and isinstance(l1, numpy.ndarray):
+        return ((l1 - l2) ** 2 + (a1 - a2) ** 2 + (b1 - b2) ** 2) ** 0.5
+    return [((p1 - p2) ** 2 + (q1 - q2) ** 2 + (r1 - r2) ** 2) ** 0.5
+            for p1, q1, r1, p2, q2, r2 in zip(l1, a1, b1, l2, a2, b2)]
+
+
+transfer_tables = OrderedDict()
+'''
+:OrderedDict<(str, float?, int, int), list<float>>  Memoised transfer tables, keyed by the
+                                                   parameters of `transfer_table`, in order of last use
+'''
+
+transfer_tables_capacity = 64
+'''
+:int  The maximum number of memoised transfer tables
+'''
+
+
+def transfer_table(function, parameter, size, depth = -1):
+    '''
+    Get a transfer function applied to every stop of an identity ramp
+    
+    The tables are memoised, and the least recently used table is evicted
+    when there are more than `transfer_tables_capacity` tables. The values
+    in the tables are bit-identical to evaluating the functions stop by stop
+    
+    @param   function:str     The transfer function: 'identity' for y ↦ y, 'power' for y ↦ yᵖ,
+                              'sigmoid' for the S-curve used by `sigmoid`, 'linearise' for sRGB
+                              to linear RGB, and 'standardise' for linear RGB to sRGB
+    @param   parameter:float? The exponent for 'power', and the level for 'sigmoid', ignored
+                              (and should be `None`) for the other functions
+    @param   size:int         The number of stops in the ramp
+    @param   depth:int        The depth of the ramp, as in `output.Ramps`, where a positive depth
+                              means that the stops of the identity ramp are integers in
+                              [0, 2 ↑ `depth` − 1], and a negative depth means that the stops
+                              are floating-point values in [0, 1]
+    @return  :list<float>     The table, it is shared and must not be modified
+    '''
+    key = (function, parameter, size, depth)
+    table = transfer_tables.get(key, None)
+    if table is not None:
+        try:
+            transfer_tables.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread
+            pass
+        return table
+    m = 1 if depth < 0 else (1 << depth) - 1
+    if function == 'identity':
+        if depth > 0:
+            table = [int(x * m / (size - 1) + 0.5) for x in range(size)]
+        else:
+            table = [x / (size - 1) for x in range(size)]
+    else:
+        if function == 'power':
+            f = lambda y : (y / m) ** parameter * m
+        elif function == 'sigmoid':
+            def f(y):
+                try:
+                    return (0.5 - math.log(m / y - 1) / parameter) * m
+                except:
+                    # Corner cases:
+                    #   y = 0 → 0 -- Division by zero
+                    #   y = m → m -- Logarithm of zero
+                    return y
+        elif function == 'linearise':
+            f = lambda y : standard_to_linear(y / m)[0] * m
+        elif function == 'standardise':
+            f = lambda y : linear_to_standard(y / m)[0] * m
+        else:
+            raise ValueError('Unrecognised transfer function: %s' % function)
+        table = [f(y) for y in transfer_table('identity', None, size, depth)]
+    transfer_tables[key] = table
+    while len(transfer_tables) > transfer_tables_capacity:
+        try:
+            transfer_tables.popitem(last = False)
+        except KeyError:
+            # Emptied by another thread
+            break
+    return table
@@ -18,6 +18,8 @@
 # This module is deprecated!
 
 import math
+import functools
+from collections import OrderedDict
 
 from colour import *
 from blackbody import *
@@ -42,6 +44,708 @@ doing so can create visual artifacts
 '''
 
 
+def __key(value):
+    '''
+    Get the memoisation key of a value, the keys of two values are equal only if
+    the values are equal and of the same type, so that, for example, `1`, `1.0`
+    and `True` are not confused
+    
+    @param   value:?  The value
+    @return  :tuple?  The key, `None` if the value cannot be used in a key, that is, unless
+                      it is immutable and compared by value: `None`, `...`, a boolean,
+                      a number, a string, or a tuple of such values
+    '''
+    if isinstance(value, tuple):
+        keys = tuple(__key(v) for v in value)
+        return None if any(k is None for k in keys) else (tuple, keys)
+    if (value is None) or (value is ...) or isinstance(value, (bool, int, float, str)):
+        return (type(value), value)
+    return None
+
+
+def memoised(operation):
+    '''
+    Make an adjustment method of `CurveContext` reuse the resulting curves of an
+    earlier adjustment, if the adjustment, and all adjustments before it since
+    the last `start_over`, were invoked with the same parameters
+    
+    Adjustments whose parameters are not compared by value, such as functions,
+    and modifications of the curves that are not made by memoised adjustments,
+    stop the memoisation until the next `start_over`
+    
+    @param   operation:(CurveContext, *?, **?)→void  The adjustment method
+    @return  :(CurveContext, *?, **?)→void           The memoised adjustment method
+    '''
+    @functools.wraps(operation)
+    def memoised_operation(self, *args, **kwargs):
+        state = self.memo_state
+        # Check that the curves have not been modified since the last adjustment
+        if state is not None:
+            curves = state[1]
+            if not (self.r_curve == curves[0] and self.g_curve == curves[1] and self.b_curve == curves[2]):
+                state = None
+        parameters = __key(args + tuple(sorted(kwargs.items())))
+        if (state is None) or (parameters is None):
+            self.memo_state = None
+            operation(self, *args, **kwargs)
+            return
+        # Reuse the result of the same chain of adjustments, or remember it
+        key = (state[0], operation.__name__, parameters)
+        curves = self.memo.get(key, None)
+        if curves is not None:
+            self.memo.move_to_end(key)
+            self.memo_hits += 1
+            (self.r_curve[:], self.g_curve[:], self.b_curve[:]) = curves
+        else:
+            self.memo_misses += 1
+            operation(self, *args, **kwargs)
+            curves = self.memo[key] = self.store()
+            while len(self.memo) > self.memo_capacity:
+                self.memo.popitem(last = False)
+        self.memo_state = (key, curves)
+    return memoised_operation
+
+
+class CurveContext:
+    '''
+    A set of colour curves, and the operations on them
+    
+    The module level functions operate on `default_context`, whose curves are
+    `r_curve`, `g_curve` and `b_curve`, but any number of contexts can be
+    created and adjusted independently of each other, for example one per
+    monitor, each in its own thread
+    
+    Most adjustments are memoised, see `memoised`, so when the same adjustments
+    are made after each `start_over`, for example a static calibration followed
+    by a time-dependent colour temperature, only the adjustments from the first
+    one that has changed are recomputed
+    
+    @variable  r_curve:list<float>  The red curve
+    @variable  g_curve:list<float>  The green curve
+    @variable  b_curve:list<float>  The blue curve
+    @variable  i_size:int           The number of stops in each curve
+    @variable  o_size:int           The output maximum value + 1
+    @variable  memo:OrderedDict<tuple, (list<float>, list<float>, list<float>)>
+                                    The curves resulting from chains of memoised adjustments,
+                                    keyed by the chains, in order of last use, must not be modified
+    @variable  memo_capacity:int    The maximum number of memoised curves
+    @variable  memo_state:(tuple, (list<float>, list<float>, list<float>))?
+                                    The key in `memo` of the chain of adjustments made since the last
+                                    `start_over`, and the curves it resulted in, `None` if not known
+    @variable  memo_hits:int        The number of adjustments that have been skipped by reusing curves
+    @variable  memo_misses:int      The number of memoised adjustments that have been computed
+    '''
+    def __init__(self, i_size = None, o_size = None, r_curve = None, g_curve = None, b_curve = None):
+        '''
+        Constructor
+        
+        @param  i_size:int?            The number of stops in each curve, the module's
+                                       `i_size` if `None`
+        @param  o_size:int?            The output maximum value + 1, the module's
+                                       `o_size` if `None`
+        @param  r_curve:list<float>?   The red curve, not copied, identity mapping if `None`
+        @param  g_curve:list<float>?   The green curve, not copied, identity mapping if `None`
+        @param  b_curve:list<float>?   The blue curve, not copied, identity mapping if `None`
+        '''
+        # Use the module's sizes where no size is given
+        if i_size is None:  i_size = globals()['i_size']
+        if o_size is None:  o_size = globals()['o_size']
+        (self.i_size, self.o_size) = (i_size, o_size)
+        # Use identity mappings where no curves are given
+        identity = lambda : [i / (i_size - 1) for i in range(i_size)]
+        self.r_curve = identity() if r_curve is None else r_curve
+        self.g_curve = identity() if g_curve is None else g_curve
+        self.b_curve = identity() if b_curve is None else b_curve
+        self.memo = OrderedDict()
+        self.memo_capacity = 16
+        self.memo_state = None
+        self.memo_hits = 0
+        self.memo_misses = 0
+    
+    
+    def store(self):
+        '''
+        Get copies of the curves
+        
+        @return  :(r:list<float>, g:list<float>, b:list<float>)  Copies of the red, green and blue curves
+        '''
+        return (self.r_curve[:], self.g_curve[:], self.b_curve[:])
+    
+    
+    def __table(self, function, parameter, curve):
+        '''
+        Get the result of a transfer function on a curve from a memoised
+        table, if the curve is an identity mapping
+        
+        @param   function:str       The transfer function, see `transfer_table`
+        @param   parameter:float?   The parameter of the transfer function
+        @param   curve:list<float>  The curve
+        @return  :list<float>?      The new values for the curve, `None` if
+                                    the curve is not an identity mapping
+        '''
+        if curve == transfer_table('identity', None, len(curve)):
+            return transfer_table(function, parameter, len(curve))
+        return None
+    
+    
+    def curves(self, r, g, b):
+        '''
+        Generate a tuple of curve–parameter pairs
+        
+        @param   r  The red parameter
+        @param   g  The green parameter
+        @param   b  The blue parameter
+        @return     `((r_curve, r), (g_curve, g), (b_curve, b))`
+        '''
+        return ((self.r_curve, r), (self.g_curve, g), (self.b_curve, b))
+    
+    
+    def temperature(self, temperature, algorithm):
+        '''
+        Change colour temperature according to the CIE illuminant series D using CIE sRBG
+        
+        @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
+        @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
+        '''
+        self.rgb_temperature(temperature, algorithm)
+    
+    
+    def rgb_temperature(self, temperature, algorithm):
+        '''
+        Change colour temperature according to the CIE illuminant series D using CIE sRBG
+        
+        @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
+        @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
+        '''
+        # Resolve colour temperature name
+        temperature = kelvins(temperature)
+        # Do nothing if the temperature is neutral
+        if temperature == 6500:  return
+        # Otherwise manipulate the colour curves
+        self.rgb_brightness(*(algorithm(temperature)))
+    
+    
+    def cie_temperature(self, temperature, algorithm):
+        '''
+        Change colour temperature according to the CIE illuminant series D using CIE xyY
+        
+        @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
+        @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
+        '''
+        # Resolve colour temperature name
+        temperature = kelvins(temperature)
+        # Do nothing if the temperature is neutral
+        if temperature == 6500:  return
+        # Otherwise manipulate the colour curves
+        self.cie_brightness(*(algorithm(temperature)))
+    
+    
+    @memoised
+    def rgb_contrast(self, r, g = ..., b = ...):
+        '''
+        Apply contrast correction on the colour curves using sRGB
+        
+        In this context, contrast is a measure of difference between the whitepoint and blackpoint,
+        if the difference is 0 than they are both grey
+        
+        @param  r:float      The contrast parameter for the red curve
+        @param  g:float|...  The contrast parameter for the green curve, defaults to `r` if `...`
+        @param  b:float|...  The contrast parameter for the blue curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves
+        for (curve, level) in self.curves(r, g, b):
+            # But not for the curves with neutral adjustment
+            if not level == 1.0:
+                curve[:] = [(y - 0.5) * level + 0.5 for y in curve]
+    
+    
+    @memoised
+    def cie_contrast(self, r, g = ..., b = ...):
+        '''
+        Apply contrast correction on the colour curves using CIE xyY
+        
+        In this context, contrast is a measure of difference between the whitepoint and blackpoint,
+        if the difference is 0 than they are both grey
+        
+        @param  r:float      The contrast parameter for the red curve
+        @param  g:float|...  The contrast parameter for the green curve, defaults to `r` if `...`
+        @param  b:float|...  The contrast parameter for the blue curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Check if we can reduce the overhead, we can if the adjustments are identical
+        same = r == g == b
+        # Check we need to do any adjustment
+        if (not same) or (not r == 1.0):
+            if same:
+                # Manipulate all curves in one step if their adjustments are identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate illumination and convert back to sRGB
+                    (self.r_curve[i], self.g_curve[i], self.b_curve[i]) = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)
+            else:
+                # Manipulate all curves individually if their adjustments are not identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate illumination and convert back to sRGB
+                    (self.r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)
+                    (_r, self.g_curve[i], _b) = ciexyy_to_srgb(x, y, (Y - 0.5) * g + 0.5)
+                    (_r, _g, self.b_curve[i]) = ciexyy_to_srgb(x, y, (Y - 0.5) * b + 0.5)
+    
+    
+    @memoised
+    def rgb_brightness(self, r, g = ..., b = ...):
+        '''
+        Apply brightness correction on the colour curves using sRGB
+        
+        In this context, brightness is a measure of the whiteness of the whitepoint
+        
+        @param  r:float      The brightness parameter for the red curve
+        @param  g:float|...  The brightness parameter for the green curve, defaults to `r` if `...`
+        @param  b:float|...  The brightness parameter for the blue curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = r
+        # Maniumate the colour curves
+        for (curve, level) in self.curves(r, g, b):
+            # But not if the adjustment is neutral
+            if not level == 1.0:
+                curve[:] = [y * level for y in curve]
+    
+    
+    @memoised
+    def cie_brightness(self, r, g = ..., b = ...):
+        '''
+        Apply brightness correction on the colour curves using CIE xyY
+        
+        In this context, brightness is a measure of the whiteness of the whitepoint
+        
+        @param  r:float      The brightness parameter for the red curve
+        @param  g:float|...  The brightness parameter for the green curve, defaults to `r` if `...`
+        @param  b:float|...  The brightness parameter for the blue curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Check if we can reduce the overhead, we can if the adjustments are identical
+        same = r == g == b
+        # Check we need to do any adjustment
+        if (not same) or (not r == 1.0):
+            if same:
+                # Manipulate all curves in one step if their adjustments are identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    (self.r_curve[i], self.g_curve[i], self.b_curve[i]) = ciexyy_to_srgb(x, y, Y * r)
+            else:
+                # Manipulate all curves individually if their adjustments are not identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate illumination and convert back to sRGB
+                    (self.r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, Y * r)
+                    (_r, self.g_curve[i], _b) = ciexyy_to_srgb(x, y, Y * g)
+                    (_r, _g, self.b_curve[i]) = ciexyy_to_srgb(x, y, Y * b)
+    
+    
+    @memoised
+    def linearise(self, r = True, g = ..., b = ...):
+        '''
+        Convert the curves from formatted in standard RGB to linear RGB
+        
+        @param  r:bool      Whether to convert the red colour curve
+        @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Convert colour space of selected curves
+        for (curve, convert) in self.curves(r, g, b):
+            if convert:
+                table = self.__table('linearise', None, curve)
+                curve[:] = table if table is not None else [standard_to_linear(y)[0] for y in curve]
+    
+    
+    @memoised
+    def standardise(self, r = True, g = ..., b = ...):
+        '''
+        Convert the curves from formatted in linear RGB to standard RGB
+        
+        @param  r:bool      Whether to convert the red colour curve
+        @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Convert colour space of selected curves
+        for (curve, convert) in self.curves(r, g, b):
+            if convert:
+                table = self.__table('standardise', None, curve)
+                curve[:] = table if table is not None else [linear_to_standard(y)[0] for y in curve]
+    
+    
+    @memoised
+    def gamma(self, r, g = ..., b = ...):
+        '''
+        Apply gamma correction on the colour curves
+        
+        @param  r:float      The gamma parameter for the red colour curve
+        @param  g:float|...  The gamma parameter for the green colour curve, defaults to `r` if `...`
+        @param  b:float|...  The gamma parameter for the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves
+        for (curve, level) in self.curves(r, g, b):
+            # But not if the adjustment is neutral
+            if not level == 1.0:
+                table = self.__table('power', 1 / level, curve)
+                curve[:] = table if table is not None else [y ** (1 / level) for y in curve]
+    
+    
+    @memoised
+    def negative(self, r = True, g = ..., b = ...):
+        '''
+        Reverse the colour curves (negative image with gamma preservation)
+        
+        @param  r:bool      Whether to invert the red colour curve
+        @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves
+        for (curve, setting) in self.curves(r, g, b):
+            # But not if the adjustment is neutral
+            if setting:
+                curve[:] = reversed(curve)
+    
+    
+    @memoised
+    def rgb_invert(self, r = True, g = ..., b = ...):
+        '''
+        Invert the colour curves (negative image with gamma invertion), using sRGB
+        
+        @param  r:bool      Whether to invert the red colour curve
+        @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves
+        for (curve, setting) in self.curves(r, g, b):
+            # But not if the adjustment is neutral
+            if setting:
+                curve[:] = [1 - y for y in curve]
+    
+    
+    @memoised
+    def cie_invert(self, r = True, g = ..., b = ...):
+        '''
+        Invert the colour curves (negative image with gamma invertion), using CIE xyY
+        
+        @param  r:bool      Whether to invert the red colour curve
+        @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves if any curve should be manipulated
+        if r or g or b:
+            for i in range(self.i_size):
+                # Convert to CIE xyY
+                (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                # Invert illumination and convert to back sRGB
+                (r_, g_, b_) = ciexyy_to_srgb(x, y, 1 - Y)
+                # Apply the new values on the selected channels
+                if r:  self.r_curve[i] = r_
+                if g:  self.g_curve[i] = g_
+                if b:  self.b_curve[i] = b_
+    
+    
+    @memoised
+    def sigmoid(self, r, g = ..., b = ...):
+        '''
+        Apply S-curve correction on the colour curves.
+        This is intended for fine tuning LCD monitors,
+        4.5 is good value start start testing at.
+        You would probably like to use rgb_limits before
+        this to adjust the black point as that is the
+        only way to adjust the black point on many LCD
+        monitors.
+        
+        @param  r:float?      The sigmoid parameter for the red colour curve
+        @param  g:float|...?  The sigmoid parameter for the green colour curve, defaults to `r` if `...`
+        @param  b:float|...?  The sigmoid parameter for the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate the colour curves
+        for (curve, level) in self.curves(r, g, b):
+            # But only on selected channels
+            if level is None:
+                continue
+            table = self.__table('sigmoid', level, curve)
+            if table is not None:
+                curve[:] = table
+            else:
+                for i in range(self.i_size):
+                    try:
+                        curve[i] = 0.5 - math.log(1 / curve[i] - 1) / level
+                    except:
+                        # Corner cases:
+                        #   curve[i] = 0 → 0 -- Division by zero
+                        #   curve[i] = 1 → 1 -- Logarithm of zero
+                        pass
+    
+    
+    @memoised
+    def rgb_limits(self, r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
+        '''
+        Changes the black point and the white point, using sRGB
+        
+        @param  r_min:float      The red component value of the black point
+        @param  r_max:float      The red component value of the white point
+        @param  g_min:float|...  The green component value of the black point, defaults to `r_min`
+        @param  g_max:float|...  The green component value of the white point, defaults to `r_max`
+        @param  b_min:float|...  The blue component value of the black point, defaults to `g_min`
+        @param  b_max:float|...  The blue component value of the white point, defaults to `g_max`
+        '''
+        # Handle overloading
+        if g_min is ...:  g_min = r_min
+        if g_max is ...:  g_max = r_max
+        if b_min is ...:  b_min = g_min
+        if b_max is ...:  b_max = g_max
+        # Manipulate the colour curves
+        for (curve, (level_min, level_max)) in self.curves((r_min, r_max), (g_min, g_max), (b_min, b_max)):
+            # But not if the adjustments are neutral
+            if (level_min != 0) or (level_max != 1):
+                curve[:] = [y * (level_max - level_min) + level_min for y in curve]
+    
+    
+    @memoised
+    def cie_limits(self, r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
+        '''
+        Changes the black point and the white point, using CIE xyY
+        
+        @param  r_min:float      The red component value of the black point
+        @param  r_max:float      The red component value of the white point
+        @param  g_min:float|...  The green component value of the black point, defaults to `r_min`
+        @param  g_max:float|...  The green component value of the white point, defaults to `r_max`
+        @param  b_min:float|...  The blue component value of the black point, defaults to `g_min`
+        @param  b_max:float|...  The blue component value of the white point, defaults to `g_max`
+        '''
+        # Handle overloading
+        if g_min is ...:  g_min = r_min
+        if g_max is ...:  g_max = r_max
+        if b_min is ...:  b_min = g_min
+        if b_max is ...:  b_max = g_max
+        # Check if we can reduce the overhead, we can if the adjustments are identical
+        same = (r_min == g_min == b_min) and (r_max == g_max == b_max)
+        # Check we need to do any adjustment
+        if (not same) or (not r_min == 0) or (not r_max == 1):
+            if same:
+                # Manipulate all curves in one step if their adjustments are identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate illumination
+                    Y = Y * (r_max - r_min) + r_min
+                    # Convert back to sRGB
+                    (self.r_curve[i], self.g_curve[i], self.b_curve[i]) = ciexyy_to_srgb(x, y, Y)
+            else:
+                # Manipulate all curves individually if their adjustments are not identical
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate illumination and convert back to sRGB
+                    (self.r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, Y * (r_max - r_min) + r_min)
+                    (_r, self.g_curve[i], _b) = ciexyy_to_srgb(x, y, Y * (g_max - g_min) + g_min)
+                    (_r, _g, self.b_curve[i]) = ciexyy_to_srgb(x, y, Y * (b_max - b_min) + b_min)
+    
+    
+    @memoised
+    def manipulate(self, r, g = ..., b = ...):
+        '''
+        Manipulate the colour curves using a (lambda) function
+        
+        @param  r:(float)?→float      Function to manipulate the red colour curve
+        @param  g:(float)?→float|...  Function to manipulate the green colour curve, defaults to `r` if `...`
+        @param  b:(float)?→float|...  Function to manipulate the blue colour curve, defaults to `g` if `...`
+        
+        `None` means that nothing is done for that subpixel
+        
+        The lambda functions thats a colour value and maps it to a new colour value.
+        For example, if the red value 0.5 is already mapped to 0.25, then if the function
+        maps 0.25 to 0.5, the red value 0.5 will revert back to being mapped to 0.5.
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulate colour curves
+        for (curve, f) in self.curves(r, g, b):
+            # But only for selected channels
+            if f is not None:
+                curve[:] = [f(y) for y in curve]
+    
+    
+    @memoised
+    def cie_manipulate(self, r, g = ..., b = ...):
+        '''
+        Manipulate the colour curves using a (lambda) function on the CIE xyY colour space
+        
+        @param  r:(float)?→float      Function to manipulate the red colour curve
+        @param  g:(float)?→float|...  Function to manipulate the green colour curve, defaults to `r` if `...`
+        @param  b:(float)?→float|...  Function to manipulate the blue colour curve, defaults to `g` if `...`
+        
+        `None` means that nothing is done for that subpixel
+        
+        The lambda functions thats a colour value and maps it to a new illumination value.
+        For example, if the value 0.5 is already mapped to 0.25, then if the function
+        maps 0.25 to 0.5, the value 0.5 will revert back to being mapped to 0.5.
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Check if we can reduce the overhead, we can if the adjustments are identical
+        same = (r is g) and (g is b)
+        if same:
+            # Manipulate all curves in one step if their adjustments are identical
+            if r is not None:
+                # But not if the we are not given a function
+                for i in range(self.i_size):
+                    # Convert to CIE xyY
+                    (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                    # Manipulate and convert by to sRGB
+                    (self.r_curve[i], self.g_curve[i], self.b_curve[i]) = ciexyy_to_srgb(x, y, r(Y))
+        elif any(f is not None for f in (r, g, b)):
+            # Manipulate all curves individually if their adjustments are not identical
+            # if we are given a function for any curve
+            for i in range(self.i_size):
+                # Convert to CIE xyY
+                (x, y, Y) = srgb_to_ciexyy(self.r_curve[i], self.g_curve[i], self.b_curve[i])
+                # Manipulate and convert by to sRGB for selected channels individually
+                if r is not None:  (self.r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, r(Y))
+                if g is not None:  (_r, self.g_curve[i], _b) = ciexyy_to_srgb(x, y, g(Y))
+                if b is not None:  (_r, _g, self.b_curve[i]) = ciexyy_to_srgb(x, y, b(Y))
+    
+    
+    @memoised
+    def lower_resolution(self, rx_colours = None, ry_colours = None, gx_colours = ..., gy_colours = ..., bx_colours = ..., by_colours = ...):
+        '''
+        Emulates low colour resolution
+        
+        @param  rx_colours:int?      The number of colours to emulate on the red encoding axis
+        @param  ry_colours:int?      The number of colours to emulate on the red output axis
+        @param  gx_colours:int|...?  The number of colours to emulate on the green encoding axis, `rx_colours` if `...`
+        @param  gy_colours:int|...?  The number of colours to emulate on the green output axis, `ry_colours` if `...`
+        @param  bx_colours:int|...?  The number of colours to emulate on the blue encoding axis, `gx_colours` if `...`
+        @param  by_colours:int|...?  The number of colours to emulate on the blue output axis, `gy_colours` if `...`
+        
+        Where `None` is used the default value will be used, for *x_colours:es that is `i_size`,
+        and for *y_colours:es that is `o_size`
+        '''
+        # Handle overloading
+        if gx_colours is ...:  gx_colours = rx_colours
+        if gy_colours is ...:  gy_colours = ry_colours
+        if bx_colours is ...:  bx_colours = gx_colours
+        if by_colours is ...:  by_colours = gy_colours
+        # Select default values where default is requested
+        if rx_colours is None:  rx_colours = self.i_size
+        if ry_colours is None:  ry_colours = self.o_size
+        if gx_colours is None:  gx_colours = self.i_size
+        if gy_colours is None:  gy_colours = self.o_size
+        if bx_colours is None:  bx_colours = self.i_size
+        if by_colours is None:  by_colours = self.o_size
+        # Combine pair X and Y parameters for each channel
+        r_colours = (rx_colours, ry_colours)
+        g_colours = (gx_colours, gy_colours)
+        b_colours = (bx_colours, by_colours)
+        # Manipulate colour curves
+        for i_curve, (x_colours, y_colours) in self.curves(r_colours, g_colours, b_colours):
+            # But not if adjustment is neutral
+            if (x_colours == self.i_size) and (y_colours == self.o_size):
+                continue
+            o_curve = [0] * self.i_size
+            x_, y_, i_ = x_colours - 1, y_colours - 1, self.i_size - 1
+            for i in range(self.i_size):
+                # Scale encoding
+                x = int(i * x_colours / self.i_size)
+                x = int(x * i_ / x_)
+                # Scale output
+                y = int(i_curve[x] * y_ + 0.5)
+                o_curve[i] = y / y_
+            i_curve[:] = o_curve
+    
+    
+    def start_over(self):
+        '''
+        Reverts all colours curves to identity mappings.
+        This intended for multi-monitor setups with different curves on each monitor.
+        If you have a multi-monitor setups without different curves then you have not
+        calibrated the monitors or you have awesome monitors that support hardware
+        gamma correction.
+        '''
+        # Reset colour curves
+        for i in range(self.i_size):
+            self.r_curve[i] = self.g_curve[i] = self.b_curve[i] = i / (self.i_size - 1)
+        # Start a new chain of memoised adjustments
+        identity = transfer_table('identity', None, self.i_size)
+        self.memo_state = (('start_over', self.i_size, self.o_size), (identity, identity, identity))
+    
+    
+    @memoised
+    def clip(self, r = True, g = ..., b = ...):
+        '''
+        Clip all values below the actual minimum and above the actual maximum
+        
+        @param  r:bool      Whether to clip the red colour curve
+        @param  g:bool|...  Whether to clip the green colour curve, defaults to `r` if `...`
+        @param  b:bool|...  Whether to clip the blue colour curve, defaults to `g` if `...`
+        '''
+        # Handle overloading
+        if g is ...:  g = r
+        if b is ...:  b = g
+        # Manipulation colour curves
+        for curve, action in self.curves(r, g, b):
+            # But only for selected channels
+            if action:
+                curve[:] = [min(max(0.0, y), 1.0) for y in curve]
+
+
+default_context = CurveContext(i_size, o_size, r_curve, g_curve, b_curve)
+'''
+:CurveContext  The context the module level functions operate on
+'''
+
+
+def __context():
+    '''
+    Get `default_context`, updated to use the current values of
+    `i_size`, `o_size`, `r_curve`, `g_curve` and `b_curve`
+    
+    @return  :CurveContext  The default context
+    '''
+    context = default_context
+    (context.i_size, context.o_size) = (i_size, o_size)
+    (context.r_curve, context.g_curve, context.b_curve) = (r_curve, g_curve, b_curve)
+    return context
+
+
 def curves(r, g, b):
     '''
     Generate a tuple of curve–parameter pairs
@@ -51,7 +755,7 @@ def curves(r, g, b):
     @param   b  The blue parameter
     @return     `((r_curve, r), (g_curve, g), (b_curve, b))`
     '''
-    return ((r_curve, r), (g_curve, g), (b_curve, b))
+    return __context().curves(r, g, b)
 
 
 def temperature(temperature, algorithm):
@@ -61,7 +765,7 @@ def temperature(temperature, algorithm):
     @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
     @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
     '''
-    rgb_temperature(temperature, algorithm)
+    __context().temperature(temperature, algorithm)
 
 
 def rgb_temperature(temperature, algorithm):
@@ -71,12 +775,7 @@ def rgb_temperature(temperature, algorithm):
     @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
     @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
     '''
-    # Resolve colour temperature name
-    temperature = kelvins(temperature)
-    # Do nothing if the temperature is neutral
-    if temperature == 6500:  return
-    # Otherwise manipulate the colour curves
-    rgb_brightness(*(algorithm(temperature)))
+    __context().rgb_temperature(temperature, algorithm)
 
 
 def cie_temperature(temperature, algorithm):
@@ -86,12 +785,7 @@ def cie_temperature(temperature, algorithm):
     @param  temperature:float|str                    The blackbody temperature in kelvins, or a name
     @param  algorithm:(float)→(float, float, float)  Algorithm for calculating a white point, for example `cmf_10deg`
     '''
-    # Resolve colour temperature name
-    temperature = kelvins(temperature)
-    # Do nothing if the temperature is neutral
-    if temperature == 6500:  return
-    # Otherwise manipulate the colour curves
-    cie_brightness(*(algorithm(temperature)))
+    __context().cie_temperature(temperature, algorithm)
 
 
 def rgb_contrast(r, g = ..., b = ...):
@@ -105,14 +799,7 @@ def rgb_contrast(r, g = ..., b = ...):
     @param  g:float|...  The contrast parameter for the green curve, defaults to `r` if `...`
     @param  b:float|...  The contrast parameter for the blue curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves
-    for (curve, level) in curves(r, g, b):
-        # But not for the curves with neutral adjustment
-        if not level == 1.0:
-            curve[:] = [(y - 0.5) * level + 0.5 for y in curve]
+    __context().rgb_contrast(r, g, b)
 
 
 def cie_contrast(r, g = ..., b = ...):
@@ -126,29 +813,7 @@ def cie_contrast(r, g = ..., b = ...):
     @param  g:float|...  The contrast parameter for the green curve, defaults to `r` if `...`
     @param  b:float|...  The contrast parameter for the blue curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Check if we can reduce the overhead, we can if the adjustments are identical
-    same = r == g == b
-    # Check we need to do any adjustment
-    if (not same) or (not r == 1.0):
-        if same:
-            # Manipulate all curves in one step if their adjustments are identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate illumination and convert back to sRGB
-                (r_curve[i], g_curve[i], b_curve[i]) = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)
-        else:
-            # Manipulate all curves individually if their adjustments are not identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate illumination and convert back to sRGB
-                (r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)
-                (_r, g_curve[i], _b) = ciexyy_to_srgb(x, y, (Y - 0.5) * g + 0.5)
-                (_r, _g, b_curve[i]) = ciexyy_to_srgb(x, y, (Y - 0.5) * b + 0.5)
+    __context().cie_contrast(r, g, b)
 
 
 def rgb_brightness(r, g = ..., b = ...):
@@ -161,14 +826,7 @@ def rgb_brightness(r, g = ..., b = ...):
     @param  g:float|...  The brightness parameter for the green curve, defaults to `r` if `...`
     @param  b:float|...  The brightness parameter for the blue curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = r
-    # Maniumate the colour curves
-    for (curve, level) in curves(r, g, b):
-        # But not if the adjustment is neutral
-        if not level == 1.0:
-            curve[:] = [y * level for y in curve]
+    __context().rgb_brightness(r, g, b)
 
 
 def cie_brightness(r, g = ..., b = ...):
@@ -181,28 +839,7 @@ def cie_brightness(r, g = ..., b = ...):
     @param  g:float|...  The brightness parameter for the green curve, defaults to `r` if `...`
     @param  b:float|...  The brightness parameter for the blue curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Check if we can reduce the overhead, we can if the adjustments are identical
-    same = r == g == b
-    # Check we need to do any adjustment
-    if (not same) or (not r == 1.0):
-        if same:
-            # Manipulate all curves in one step if their adjustments are identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                (r_curve[i], g_curve[i], b_curve[i]) = ciexyy_to_srgb(x, y, Y * r)
-        else:
-            # Manipulate all curves individually if their adjustments are not identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate illumination and convert back to sRGB
-                (r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, Y * r)
-                (_r, g_curve[i], _b) = ciexyy_to_srgb(x, y, Y * g)
-                (_r, _g, b_curve[i]) = ciexyy_to_srgb(x, y, Y * b)
+    __context().cie_brightness(r, g, b)
 
 
 def linearise(r = True, g = ..., b = ...):
@@ -213,17 +850,7 @@ def linearise(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Convert colour space
-    for i in range(i_size):
-        # Get values in sRGB
-        sr, sg, sb = r_curve[i], g_curve[i], b_curve[i]
-        # Get values in linear RGB
-        (lr, lg, lb) = standard_to_linear(sr, sg, sb)
-        # Convert selected components
-        r_curve[i], g_curve[i], b_curve[i] = (lr if r else sr), (lg if g else sg), (lb if b else sb)
+    __context().linearise(r, g, b)
 
 
 def standardise(r = True, g = ..., b = ...):
@@ -234,17 +861,7 @@ def standardise(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Convert colour space
-    for i in range(i_size):
-        # Get values in linear RGB
-        lr, lg, lb = r_curve[i], g_curve[i], b_curve[i]
-        # Get values in sRGB
-        (sr, sg, sb) = linear_to_standard(lr, lg, lb)
-        # Convert selected components
-        r_curve[i], g_curve[i], b_curve[i] = (sr if r else lr), (sg if g else lg), (sb if b else lb)
+    __context().standardise(r, g, b)
 
 
 def gamma(r, g = ..., b = ...):
@@ -255,16 +872,9 @@ def gamma(r, g = ..., b = ...):
     @param  g:float|...  The gamma parameter for the green colour curve, defaults to `r` if `...`
     @param  b:float|...  The gamma parameter for the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves
-    for (curve, level) in curves(r, g, b):
-        # But not if the adjustment is neutral
-        if not level == 1.0:
-            curve[:] = [y ** (1 / level) for y in curve]
+    __context().gamma(r, g, b)
+
 
-    
 def negative(r = True, g = ..., b = ...):
     '''
     Reverse the colour curves (negative image with gamma preservation)
@@ -273,14 +883,7 @@ def negative(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves
-    for (curve, setting) in curves(r, g, b):
-        # But not if the adjustment is neutral
-        if setting:
-            curve[:] = reversed(curve)
+    __context().negative(r, g, b)
 
 
 def rgb_invert(r = True, g = ..., b = ...):
@@ -291,14 +894,7 @@ def rgb_invert(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves
-    for (curve, setting) in curves(r, g, b):
-        # But not if the adjustment is neutral
-        if setting:
-            curve[:] = [1 - y for y in curve]
+    __context().rgb_invert(r, g, b)
 
 
 def cie_invert(r = True, g = ..., b = ...):
@@ -309,22 +905,9 @@ def cie_invert(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves if any curve should be manipulated
-    if r or g or b:
-        for i in range(i_size):
-            # Convert to CIE xyY
-            (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-            # Invert illumination and convert to back sRGB
-            (r_, g_, b_) = ciexyy_to_srgb(x, y, 1 - Y)
-            # Apply the new values on the selected channels
-            if r:  r_curve[i] = r_
-            if g:  g_curve[i] = g_
-            if b:  b_curve[i] = b_
+    __context().cie_invert(r, g, b)
+
 
-    
 def sigmoid(r, g = ..., b = ...):
     '''
     Apply S-curve correction on the colour curves.
@@ -339,21 +922,7 @@ def sigmoid(r, g = ..., b = ...):
     @param  g:float|...?  The sigmoid parameter for the green colour curve, defaults to `r` if `...`
     @param  b:float|...?  The sigmoid parameter for the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate the colour curves
-    for (curve, level) in curves(r, g, b):
-        # But only on selected channels
-        if level is not None:
-            for i in range(i_size):
-                try:
-                    curve[i] = 0.5 - math.log(1 / curve[i] - 1) / level
-                except:
-                    # Corner cases:
-                    #   curve[i] = 0 → 0 -- Division by zero
-                    #   curve[i] = 1 → 1 -- Logarithm of zero
-                    pass
+    __context().sigmoid(r, g, b)
 
 
 def rgb_limits(r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
@@ -367,16 +936,7 @@ def rgb_limits(r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...)
     @param  b_min:float|...  The blue component value of the black point, defaults to `g_min`
     @param  b_max:float|...  The blue component value of the white point, defaults to `g_max`
     '''
-    # Handle overloading
-    if g_min is ...:  g_min = r_min
-    if g_max is ...:  g_max = r_max
-    if b_min is ...:  b_min = g_min
-    if b_max is ...:  b_max = g_max
-    # Manipulate the colour curves
-    for (curve, (level_min, level_max)) in curves((r_min, r_max), (g_min, g_max), (b_min, b_max)):
-        # But not if the adjustments are neutral
-        if (level_min != 0) or (level_max != 1):
-            curve[:] = [y * (level_max - level_min) + level_min for y in curve]
+    __context().rgb_limits(r_min, r_max, g_min, g_max, b_min, b_max)
 
 
 def cie_limits(r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
@@ -390,33 +950,7 @@ def cie_limits(r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...)
     @param  b_min:float|...  The blue component value of the black point, defaults to `g_min`
     @param  b_max:float|...  The blue component value of the white point, defaults to `g_max`
     '''
-    # Handle overloading
-    if g_min is ...:  g_min = r_min
-    if g_max is ...:  g_max = r_max
-    if b_min is ...:  b_min = g_min
-    if b_max is ...:  b_max = g_max
-    # Check if we can reduce the overhead, we can if the adjustments are identical
-    same = (r_min == g_min == b_min) and (r_max == g_max == b_max)
-    # Check we need to do any adjustment
-    if (not same) or (not r_min == 0) or (not r_max == 1):
-        if same:
-            # Manipulate all curves in one step if their adjustments are identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate illumination
-                Y = Y * (r_max - r_min) + r_min
-                # Convert back to sRGB
-                (r_curve[i], g_curve[i], b_curve[i]) = ciexyy_to_srgb(x, y, Y)
-        else:
-            # Manipulate all curves individually if their adjustments are not identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate illumination and convert back to sRGB
-                (r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, Y * (r_max - r_min) + r_min)
-                (_r, g_curve[i], _b) = ciexyy_to_srgb(x, y, Y * (g_max - g_min) + g_min)
-                (_r, _g, b_curve[i]) = ciexyy_to_srgb(x, y, Y * (b_max - b_min) + b_min)
+    __context().cie_limits(r_min, r_max, g_min, g_max, b_min, b_max)
 
 
 def manipulate(r, g = ..., b = ...):
@@ -433,14 +967,7 @@ def manipulate(r, g = ..., b = ...):
     For example, if the red value 0.5 is already mapped to 0.25, then if the function
     maps 0.25 to 0.5, the red value 0.5 will revert back to being mapped to 0.5.
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulate colour curves
-    for (curve, f) in curves(r, g, b):
-        # But only for selected channels
-        if f is not None:
-            curve[:] = [f(y) for y in curve]
+    __context().manipulate(r, g, b)
 
 
 def cie_manipulate(r, g = ..., b = ...):
@@ -457,30 +984,7 @@ def cie_manipulate(r, g = ..., b = ...):
     For example, if the value 0.5 is already mapped to 0.25, then if the function
     maps 0.25 to 0.5, the value 0.5 will revert back to being mapped to 0.5.
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Check if we can reduce the overhead, we can if the adjustments are identical
-    same = (r is g) and (g is b)
-    if same:
-        # Manipulate all curves in one step if their adjustments are identical
-        if r is not None:
-            # But not if the we are not given a function
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-                # Manipulate and convert by to sRGB
-                (r_curve[i], g_curve[i], b_curve[i]) = ciexyy_to_srgb(x, y, r(Y))
-    elif any(f is not None for f in (r, g, b)):
-        # Manipulate all curves individually if their adjustments are not identical
-        # if we are given a function for any curve
-        for i in range(i_size):
-            # Convert to CIE xyY
-            (x, y, Y) = srgb_to_ciexyy(r_curve[i], g_curve[i], b_curve[i])
-            # Manipulate and convert by to sRGB for selected channels individually
-            if r is not None:  (r_curve[i], _g, _b) = ciexyy_to_srgb(x, y, r(Y))
-            if g is not None:  (_r, g_curve[i], _b) = ciexyy_to_srgb(x, y, g(Y))
-            if b is not None:  (_r, _g, b_curve[i]) = ciexyy_to_srgb(x, y, b(Y))
+    __context().cie_manipulate(r, g, b)
 
 
 def lower_resolution(rx_colours = None, ry_colours = None, gx_colours = ..., gy_colours = ..., bx_colours = ..., by_colours = ...):
@@ -497,37 +1001,7 @@ def lower_resolution(rx_colours = None, ry_colours = None, gx_colours = ..., gy_
     Where `None` is used the default value will be used, for *x_colours:es that is `i_size`,
     and for *y_colours:es that is `o_size`
     '''
-    # Handle overloading
-    if gx_colours is ...:  gx_colours = rx_colours
-    if gy_colours is ...:  gy_colours = ry_colours
-    if bx_colours is ...:  bx_colours = gx_colours
-    if by_colours is ...:  by_colours = gy_colours
-    # Select default values where default is requested
-    if rx_colours is None:  rx_colours = i_size
-    if ry_colours is None:  ry_colours = o_size
-    if gx_colours is None:  gx_colours = i_size
-    if gy_colours is None:  gy_colours = o_size
-    if bx_colours is None:  bx_colours = i_size
-    if by_colours is None:  by_colours = o_size
-    # Combine pair X and Y parameters for each channel
-    r_colours = (rx_colours, ry_colours)
-    g_colours = (gx_colours, gy_colours)
-    b_colours = (bx_colours, by_colours)
-    # Manipulate colour curves
-    for i_curve, (x_colours, y_colours) in curves(r_colours, g_colours, b_colours):
-        # But not if adjustment is neutral
-        if (x_colours == i_size) and (y_colours == o_size):
-            continue
-        o_curve = [0] * i_size
-        x_, y_, i_ = x_colours - 1, y_colours - 1, i_size - 1
-        for i in range(i_size):
-            # Scale encoding
-            x = int(i * x_colours / i_size)
-            x = int(x * i_ / x_)
-            # Scale output
-            y = int(i_curve[x] * y_ + 0.5)
-            o_curve[i] = y / y_
-        i_curve[:] = o_curve
+    __context().lower_resolution(rx_colours, ry_colours, gx_colours, gy_colours, bx_colours, by_colours)
 
 
 def start_over():
@@ -538,9 +1012,7 @@ def start_over():
     calibrated the monitors or you have awesome monitors that support hardware
     gamma correction.
     '''
-    # Reset colour curves
-    for i in range(i_size):
-        r_curve[i] = g_curve[i] = b_curve[i] = i / (i_size - 1)
+    __context().start_over()
 
 
 def clip(r = True, g = ..., b = ...):
@@ -551,12 +1023,4 @@ def clip(r = True, g = ..., b = ...):
     @param  g:bool|...  Whether to clip the green colour curve, defaults to `r` if `...`
     @param  b:bool|...  Whether to clip the blue colour curve, defaults to `g` if `...`
     '''
-    # Handle overloading
-    if g is ...:  g = r
-    if b is ...:  b = g
-    # Manipulation colour curves
-    for curve, action in curves(r, g, b):
-        # But only for selected channels
-        if action:
-            curve[:] = [min(max(0.0, y), 1.0) for y in curve]
-
+    __context().clip(r, g, b)
@@ -17,42 +17,172 @@
 
 # This module contains interpolation functions.
 
+from collections import OrderedDict
+
 from aux import *
 from curve import *
 
+have_numpy = True
+try:
+    import numpy
+except:
+    have_numpy = False
+
 # TODO doc: size parameter has been added
 
 
-def __interpolate(r, g, b, size, interpolate, decimate = None): ## TODO document
+
+resampling_plans = OrderedDict()
+'''
+:OrderedDict<(int, int, str, float?, bool), tuple>  Plans created by `resampling_plan`, keyed
+                                                   by its parameters, in order of last use
+'''
+
+resampling_plans_capacity = 32
+'''
+:int  The maximum number of cached resampling plans
+'''
+
+
+def resampling_plan(size_in, size_out, kernel = 'linear', tension = None, ndarray = False):
+    '''
+    Get the positions and weights used to resample a ramp to another size
+    
+    The plans are cached, and the least recently used plan is evicted when
+    there are more than `resampling_plans_capacity` plans
+    
+    @param   size_in:int       The size of the ramp to resample
+    @param   size_out:int      The size of the resampled ramp
+    @param   kernel:str        'linear' for linear interpolation, or 'cubic' for cubic Hermite spline
+    @param   tension:float?    A [0, 1] value of the tension for the 'cubic' kernel,
+                               ignored (and should be `None`) for the 'linear' kernel
+    @param   ndarray:bool      Whether to return the plan as NumPy arrays rather than lists
+    @return  :(floors:list<int>, ceilings:list<int>, weights:list<float>)|
+              (floors:list<int>, ceilings:list<int>, weights:list<float>,
+               h10:list<float>, h01:list<float>, h11:list<float>)
+                               For each output stop: the input stop at or before it, the input
+                               stop after it, or the last stop, and the distance, in input stops,
+                               between the output stop and the floor, and for the 'cubic' kernel,
+                               the Hermite basis functions h₁₀, h₀₁ and h₁₁ at that distance, with
+                               the tension applied to h₁₀ and h₁₁. The plan is shared and must not
+                               be modified
+    '''
+    key = (size_in, size_out, kernel, tension, ndarray)
+    plan = resampling_plans.get(key, None)
+    if plan is not None:
+        try:
+            resampling_plans.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread
+            pass
+        return plan
+    if ndarray:
+        plan = tuple(numpy.array(x) for x in resampling_plan(size_in, size_out, kernel, tension))
+    else:
+        # A single output stop is placed at the first input stop
+        in_, out_ = size_in - 1, max(size_out - 1, 1)
+        # Floor, ceiling and weight for each output stop
+        js = [int(i * in_ / out_) for i in range(size_out)]
+        ks = [min(j + 1, in_) for j in js]
+        ws = [i * in_ / out_ - j for i, j in enumerate(js)]
+        plan = (js, ks, ws)
+        if kernel == 'cubic':
+            # Basis functions, with tension coefficent
+            c_ = 1 - tension
+            plan += ([c_ * (w * (1 - w) ** 2) for w in ws],
+                     [w ** 2 * (3 - 2 * w) for w in ws],
+                     [c_ * (w ** 2 * (w - 1)) for w in ws])
+        elif not kernel == 'linear':
+            raise ValueError('Unrecognised interpolation kernel: %s' % kernel)
+    resampling_plans[key] = plan
+    while len(resampling_plans) > resampling_plans_capacity:
+        try:
+            resampling_plans.popitem(last = False)
+        except KeyError:
+            # Emptied by another thread
+            break
+    return plan
+
+
+def __interpolate(r, g, b, size, interpolate, decimate = None):
+    '''
+    Resize ramps, by interpolation when scaling up and by decimation when scaling down
+    
+    @param   r:list<float>                                   The red colour curves
+    @param   g:list<float>                                   The green colour curves
+    @param   b:list<float>                                   The blue colour curves
+    @param   size:int|(r:int, g:int, b:int)?                 Either the size of all output ramps, the size
+                                                             if the output ramps individually, or `None` for
+                                                             whichever is larger of`o_size` and the size of
+                                                             the input ramps
+    @param   interpolate:(list<float>, list<float>)→void     Function that fills the second list, which is
+                                                             at least as large as the first list, with an
+                                                             interpolation of the first list
+    @param   decimate:(list<float>, list<float>)?→void       Function that fills the second list, which is
+                                                             smaller than the first list, with a decimation
+                                                             of the first list, `None` for area-averaging
+                                                             of the interpolation made by `interpolate`
+    @return  :(r:list<float>, g:list<float>, b:list<float>)  The input ramps resized to the choosen size
+    '''
     if decimate is None:
         decimate = lambda orig, out : __decimate(orig, out, interpolate)
     if size is None:
         size = (max(o_size, len(r)), max(o_size, len(g)), max(o_size, len(b)))
     elif isinstance(size, int):
         size = (size, size, size)
-    if len(r) == size[0]:
-        r = r[:]
-    elif len(r) > size[0]:
-        r = interpolate(r, [None] * size[0])
-    else:
-        r = decimate(r, [None] * size[0])
-    if len(g) == size[1]:
-        g = g[:]
-    elif len(g) > size[1]:
-        g = interpolate(g, [None] * size[1])
-    else:
-        g = decimate(g, [None] * size[1])
-    if len(b) == size[0]:
-        b = b[:]
-    elif len(b) > size[0]:
-        b = interpolate(b, [None] * size[2])
-    else:
-        b = decimate(b, [None] * size[2])
-    return (r, g, b)
+    rc = []
+    for orig, n in zip((r, g, b), size):
+        if len(orig) == n:
+            rc.append(orig[:])
+            continue
+        out = [None] * n
+        if len(orig) < n:
+            interpolate(orig, out)
+        else:
+            decimate(orig, out)
+        rc.append(out)
+    return tuple(rc)
 
 
-def __decimate(orig, out, interpolate): ## TODO document
-    pass # TODO
+def __decimate(orig, out, interpolate):
+    '''
+    Scale down a ramp by area-averaging
+    
+    The ramp is interpolated onto a grid that is at least as dense as the
+    input and that contains every output stop, and each output stop is set
+    to the average of the interpolation over an interval, centered at the stop,
+    as wide as the distance between output stops, but narrowed at the ends of
+    the ramp so that it does not extend beyond them. This preserves the end
+    points of the ramp, and linear ramps, and handles non-integer ratios.
+    
+    @param  orig:list<float>                             The ramp to scale down
+    @param  out:list<float>                              The list to fill with the scaled down ramp,
+                                                         it must be smaller than `orig`
+    @param  interpolate:(list<float>, list<float>)→void  Function that fills the second list, which
+                                                         is at least as large as the first list,
+                                                         with an interpolation of the first list
+    '''
+    orig_, out_ = len(orig) - 1, len(out) - 1
+    if out_ == 0:
+        # A single stop covers the whole ramp
+        out[0] = sum(orig) / len(orig)
+        return
+    # Number of fine intervals between output stops, even so that
+    # the intervals begin and end at points on the fine grid
+    k = 2 * -(-orig_ // (2 * out_))
+    fine = [None] * (k * out_ + 1)
+    if len(fine) == len(orig):
+        fine[:] = orig
+    else:
+        interpolate(orig, fine)
+    # Integrate the interpolation with the trapezoidal rule
+    integral = [0] * len(fine)
+    for i in range(1, len(fine)):
+        integral[i] = integral[i - 1] + (fine[i - 1] + fine[i]) / 2
+    # Average over the intervals
+    out[0], out[out_] = fine[0], fine[-1]
+    for i in range(1, out_):
+        out[i] = (integral[i * k + k // 2] - integral[i * k - k // 2]) / k
 
 
 def linearly_interpolate_ramp(r, g, b, size = None):
@@ -69,17 +199,46 @@ def linearly_interpolate_ramp(r, g, b, size = None):
     @return  :(r:list<float>, g:list<float>, b:list<float>)  The input ramps extended to the choosen size
     '''
     def interpolate(orig, out):
-        orig_, out_ = len(orig) - 1, len(out) - 1
-        for i in range(len(out)):
-            # Scaling
-            j = i * orig_ / out_
-            # Floor, weight, ceiling
-            j, w, k = int(j), j % 1, min(int(j) + 1, orig_)
-            # Interpolation
-            out[i] = orig[j] * (1 - w) + orig[k] * w
+        # Floor, ceiling and weight for each output stop
+        (js, ks, ws) = resampling_plan(len(orig), len(out))
+        # Interpolation
+        out[:] = [orig[j] * (1 - w) + orig[k] * w for j, k, w in zip(js, ks, ws)]
     return __interpolate(r, g, b, size, interpolate)
 
 
+def linearly_resample_array(ramp, size):
+    '''
+    Resize a ramp stored in a NumPy array, by linear interpolation when
+    scaling up and by area-averaging when scaling down, the result is
+    the same as from `linearly_interpolate_ramp`
+    
+    @param   ramp:ndarray  The ramp
+    @param   size:int      The size of the output ramp
+    @return  :ndarray      The ramp resized to `size` stops
+    '''
+    (orig_, out_) = (len(ramp) - 1, size - 1)
+    if orig_ == out_:
+        return ramp.copy()
+    elif orig_ < out_:
+        (js, ks, ws) = resampling_plan(len(ramp), size, ndarray = True)
+        return ramp[js] * (1 - ws) + ramp[ks] * ws
+    elif out_ == 0:
+        # A single stop covers the whole ramp
+        return numpy.array([ramp.mean()])
+    # Number of fine intervals between output stops, see `__decimate`
+    k = 2 * -(-orig_ // (2 * out_))
+    fine = ramp if k * out_ == orig_ else linearly_resample_array(ramp, k * out_ + 1)
+    # Integrate the interpolation with the trapezoidal rule
+    integral = numpy.zeros(len(fine))
+    numpy.cumsum((fine[:-1] + fine[1:]) / 2, out = integral[1:])
+    # Average over the intervals
+    centres = numpy.arange(1, out_) * k
+    rc = numpy.empty(size)
+    rc[1 : out_] = (integral[centres + k // 2] - integral[centres - k // 2]) / k
+    (rc[0], rc[out_]) = (fine[0], fine[-1])
+    return rc
+
+
 def cubicly_interpolate_ramp(r, g, b, tension = 0, size = None):
     '''
     Interpolate ramps to the size of the output axes using cubic Hermite spline
@@ -94,17 +253,6 @@ def cubicly_interpolate_ramp(r, g, b, tension = 0, size = None):
                                                              the input ramps
     @return  :(r:list<float>, g:list<float>, b:list<float>)  The input ramps extended to the choosen size
     '''
-    if size is None:
-        size = (max(o_size, len(r)), max(o_size, len(g)), max(o_size, len(b)))
-    elif isinstance(size, int):
-        size = (size, size, size)
-    C = lambda c, i : c[:] if len(c) >= size[i] else ([None] * size[i])
-    R, G, B = C(r, 0), C(g, 1), C(b, 2)
-    # Basis functions
-    #h00 = lambda t : (1 + 2 * t) * (1 - t) ** 2
-    h10 = lambda t : t * (1 - t) ** 2
-    h01 = lambda t : t ** 2 * (3 - 2 * t)
-    h11 = lambda t : t ** 2 * (t - 1)
     def tangent(values, index, last):
         '''
         Calculate the tangent at a point
@@ -118,24 +266,16 @@ def cubicly_interpolate_ramp(r, g, b, tension = 0, size = None):
         if index == 0:     return values[1] - values[0]
         if index == last:  return values[last] - values[last - 1]
         return (values[index + 1] - values[index - 1]) / 2
-    # Tension coefficent
-    c_ = 1 - tension
-    # Interpolate each curve
-    for small, large in ((r, R), (g, G), (b, B)):
-        small_, large_ = len(small) - 1, len(large) - 1
-        # Only interpolate if scaling up
-        if large_ > small_:
-            for i in range(len(large)):
-                # Scaling
-                j = i * small_ / large_
-                # Floor, weight, ceiling
-                j, w, k = int(j), j % 1, min(int(j) + 1, small_)
-                # Points
-                pj, pk = small[j], small[k]
-                # Tangents
-                mj, mk = c_ * tangent(small, j, small_), c_ * tangent(small, k, small_)
-                # Interpolation
-                large[i] = pj + h10(w) * mj + h01(w) * (pk - pj) + h11(w) * mk
+    def interpolate(small, large):
+        # Floor, ceiling, and basis functions, with tension, for each output stop
+        (js, ks, _ws, h10s, h01s, h11s) = resampling_plan(len(small), len(large), 'cubic', tension)
+        # Tangents
+        ms = [tangent(small, i, len(small) - 1) for i in range(len(small))]
+        # Interpolation
+        large[:] = [small[j] + h10 * ms[j] + h01 * (small[k] - small[j]) + h11 * ms[k]
+                    for j, k, h10, h01, h11 in zip(js, ks, h10s, h01s, h11s)]
+    # Interpolate, or decimate, each curve
+    R, G, B = __interpolate(r, g, b, size, interpolate)
     ## Check local monotonicity
     eliminate_halos(r, g, b, R, G, B)
     return (R, G, B)
@@ -159,88 +299,73 @@ def monotonicly_cubicly_interpolate_ramp(r, g, b, tension = 0, size = None):
                                                              the input ramps
     @return  :(r:list<float>, g:list<float>, b:list<float>)  The input ramps extended to the choosen size
     '''
-    if size is None:
-        size = (max(o_size, len(r)), max(o_size, len(g)), max(o_size, len(b)))
-    elif isinstance(size, int):
-        size = (size, size, size)
-    C = lambda c, i : c[:] if len(c) >= size[i] else ([None] * size[i])
-    R, G, B = C(r, 0), C(g, 1), C(b, 2)
-    # Basis functions
-    #h00 = lambda t : (1 + 2 * t) * (1 - t) ** 2
-    h10 = lambda t : t * (1 - t) ** 2
-    h01 = lambda t : t ** 2 * (3 - 2 * t)
-    h11 = lambda t : t ** 2 * (t - 1)
-    def tangent(values, index, last):
-        '''
-        Calculate the tangent at a point
-        
-        @param   values:list<float>  Mapping from points to values
-        @param   index:int           The point
-        @param   last:int            The last point
-        @return  :float              The tangent at the point `index`
-        '''
-        if last == 0:      return 0
-        if index == 0:     return values[1] - values[0]
-        if index == last:  return values[last] - values[last - 1]
-        return (values[index + 1] - values[index - 1]) / 2
-    # Tension coefficent
-    c_ = 1 - tension
-    ## Interpolant selection
-    # Compute the slopes of the secant
-    # lines between successive points
-    ds = [small[i + 1] - small[i] for i in range(small_)]
-    # Initialize the tangents at every
-    # data point as the average of the secants
-    ms = [ds[0]] + [(ds[i - 1] + ds[i]) / 2 for i in range(1, small_)] + [ds[small_ - 1]]
-    βlast = 0
-    for i in range(small_):
-        if ds[i] == 0:
-            # Two successive values are equal, ms[i],
-            # must be zero to preserve monotonicity,
-            # no idea to do further work on them.
-            ms[i], βlast = 0, -1
-            continue
-        # Look for local extremums
-        α, β = ms[i] / ds[i], ms[i + 1] / ds[i]
-        if (α < 0) or (βlast < 0):
-            # Local extremum found,
-            # ensure piecewise monotonicity
-            ms[i], β = 0, -1
-        elif α ** 2 + β ** 2 > 9:
-            # Otherwise, prevent overshoot and ensure
-            # monotonicity by restricting the (α, β)
-            # vector to a circle of radius 3.
-            τ = 3 / (α ** 2 + β ** 2) ** 0.5
-            ms[i], ms[i + 1] = τ * α * ds[i], τ * β  * ds[i]
-        βlast = β
-    ## Interpolate each curve
-    for small, large in ((r, R), (g, G), (b, B)):
-        small_, large_ = len(small) - 1, len(large) - 1
-        # Only interpolate if scaling up
-        if large_ > small_:
-            for i in range(len(large)):
-                # Scaling
-                j = i * small_ / large_
-                # Floor, weight, ceiling
-                j, w, k = int(j), j % 1, min(int(j) + 1, small_)
-                # Points
-                pj, pk = small[j], small[k]
-                # Tangents
-                mj, mk = c_ * ms[j], c_ * ms[k]
-                # Interpolation
-                large[i] = pj + h10(w) * mj + h01(w) * (pk - pj) + h11(w) * mk
-    return (R, G, B)
+    def interpolate(small, large):
+        small_ = len(small) - 1
+        if small_ == 0:
+            large[:] = [small[0]] * len(large)
+            return
+        ## Interpolant selection
+        # Compute the slopes of the secant
+        # lines between successive points
+        ds = [small[i + 1] - small[i] for i in range(small_)]
+        # Initialize the tangents at every
+        # data point as the average of the secants
+        ms = [ds[0]] + [(ds[i - 1] + ds[i]) / 2 for i in range(1, small_)] + [ds[small_ - 1]]
+        βlast = 0
+        for i in range(small_):
+            if ds[i] == 0:
+                # Two successive values are equal, ms[i],
+                # must be zero to preserve monotonicity,
+                # no idea to do further work on them.
+                ms[i], βlast = 0, -1
+                continue
+            # Look for local extremums
+            α, β = ms[i] / ds[i], ms[i + 1] / ds[i]
+            if (α < 0) or (βlast < 0):
+                # Local extremum found,
+                # ensure piecewise monotonicity
+                ms[i], β = 0, -1
+            elif α ** 2 + β ** 2 > 9:
+                # Otherwise, prevent overshoot and ensure
+                # monotonicity by restricting the (α, β)
+                # vector to a circle of radius 3.
+                τ = 3 / (α ** 2 + β ** 2) ** 0.5
+                ms[i], ms[i + 1] = τ * α * ds[i], τ * β  * ds[i]
+            βlast = β
+        ## Interpolate the curve
+        # Floor, ceiling, and basis functions, with tension, for each output stop
+        (js, ks, _ws, h10s, h01s, h11s) = resampling_plan(len(small), len(large), 'cubic', tension)
+        large[:] = [small[j] + h10 * ms[j] + h01 * (small[k] - small[j]) + h11 * ms[k]
+                    for j, k, h10, h01, h11 in zip(js, ks, h10s, h01s, h11s)]
+    ## Interpolate, or decimate, each curve
+    return __interpolate(r, g, b, size, interpolate)
+
 
+polynomial_interpolation_limit = 16
+'''
+:int  The largest number of stops in a ramp that `polynomially_interpolate_ramp`
+      fits a polynomial to, larger ramps would give an ill-conditioned polynomial
+      that oscillates wildly between the stops, so they are interpolated with
+      `cubicly_interpolate_ramp` instead
+'''
 
-def polynomially_interpolate_ramp(r, g, b, size = None): # TODO Speedup, demo and document this
+
+def polynomially_interpolate_ramp(r, g, b, size = None): # TODO demo this
     '''
     Polynomially interpolate ramps to the size of the output axes.
     
+    The polynomial is solved for in Newton form, with the first stage of the
+    Björck–Pereyra algorithm for Vandermonde systems (divided differences),
+    and evaluated with Horner's scheme, in O(n²) time for n stops.
+    
     This function will replace parts of the result with linear interpolation
     where local monotonicity have been broken. That is, there is a local
     maximum or local minimum generated between two reference points, linear
     interpolation will be used instead between those two points.
     
+    If any ramp has more than `polynomial_interpolation_limit` stops, cubic
+    Hermite spline interpolation is used instead.
+    
     @param   r:list<float>                                   The red colour curves
     @param   g:list<float>                                   The green colour curves
     @param   b:list<float>                                   The blue colour curves
@@ -250,37 +375,25 @@ def polynomially_interpolate_ramp(r, g, b, size = None): # TODO Speedup, demo an
                                                              the input ramps
     @return  :(r:list<float>, g:list<float>, b:list<float>)  The input ramps extended to the choosen size
     '''
-    if size is None:
-        size = (max(o_size, len(r)), max(o_size, len(g)), max(o_size, len(b)))
-    elif isinstance(size, int):
-        size = (size, size, size)
-    C = lambda c, i : c[:] if len(c) >= size[i] else ([None] * size[i])
-    R, G, B, linear = C(r, 0), C(g, 1), C(b, 2), [None]
-    for ci, (small, large) in enumerate(((r, R), (g, G), (b, B))):
+    if max(len(r), len(g), len(b)) > polynomial_interpolation_limit:
+        return cubicly_interpolate_ramp(r, g, b, size = size)
+    def interpolate(small, large):
         small_, large_ = len(small) - 1, len(large) - 1
-        # Only interpolate if scaling up
-        if large_ > small_:
-            n = len(small)
-            ## Construct interpolation matrix (TODO this is not working correctly)
-            M = [[small[y] ** i for i in range(n)] for y in range(n)]
-            A = [x / small_ for x in range(n)]
-            ## Eliminate interpolation matrix
-            # (XXX this can be done faster by utilising the fact that we have a Vandermonde matrix)
-            # Eliminiate lower left
-            for k in range(n - 1):
-                for i in range(k + 1, n):
-                    m = M[i][k] / M[k][k]
-                    M[i][k + 1:] = [M[i][j] - M[k][j] * m for j in range(k + 1, n)]
-                    A[i] -= A[k] * m
-            # Eliminiate upper right
-            for k in reversed(range(n)):
-                A[:k] = [A[i] - A[k] * M[i][k] / M[k][k] for i in range(k)]
-            # Eliminiate diagonal
-            A = [A[k] / M[k][k] for k in range(n)]
-            ## Construct interpolation function
-            f = lambda x : sum(A[i] * x ** i for i in range(n))
-            ## Apply interpolation
-            large[:] = [f(x / large_) for x in range(len(large))]
+        xs = [x / small_ for x in range(len(small))] if small_ > 0 else [0]
+        ## Calculate the coefficients of the Newton form with divided differences
+        cs = small[:]
+        for k in range(1, len(cs)):
+            for i in reversed(range(k, len(cs))):
+                cs[i] = (cs[i] - cs[i - 1]) / (xs[i] - xs[i - k])
+        ## Evaluate the polynomial with Horner's scheme
+        def f(x):
+            y = cs[-1]
+            for k in reversed(range(len(cs) - 1)):
+                y = y * (x - xs[k]) + cs[k]
+            return y
+        large[:] = [f(x / large_) for x in range(len(large))]
+    # Interpolate, or decimate, each curve
+    R, G, B = __interpolate(r, g, b, size, interpolate)
     ## Check local monotonicity
     eliminate_halos(r, g, b, R, G, B)
     return (R, G, B)
@@ -293,13 +406,16 @@ def eliminate_halos(r, g, b, R, G, B):
     @param  r:list<float>  The original red curve
     @param  g:list<float>  The original green curve
     @param  b:list<float>  The original blue curve
-    @param  R:list<float>  The scaled up red curve
-    @param  G:list<float>  The scaled up green curve
-    @param  B:list<float>  The scaled up blue curve
+    @param  R:list<float>  The resized red curve
+    @param  G:list<float>  The resized green curve
+    @param  B:list<float>  The resized blue curve
     '''
     linear = None
     for ci, (small, large) in enumerate(((r, R), (g, G), (b, B))):
         small_, large_ = len(small) - 1, len(large) - 1
+        # Decimated curves have no halos
+        if large_ <= small_:
+            continue
         ## Check local monotonicity
         for i in range(small_):
             # Small curve
@@ -325,7 +441,7 @@ def eliminate_halos(r, g, b, R, G, B):
                 # If linear interpolation has not yet been calculated,
                 if linear is None:
                     # then calculate it.
-                    linear = linearly_interpolate_ramp(r, g, b)
+                    linear = linearly_interpolate_ramp(r, g, b, size = (len(R), len(G), len(B)))
                 # Extract the linear interpolation for the current colour curve,
                 # and replace the local partition with the linear interpolation.
                 large[X1 : X2 + 1] = linear[ci][X1 : X2 + 1]
@@ -25,9 +25,6 @@ from output import EDID
 
 
 
-cached_displays = {}
-
-
 def get_gamma(crtc = 0, screen = 0, display = None, *, method = None):
     '''
     Gets the current colour curves
@@ -42,9 +39,7 @@ def get_gamma(crtc = 0, screen = 0, display = None, *, method = None):
     if not get_gamma.warned:
         get_gamma.warned = True
         print('get_gamma() is deprecated', file = sys.stderr)
-    if (method, display) not in cached_displays:
-        cached_displays[(method, display)] = output.get_outputs(method = method, display = display)
-    crtc = cached_displays[(method, display)].screens[screen].crtcs[crtc]
+    crtc = output.display_pool.get(method = method, display = display).screens[screen].crtcs[crtc]
     ramps = crtc.get_gamma()
     return ramps_to_function(ramps.red, ramps.green, ramps.blue)
 get_gamma.warned = False
@@ -63,9 +58,7 @@ def set_gamma(*crtcs, screen = 0, display = None, method = None):
     if not set_gamma.warned:
         set_gamma.warned = True
         print('set_gamma() is deprecated', file = sys.stderr)
-    if (method, display) not in cached_displays:
-        cached_displays[(method, display)] = output.get_outputs(method = method, display = display)
-    screen = cached_displays[(method, display)].screens[screen]
+    screen = output.display_pool.get(method = method, display = display).screens[screen]
     ramps = output.Ramps(None, depth = -1, size = i_size)
     ramps.red[:]   = r_curve
     ramps.green[:] = g_curve
@@ -406,6 +399,7 @@ class Screen:
     
     @variable  crtc_count:int       The number of CRTC:s
     @variable  output:list<Output>  List of outputs
+    @variable  generation:int       Should be incremented when an output in `outputs` is modified
     '''
     def __init__(self):
         '''
@@ -413,6 +407,29 @@ class Screen:
         '''
         self.crtc_count = 0
         self.outputs = []
+        self.generation = 0
+        self.__indices = (None, {})
+    
+    def __find(self, field, value):
+        '''
+        Find outputs using a hash index, each index is built when it is first
+        used, and all indices are rebuilt when the list of outputs is replaced,
+        when outputs are added, removed or replaced, or when `.generation` is changed
+        
+        @param   field:str      The field to look up by, a key in `Screen.fields`
+        @param   value:?        The value of the field
+        @return  :list<Output>  Matching outputs
+        '''
+        stamp = (self.generation, id(self.outputs), tuple(id(output) for output in self.outputs))
+        if self.__indices[0] != stamp:
+            self.__indices = (stamp, {})
+        indices = self.__indices[1]
+        if field not in indices:
+            index, f = {}, Screen.fields[field]
+            for output in self.outputs:
+                index.setdefault(f(output), []).append(output)
+            indices[field] = index
+        return list(indices[field].get(value, []))
     
     def find_by_crtc(self, index):
         '''
@@ -421,7 +438,7 @@ class Screen:
         @param   index:int?     The CRTC index
         @return  :list<Output>  Matching outputs
         '''
-        return [output for output in self.outputs if output.crtc == index]
+        return self.__find('crtc', index)
     
     def find_by_name(self, name):
         '''
@@ -430,7 +447,7 @@ class Screen:
         @param   name:str       The name of the output
         @return  :list<Output>  Matching outputs
         '''
-        return [output for output in self.outputs if output.name == name]
+        return self.__find('name', name)
     
     def find_by_size(self, widthmm, heightmm):
         '''
@@ -440,7 +457,7 @@ class Screen:
         @param   heightmm:int?  The physical height, measured in millimetres, of the monitor
         @return  :list<Output>  Matching outputs
         '''
-        return [out for out in self.outputs if (out.widthmm == widthmm) and (out.heightmm == heightmm)]
+        return self.__find('size', (widthmm, heightmm))
     
     def find_by_connected(self, status):
         '''
@@ -449,7 +466,7 @@ class Screen:
         @param   status:bool    Whether the output should be connected or not
         @return  :list<Output>  Matching outputs
         '''
-        return [output for output in self.outputs if output.connected == status]
+        return self.__find('connected', status)
     
     def find_by_edid(self, edid):
         '''
@@ -458,7 +475,7 @@ class Screen:
         @param   edid:str?      The extended display identification data of the monitor
         @return  :list<Output>  Matching outputs
         '''
-        return [output for output in self.outputs if output.edid == edid]
+        return self.__find('edid', edid)
     
     def __repr__(self):
         '''
@@ -468,6 +485,16 @@ class Screen:
         '''
         return '[CRTC count: %i, Outputs: %s]' % (self.crtc_count, repr(self.outputs))
 
+Screen.fields = { 'crtc'      : lambda output : output.crtc
+                , 'name'      : lambda output : output.name
+                , 'size'      : lambda output : (output.widthmm, output.heightmm)
+                , 'connected' : lambda output : output.connected
+                , 'edid'      : lambda output : output.edid
+                }
+'''
+:dict<str, (Output)→?>  The fields `Screen` can look up outputs by, and how to get their values
+'''
+
 
 class Output:
     '''
@@ -504,6 +531,9 @@ def list_screens(method = None, display = None):
     '''
     Retrieve informantion about all screens, outputs and CRTC:s
     
+    The information is cached until the CRTC:s of the display change,
+    but each call returns new objects that the caller may modify
+    
     @param   method:str?   The listing method: 'randr' for RandR (under X),
                                                'drm' for DRM (under TTY)
                                                `None` for automatic
@@ -514,25 +544,43 @@ def list_screens(method = None, display = None):
     if not list_screens.warned:
         list_screens.warned = True
         print('list_screens() is deprecated', file = sys.stderr)
-    if (method, display) not in cached_displays:
-        cached_displays[(method, display)] = output.get_outputs(method = method, display = display)
+    site = output.display_pool.get(method = method, display = display)
+    cached = list_screens.cache.get((method, display), None)
+    if (cached is None) or (cached[0] is not site) or (cached[1] != site.generation):
+        cached = (site, site.generation, __list_screens(site))
+        list_screens.cache[(method, display)] = cached
     rc = Screens()
-    rc.screens = cached_displays[(method, display)].screens
-    for screen_i, screen in enumerate(rc.screens):
-        screen.crtc_count = len(screen.crtcs)
+    rc.screens = []
+    for screen_i, outputs in enumerate(cached[2]):
+        rc.screens.append(Screen())
+        screen = rc.screens[-1]
+        screen.crtc_count = len(outputs)
         screen.outputs = [None] * screen.crtc_count
-        for crtc_i in range(screen.crtc_count):
+        for crtc_i, (name, connected, widthmm, heightmm, edid) in enumerate(outputs):
             screen.outputs[crtc_i] = output = Output()
             output.screen = screen_i
             output.crtc = crtc_i
-            crtc = screen.crtcs[crtc_i]
-            output.name = crtc.connector_name
-            output.connected = crtc.active
-            output.widthmm = crtc.width_mm
-            output.heightmm = crtc.height_mm
-            output.edid = crtc.edid
+            output.name = name
+            output.connected = connected
+            output.widthmm = widthmm
+            output.heightmm = heightmm
+            output.edid = edid
     return rc
 list_screens.warned = False
+list_screens.cache = {}
+
+
+def __list_screens(site):
+    '''
+    Retrieve the information about all outputs in a display
+    
+    @param   site:output.Display  The display
+    @return  :list<list<(name:str?, connected:bool?, widthmm:int?, heightmm:int?, edid:str?)>>
+                                  The name, connection status, physical size and EDID of
+                                  the output of each CRTC, in each screen
+    '''
+    return [[(crtc.connector_name, crtc.active, crtc.width_mm, crtc.height_mm, crtc.edid)
+             for crtc in site_screen.crtcs] for site_screen in site.screens]
 
 
 def list_screens_randr(display = None):
@@ -593,8 +641,6 @@ def quartz_restore():
     if not quartz_restore.warned:
         quartz_restore.warned = True
         print('quartz_restore() is deprecated', file = sys.stderr)
-    if ('quartz', None) not in cached_displays:
-        cached_displays[('quartz', None)] = output.get_outputs(method = 'quartz')
-    cached_displays[('quartz', None)].restore()
+    output.display_pool.get(method = 'quartz').restore()
 quartz_restore.warned = False
 
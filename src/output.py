@@ -17,11 +17,63 @@
 
 # This module is responsible for access to the monitors.
 
+import os
 import math
+import time
+import array
+import select
+import socket
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from colour import *
 from blackbody import *
 
+have_numpy = True
+try:
+    import numpy
+except:
+    have_numpy = False
+
+
+
+use_numpy = have_numpy
+'''
+:bool  Whether new gamma ramps should be stored in NumPy arrays rather than in
+       lists, NumPy arrays are much faster for large ramps; ignored if NumPy is
+       not installed
+'''
+
+edid_cache = {}
+'''
+:dict<str, EDID>  Parsed EDID:s, by the EDID in upper case hexadecimal representation,
+                  shared by the whole process, see `parse_edid`
+'''
+
+change_threshold = None
+'''
+:float?  If not `None`, writes of gamma ramps to a CRTC are skipped, unless forced, if no
+         sampled stop of the ramps differs by at least this much, measured in ∆E*_ab,
+         from the ramps that were last applied to the CRTC
+'''
+
+change_samples = 17
+'''
+:int  The number of evenly spaced stops that are compared when `change_threshold` is used
+'''
+
+applied_count = 0
+'''
+:int  The number of times ramps have been applied to a CRTC while `change_threshold` was used
+'''
+
+skipped_count = 0
+'''
+:int  The number of times a write to a CRTC has been skipped because of `change_threshold`
+'''
+
 
 
 class Tristate:
@@ -220,7 +272,7 @@ class EDID:
         self.blue_chroma  = (bx / 1024, by / 1024)
         self.white_chroma = (wx / 1024, wy / 1024)
         # There are also mode lines and maybe extensions, but yeah...
-
+    
     
     ## FOR LEGACY {
     @property
@@ -287,8 +339,20 @@ EDID.warned_gamma_correction = False
 class MultiCRTC:
     '''
     A group of CRTC:s organised for efficient gamma ramp adjustments
+    
+    @variable  skipped_writes:int  The number of writes, summed over all CRTC:s, that have been
+                                   skipped because the ramps were identical to the last applied
+                                   ramps (read-only)
+    @variable  workers:int         The maximum number of CRTC:s that are written to concurrently,
+                                   1 to write to them one at a time
+    @variable  pool:ThreadPoolExecutor?  The threads that write to the CRTC:s, `None` until needed
+    @variable  conversions:OrderedDict<tuple, Ramps>
+                                   Ramps converted to the sizes and depths of the CRTC:s, keyed by
+                                   the source ramps' contents and the target size and depth, in
+                                   order of last use
+    @variable  conversions_capacity:int  The maximum number of cached converted ramps
     '''
-    def __init__(self, crtcs, interpolation = None):
+    def __init__(self, crtcs, interpolation = None, workers = 1):
         '''
         Constructor
         
@@ -298,8 +362,17 @@ class MultiCRTC:
                                  Function used to interpolate gamma ramps to new dimentions,
                                  `None` for the default interpolator, which is intentionally
                                  unspecified
+        @param  workers:int      The maximum number of CRTC:s to write to concurrently, 1 to
+                                 write to them one at a time. Concurrent writes are useful if
+                                 the CRTC:s are on different screens or graphics cards, or if
+                                 the display server is remote, but requires that the backends
+                                 are thread-safe
         '''
         self.interpolation = interpolation
+        self.workers = workers
+        self.pool = None
+        self.conversions = OrderedDict()
+        self.conversions_capacity = 16
         self.layers = []
         for crtc in crtcs:
             self.add(crtc)
@@ -346,6 +419,37 @@ class MultiCRTC:
         subsubfound.append(crtc)
     
     
+    def remove(self, crtc):
+        '''
+        Remove a CRTC
+        
+        @param  crtc:CRTC  The CRTC to remove
+        '''
+        for layer in self.layers:
+            for sublayer in layer:
+                for subsublayer in sublayer:
+                    if crtc in subsublayer:
+                        subsublayer.remove(crtc)
+        # Remove layers that have become empty
+        for layer in self.layers:
+            for sublayer in layer:
+                sublayer[:] = [subsublayer for subsublayer in sublayer if len(subsublayer) > 0]
+            layer[:] = [sublayer for sublayer in layer if len(sublayer) > 0]
+        self.layers[:] = [layer for layer in self.layers if len(layer) > 0]
+    
+    
+    @property
+    def skipped_writes(self):
+        '''
+        Get the number of writes that have been skipped
+        
+        @return  :int  The number of writes, summed over all CRTC:s, that have been skipped
+                       because the ramps were identical to the last applied ramps
+        '''
+        return sum(crtc.skipped_writes for layer in self.layers for sublayer in layer
+                   for subsublayer in sublayer for crtc in subsublayer)
+    
+    
     def make_ramps(self, depth = -2):
         '''
         Create a gamma-ramp trio where each ramp is as large as the
@@ -367,10 +471,12 @@ class MultiCRTC:
         return Ramps(None, depth = depth, size = size)
     
     
-    def set_gamma(self, ramps, priority = None, rule = None, lifespan = 1):
+    def set_gamma(self, ramps, priority = None, rule = None, lifespan = 1, force = False):
         '''
         Set the gamma ramps on all CRTC:s in the group
         
+        Writes to CRTC:s whose last applied ramps are identical to the new ramps are skipped
+        
         @param  ramps:Ramps    The gamma ramps
         @param  priority:int?  The priority of the adjustment, `None` for the default.
                                Must be `None` (default) if cooperative gamma is not supported.
@@ -381,33 +487,128 @@ class MultiCRTC:
                                Must be `None` (default) if cooperative gamma is not supported.
         @param  lifespan:int   The lifespan of the algorithm: `Lifespan.UNTIL_DEATH`,
                                `Lifespan.UNTIL_REMOVAL` (default), or `Lifespan.REMOVE`
+        @param  force:bool     Whether to write the ramps even if they are identical to the
+                               last applied ramps, for example if another program may have
+                               changed the ramps
         '''
         if lifespan == Lifespan.REMOVE:
+            jobs = []
             for layer in self.layers:
                 for sublayer in layer:
                     for subsublayer in sublayer:
                         for crtc in subsublayer:
-                            crtc.set_gamma(None, priority, rule, lifespan)
+                            jobs.append((crtc, None))
+            self.__dispatch(jobs, priority, rule, lifespan, force)
             return
         
+        jobs = []
+        ramps.evaluate()
+        source = None
         for layer in self.layers:
             ref = layer[0][0][0]
             refsize = (ref.red_gamma_size, ref.green_gamma_size, ref.blue_gamma_size)
             if refsize == (len(ramps.red), len(ramps.green), len(ramps.blue)):
                 ramps_size = ramps
             else:
-                ramps_size = Ramps.copy(ramps, refcrtc.depth, refsize)
+                if source is None:
+                    source = self.__source_key(ramps)
+                ramps_size = self.__convert(source, ramps, ramps.depth, refsize)
             for sublayer in layer:
                 ref = sublayer[0][0]
                 refdepth = ref.gamma_depth
                 if refdepth == ramps_size.depth:
                     ramps_depth = ramps_size
                 else:
-                    ramps_depth = Ramps.copy(ramps, refdepth, refsize)
+                    if source is None:
+                        source = self.__source_key(ramps)
+                    ramps_depth = self.__convert(source, ramps_size, refdepth, refsize)
                 for subsublayer in sublayer:
+                    # The conversions are shared, but the CRTC:s are written concurrently
+                    if self.workers > 1:
+                        jobs.extend((crtc, ramps_depth) for crtc in subsublayer)
+                        continue
                     ramps_backend = ramps_depth
                     for crtc in subsublayer:
-                        ramps_backend = crtc.set_gamma(ramps_backend, priority, rule, lifespan)
+                        ramps_backend = crtc.set_gamma(ramps_backend, priority, rule, lifespan, force)
+        self.__dispatch(jobs, priority, rule, lifespan, force)
+    
+    
+    def __source_key(self, ramps):
+        '''
+        Identify ramps by their exact contents
+        
+        @param   ramps:Ramps  The ramps
+        @return  :tuple       A key that is identical for ramps with identical contents
+        '''
+        digest = hashlib.blake2b(digest_size = 16)
+        for ramp in (ramps.red, ramps.green, ramps.blue):
+            digest.update(len(ramp).to_bytes(8, 'little'))
+            digest.update(ramp.tobytes() if ramps.ndarray else array.array('d', ramp))
+        return (ramps.depth, ramps.ndarray, digest.digest())
+    
+    
+    def __convert(self, source, ramps, depth, size):
+        '''
+        Convert ramps to another size or depth, reusing earlier conversions
+        
+        @param   source:tuple              The key of the ramps given to `set_gamma`
+        @param   ramps:Ramps               The ramps to convert, `ramps` given to `set_gamma`,
+                                           or a conversion of it to `size`
+        @param   depth:int                 The depth to convert to
+        @param   size:(int, int, int)      The size to convert to
+        @return  :Ramps                    The converted ramps, they must not be modified
+        '''
+        key = (source, self.interpolation, depth, size)
+        converted = self.conversions.get(key, None)
+        if converted is not None:
+            self.conversions.move_to_end(key)
+            return converted
+        if size == (len(ramps.red), len(ramps.green), len(ramps.blue)):
+            converted = Ramps.copy(ramps, depth)
+        else:
+            # Scale up by interpolation, and scale down by decimation
+            converted = Ramps.copy(ramps, depth, size, self.interpolation)
+        self.conversions[key] = converted
+        while len(self.conversions) > self.conversions_capacity:
+            self.conversions.popitem(last = False)
+        return converted
+    
+    
+    def __dispatch(self, jobs, priority, rule, lifespan, force):
+        '''
+        Set the gamma ramps on CRTC:s, concurrently if `.workers` is greater than 1
+        
+        If any write fails, the other writes are still completed, and
+        then the exception of the first failed write is raised
+        
+        @param  jobs:list<(CRTC, Ramps?)>  The CRTC:s and the ramps to write to them
+        @param  priority:int?              See `set_gamma`
+        @param  rule:str?                  See `set_gamma`
+        @param  lifespan:int               See `set_gamma`
+        @param  force:bool                 See `set_gamma`
+        '''
+        if (self.workers <= 1) or (len(jobs) <= 1):
+            for crtc, ramps in jobs:
+                crtc.set_gamma(ramps, priority, rule, lifespan, force)
+            return
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers = self.workers)
+        futures = [self.pool.submit(crtc.set_gamma, ramps, priority, rule, lifespan, force)
+                   for crtc, ramps in jobs]
+        errors = [future.exception() for future in futures]
+        errors = [error for error in errors if error is not None]
+        if len(errors) > 0:
+            raise errors[0]
+    
+    
+    def close(self):
+        '''
+        Stop the threads used for concurrent writes, they
+        will be restarted if they are needed again
+        '''
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
 
 
 class CRTC:
@@ -418,6 +619,7 @@ class CRTC:
                                      defaults, `None` if not supported
     
     @variable  screen:Screen          The screen
+    @variable  index:int?             The index of the CRTC in its screen
     @variable  edid:str?              The EDID in upper case hexadecimal representation
     @variable  red_gamma_size:int?    The number of stops in the red gamma ramp
     @variable  green_gamma_size:int?  The number of stops in the green gamma ramp
@@ -441,6 +643,15 @@ class CRTC:
     @variable  connector_name:str?    The connector name
     @variable  connector_type:str?    The connector type
     @variable  ramps                  Gamma ramps, you should not use it directly (INTERNAL)
+    @variable  fingerprint:bytes?     The fingerprint of the last applied gamma ramps, `None`
+                                      if unknown, writes of identical ramps are skipped
+    @variable  skipped_writes:int     The number of writes that have been skipped because
+                                      the ramps were identical to the last applied ramps
+    @variable  samples:(bytes, list<float>, list<float>, list<float>)?
+                                      The fingerprint of the last applied gamma ramps, and the
+                                      L*, a* and b* components of their stops sampled for
+                                      `change_threshold`, see `ramps_samples`; the samples are
+                                      only used while the fingerprint is `.fingerprint`
     @variable  cooperative:bool       Whether cooperative gamma is supported
     @variable  default_rule:str       The default cooperative gamma rule (part of the class (filter identifier))
     @variable  default_priority:int   The default cooperative gamma priority (filter order)
@@ -501,6 +712,7 @@ class CRTC:
         Constructor
         '''
         self.__edid_data = ...
+        self.index = None
         self.edid = None
         self.red_gamma_size = None
         self.green_gamma_size = None
@@ -512,6 +724,9 @@ class CRTC:
         self.connector_name = None
         self.connector_type = None
         self.ramps = None
+        self.fingerprint = None
+        self.skipped_writes = 0
+        self.samples = None
         self.cooperative = False
         self.default_rule = 'standard'
         self.default_priority = 1 << 59
@@ -576,14 +791,75 @@ class CRTC:
         '''
         Get parsed EDID information for the CRTC
         
-        @return  :EDID  Parsed EDID information
+        @return  :EDID  Parsed EDID information, it is shared with other CRTC:s
+                        with the same EDID and must not be modified
+        '''
+        edid = self.edid
+        if (self.__edid_data is ...) or (self.__edid_data[0] != edid):
+            self.__edid_data = (edid, None if edid is None else parse_edid(edid))
+        return self.__edid_data[1]
+
+
+class CRTCLookup:
+    '''
+    Lookup of CRTC:s by their properties, for classes with the list of
+    CRTC:s in `crtcs` and a counter in `generation` that is incremented
+    whenever the CRTC:s change
+    '''
+    def find_by_crtc(self, index):
+        '''
+        Find CRTC:s by their index in their screen
+        
+        @param   index:int       The index of the CRTC
+        @return  :list<CRTC>     Matching CRTC:s
+        '''
+        return self.__find('index', index)
+    
+    
+    def find_by_name(self, name):
+        '''
+        Find CRTC:s by their connector name
+        
+        @param   name:str        The connector name
+        @return  :list<CRTC>     Matching CRTC:s
         '''
-        if self.__edid_data is ...:
-            self.__edid_data = None if self.edid is None else EDID(self.edid)
-        return self.__edid_data
+        return self.__find('connector_name', name)
+    
+    
+    def find_by_edid(self, edid):
+        '''
+        Find CRTC:s by the EDID of their monitors
+        
+        @param   edid:str        The EDID in hexadecimal representation
+        @return  :list<CRTC>     Matching CRTC:s
+        '''
+        return self.__find('edid', edid.upper())
+    
+    
+    def __find(self, field, value):
+        '''
+        Find CRTC:s using a hash index, each index is built when it is first used,
+        and all indices are rebuilt when `.generation` is changed
+        
+        @param   field:str       The attribute of the CRTC:s to look up by
+        @param   value:?         The value of the attribute
+        @return  :list<CRTC>     Matching CRTC:s
+        '''
+        stamp = (self.generation, id(self.crtcs), len(self.crtcs))
+        if self.__dict__.get('_indexes_stamp', None) != stamp:
+            (self._indexes, self._indexes_stamp) = ({}, stamp)
+        if field not in self._indexes:
+            index = {}
+            for crtc in self.crtcs:
+                key = getattr(crtc, field)
+                if (field == 'edid') and isinstance(key, str):
+                    key = key.upper()
+                index.setdefault(key, []).append(crtc)
+            self._indexes[field] = index
+        return list(self._indexes[field].get(value, []))
 
 
-class Screen:
+class Screen(CRTCLookup):
     '''
     A screen or graphics card
     
@@ -592,6 +868,8 @@ class Screen:
     
     @variable  display:Display           The display
     @variable  crtcs:list<LibgammaCRTC>  The CRTC:s in the screen
+    @variable  generation:int            Incremented whenever the CRTC:s change, for example
+                                         when monitors are connected or disconnected
     '''
     def __len__(self):
         '''
@@ -622,7 +900,7 @@ class Screen:
             yield value
 
 
-class Display:
+class Display(CRTCLookup):
     '''
     A display
     
@@ -632,6 +910,8 @@ class Display:
     @variable  screens:list<LibgammaScreen>  The screens in the display
     @variable  crtcs:list<LibgammaCRTC>      The CRTC:s in the display
     @variable  cooperative:bool              Whether the adjustment method supports cooperative gamma
+    @variable  generation:int                Incremented whenever the screens or CRTC:s change, for
+                                             example when monitors are connected or disconnected
     '''
     def __len__(self):
         '''
@@ -662,54 +942,225 @@ class Display:
             yield value
 
 
+Screen.generation = 0
+Display.generation = 0
+
+
+class Pipeline:
+    '''
+    A lazily evaluated chain of adjustments on gamma ramps, where each
+    adjustment only depends on the value of the stop it adjusts
+    
+    The stages of each channel are fused so that the channel is evaluated
+    in one pass, and adjacent scaling, offsetting and clipping stages are
+    collapsed algebraically into at most one affine stage followed by at
+    most one clamping stage
+    
+    @variable  stages:(list<(kind:str, *parameters)>, list<(kind:str, *parameters)>, list<(kind:str, *parameters)>)
+                 The stages to apply to the red, green and blue channel,
+                 respectively, in order. The stages are
+                 `('affine', a:float, b:float)` for y ↦ a·y + b,
+                 `('clamp', lo:float?, hi:float?)` for clipping into [`lo`, `hi`],
+                 where `None` means unbounded, `('power', p:float)` for y ↦ yᵖ, and
+                 `('function', f:(float)→float, v:(ndarray)?→ndarray)` for y ↦ f(y),
+                 where `v` is an optional vectorised version of `f`
+    '''
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.stages = ([], [], [])
+    
+    
+    def __len__(self):
+        '''
+        Get the number of pending stages
+        
+        @return  :int  The number of stages, summed over all channels
+        '''
+        return sum(len(stages) for stages in self.stages)
+    
+    
+    def append(self, channel, kind, *parameters):
+        '''
+        Add a stage to the end of the chain of a channel
+        
+        @param  channel:int     0 for the red channel, 1 for the green channel,
+                                and 2 for the blue channel
+        @param  kind:str        The kind of stage: 'affine', 'clamp', 'power' or 'function'
+        @param  parameters:*    The parameters of the stage, see the documentation of `stages`
+        '''
+        stages = self.stages[channel]
+        if kind == 'affine':
+            (a, b) = parameters
+            # A clamp followed by y ↦ a·y + b is the same as
+            # y ↦ a·y + b followed by the clamp with mapped bounds
+            clamp = None
+            if len(stages) > 0 and stages[-1][0] == 'clamp':
+                clamp = stages.pop()
+            (a_, b_) = (a, b)
+            if len(stages) > 0 and stages[-1][0] == 'affine':
+                (_, a0, b0) = stages.pop()
+                (a_, b_) = (a0 * a, b0 * a + b)
+            if not (a_ == 1 and b_ == 0):
+                stages.append(('affine', a_, b_))
+            if clamp is not None and not a == 0:
+                (_, lo, hi) = clamp
+                lo = None if lo is None else lo * a + b
+                hi = None if hi is None else hi * a + b
+                self.append(channel, 'clamp', *((lo, hi) if a > 0 else (hi, lo)))
+        elif kind == 'clamp':
+            (lo, hi) = parameters
+            if len(stages) > 0 and stages[-1][0] == 'clamp':
+                # The composition of two clamps is a clamp, whose bounds
+                # are the bounds of the first clamp clamped by the second
+                (_, lo0, hi0) = stages.pop()
+                def bound(v):
+                    if lo is not None:  v = max(v, lo)
+                    if hi is not None:  v = min(v, hi)
+                    return v
+                (lo, hi) = (lo if lo0 is None else bound(lo0), hi if hi0 is None else bound(hi0))
+            if not (lo is None and hi is None):
+                stages.append(('clamp', lo, hi))
+        else:
+            stages.append((kind, *parameters))
+    
+    
+    def discard(self, channel):
+        '''
+        Remove all pending stages of a channel
+        
+        @param  channel:int  0 for the red channel, 1 for the green channel,
+                             and 2 for the blue channel
+        '''
+        self.stages[channel][:] = []
+    
+    
+    def evaluate(self, channel, curve, ndarray):
+        '''
+        Apply, and remove, all pending stages of a channel
+        
+        @param  channel:int                The channel that `curve` is, 0 for the red
+                                           channel, 1 for the green channel, and 2 for
+                                           the blue channel
+        @param  curve:list<float>|ndarray  The ramp to update in place
+        @param  ndarray:bool               Whether `curve` is a NumPy array
+        '''
+        stages = self.stages[channel][:]
+        self.discard(channel)
+        if len(stages) == 0:
+            return
+        if ndarray:
+            for stage in stages:
+                kind = stage[0]
+                if kind == 'affine':
+                    curve *= stage[1]
+                    curve += stage[2]
+                elif kind == 'clamp':
+                    numpy.clip(curve, stage[1], stage[2], out = curve)
+                elif kind == 'power':
+                    with numpy.errstate(invalid = 'ignore'):
+                        numpy.power(curve, stage[1], out = curve)
+                elif stage[2] is not None:
+                    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+                        curve[:] = stage[2](curve)
+                else:
+                    curve[:] = [stage[1](y) for y in curve.tolist()]
+            return
+        # Fuse all stages into a single expression, and evaluate it in one pass
+        (expr, namespace) = ('y', {'curve' : curve})
+        for i, stage in enumerate(stages):
+            kind = stage[0]
+            if kind == 'affine':
+                expr = '(%s) * a%i + b%i' % (expr, i, i)
+                namespace['a%i' % i], namespace['b%i' % i] = stage[1], stage[2]
+            elif kind == 'clamp':
+                if stage[1] is not None:
+                    expr = 'max(lo%i, %s)' % (i, expr)
+                    namespace['lo%i' % i] = stage[1]
+                if stage[2] is not None:
+                    expr = 'min(%s, hi%i)' % (expr, i)
+                    namespace['hi%i' % i] = stage[2]
+            elif kind == 'power':
+                expr = '(%s) ** p%i' % (expr, i)
+                namespace['p%i' % i] = stage[1]
+            else:
+                expr = 'f%i(%s)' % (i, expr)
+                namespace['f%i' % i] = stage[1]
+        curve[:] = eval('[%s for y in curve]' % expr, namespace)
+
+
 class Ramps:
     '''
     Gamma ramps
     
-    @variable  red:list<float>    The gamma ramp of the red channel
-    @variable  green:list<float>  The gamma ramp of the green channel
-    @variable  blue:list<float>   The gamma ramp of the blue channel
-    @variable  depth:int          The gamma depth, 8 for unsigned 8-bit integers,
-                                  16 for unsigned 16-bit integers, 32 for unsigned
-                                  32-bit integers, 64 for unsigned 64-bit integers,
-                                  -1 for single-precision floating-point values, and
-                                  -2 for double-precision floating-point values
-    @variable  maximum:float      The largest stop value
+    @variable  red:list<float>|ndarray    The gamma ramp of the red channel
+    @variable  green:list<float>|ndarray  The gamma ramp of the green channel
+    @variable  blue:list<float>|ndarray   The gamma ramp of the blue channel
+    @variable  depth:int                  The gamma depth, 8 for unsigned 8-bit integers,
+                                          16 for unsigned 16-bit integers, 32 for unsigned
+                                          32-bit integers, 64 for unsigned 64-bit integers,
+                                          -1 for single-precision floating-point values, and
+                                          -2 for double-precision floating-point values
+    @variable  maximum:float              The largest stop value
+    @variable  ndarray:bool               Whether the ramps are stored in NumPy arrays
+                                          rather than in lists
+    @variable  pipeline:Pipeline?         Adjustments that have been recorded but not yet
+                                          applied, `None` unless the ramps are lazy
     '''
-    def __init__(self, crtc, depth = None, size = None):
+    def __init__(self, crtc, depth = None, size = None, ndarray = None, lazy = False):
         '''
         Constructor
         
-        @param  crtc:CRTC?  The CRTC the ramps should match, may
-                            only be `None` if neither `depth` nor
-                            `size` is `None`
-        @param  depth:int?  The gamma depth, 8 for unsigned 8-bit integers,
-                            16 for unsigned 16-bit integers, 32 for unsigned
-                            32-bit integers, 64 for unsigned 64-bit integers,
-                            -1 for single-precision floating-point values,
-                            -2 for double-precision floating-point values, and
-                            `None` for the gamma depth the CRTC expects
+        @param  crtc:CRTC?     The CRTC the ramps should match, may
+                               only be `None` if neither `depth` nor
+                               `size` is `None`
+        @param  depth:int?     The gamma depth, 8 for unsigned 8-bit integers,
+                               16 for unsigned 16-bit integers, 32 for unsigned
+                               32-bit integers, 64 for unsigned 64-bit integers,
+                               -1 for single-precision floating-point values,
+                               -2 for double-precision floating-point values, and
+                               `None` for the gamma depth the CRTC expects
         @param  size:int|(red:int, green:int, blue:int)?
-                            The size of the ramps, either an integer of the size that
-                            is applied to all three channels, three integers with
-                            the size of each channel, or `None` for the sizes the
-                            CRTC expects
+                               The size of the ramps, either an integer of the size that
+                               is applied to all three channels, three integers with
+                               the size of each channel, or `None` for the sizes the
+                               CRTC expects
+        @param  ndarray:bool?  Whether to store the ramps in NumPy arrays, `None` for
+                               the value of `use_numpy`. Lists are used if NumPy is
+                               not installed.
+        @param  lazy:bool      Whether adjustments that only depend on the value of
+                               each stop should be recorded, and later applied in one
+                               fused pass by `evaluate`, rather than be applied at once
         '''
         if depth is None:
-            depth = crtc.depth
+            depth = crtc.gamma_depth
         if size is not None and isinstance(size, int):
             size = (size, size, size)
+        if ndarray is None:
+            ndarray = use_numpy
+        self.ndarray = bool(ndarray) and have_numpy
+        self.pipeline = Pipeline() if lazy else None
         self.depth = depth
         self.maximum = 1 if depth < 0 else (1 << depth) - 1
-        if depth > 0:
-            def make_ramp(depth, size):
-                return [int(x * self.maximum / (size - 1) + 0.5) for x in range(size)]
-        else:
-            def make_ramp(depth, size):
-                return [x / (size - 1) for x in range(size)]
-        self.red   = make_ramp(self.depth, crtc.red_gamma_size   if size is None else size[0])
-        self.green = make_ramp(self.depth, crtc.green_gamma_size if size is None else size[1])
-        self.blue  = make_ramp(self.depth, crtc.blue_gamma_size  if size is None else size[2])
+        self.red   = self.__make_ramp(crtc.red_gamma_size   if size is None else size[0])
+        self.green = self.__make_ramp(crtc.green_gamma_size if size is None else size[1])
+        self.blue  = self.__make_ramp(crtc.blue_gamma_size  if size is None else size[2])
+    
+    
+    def __make_ramp(self, size):
+        '''
+        Create an identity mapping ramp
+        
+        @param   size:int                The number of stops in the ramp
+        @return  :list<float>|ndarray    The ramp
+        '''
+        if self.ndarray:
+            ramp = numpy.arange(size, dtype = numpy.float64) * (self.maximum / (size - 1))
+            return numpy.floor(ramp + 0.5) if self.depth > 0 else ramp
+        if self.depth > 0:
+            return [int(x * self.maximum / (size - 1) + 0.5) for x in range(size)]
+        return [x / (size - 1) for x in range(size)]
     
     
     def copy(self, depth = None, size = None, interpolation = None):
@@ -732,26 +1183,41 @@ class Ramps:
                              Function used for interpolation used for resizing the
                              ramps. `None` for the default, which is intentionally
                              unspecified.
-        @return  :Ramps      The copy
+        @return  :Ramps      The copy, it will use the same storage, and
+                             laziness, as the original
         '''
+        self.evaluate()
         if size is None:
             size = (len(self.red), len(self.green), len(self.blue))
-        r = Ramps(None, self.depth if depth is None else depth, size)
+        r = Ramps(None, self.depth if depth is None else depth, size,
+                  ndarray = self.ndarray, lazy = self.pipeline is not None)
         ramps = (self.red, self.green, self.blue)
         if len(self.red) == len(r.red) and len(self.green) == len(r.green) and len(self.blue) == len(r.blue):
             pass
-        elif interpolation is None:
+        elif self.ndarray and (interpolation is None):
+            # Resize with the arrays, using the default interpolator
             import interpolation as interpol
-            ramps = interpol.linearly_interpolate_ramp(*ramps, size = size)
+            ramps = [interpol.linearly_resample_array(ramp, len(out))
+                     for ramp, out in zip(ramps, (r.red, r.green, r.blue))]
         else:
-            ramps = interpolation(*ramps, size = size)
+            if self.ndarray:
+                ramps = [ramp.tolist() for ramp in ramps]
+            if interpolation is None:
+                import interpolation as interpol
+                ramps = interpol.linearly_interpolate_ramp(*ramps, size = size)
+            else:
+                ramps = interpolation(*ramps, size = size)
         r.red[:]   = ramps[0]
         r.green[:] = ramps[1]
         r.blue[:]  = ramps[2]
         if r.maximum != self.maximum:
-            for ramp in (r.red, r.green, r.blue):
-                for i in range(len(ramp)):
-                    ramp[i] = ramp[i] * r.maximum / self.maximum
+            if r.ndarray:
+                for ramp in (r.red, r.green, r.blue):
+                    ramp *= r.maximum / self.maximum
+            else:
+                for ramp in (r.red, r.green, r.blue):
+                    for i in range(len(ramp)):
+                        ramp[i] = ramp[i] * r.maximum / self.maximum
         return r
     
     
@@ -762,10 +1228,14 @@ class Ramps:
         @param   compact:bool  Whether to apply run-length compression when suitable
         @return  :str          A printable string
         '''
+        self.evaluate()
+        ramps = (self.red, self.green, self.blue)
+        if self.ndarray:
+            ramps = [ramp.tolist() for ramp in ramps]
         if not compact:
-            return '%s\n%s\n%s' % (repr(red), repr(green), repr(blue))
+            return '%s\n%s\n%s' % tuple(repr(ramp) for ramp in ramps)
         rgb = ([], [], [])
-        for r, w in zip((self.red, self.green, self.blue), rgb):
+        for r, w in zip(ramps, rgb):
             last, count = None, 0
             for value in r:
                 if self.depth > 0:
@@ -808,6 +1278,75 @@ class Ramps:
         return ret
     
     
+    def __lazy(self, r, g, b, stages):
+        '''
+        Record adjustments in the pipeline, if the ramps are lazy
+        
+        @param   r:?                          The parameter for the red channel, `None` to skip it
+        @param   g:?|...                      The parameter for the green channel, defaults to `r` if `...`
+        @param   b:?|...                      The parameter for the blue channel, defaults to `g` if `...`
+        @param   stages:(?)→list<(str, *)>    Function that maps a parameter to the stages to record
+        @return  :bool                        Whether the adjustments were recorded, `False`
+                                              if the ramps are not lazy
+        '''
+        if self.pipeline is None:
+            return False
+        if g is ...:  g = r
+        if b is ...:  b = g
+        for channel, value in enumerate((r, g, b)):
+            if value is not None:
+                for stage in stages(value):
+                    self.pipeline.append(channel, *stage)
+        return True
+    
+    
+    def __tabulate(self, r, g, b, neutral, function):
+        '''
+        Apply a transfer function, using a memoised table, on the curves that
+        are identity mappings and do not have any pending adjustments
+        
+        Curves stored in NumPy arrays are left to the vectorised implementations
+        
+        @param   r:?                            The parameter for the red channel
+        @param   g:?|...                        The parameter for the green channel, defaults to `r` if `...`
+        @param   b:?|...                        The parameter for the blue channel, defaults to `g` if `...`
+        @param   neutral:?                      The parameter that leaves a channel unchanged
+        @param   function:(?)→(str, float?)?    Function that maps a parameter, other than `neutral`,
+                                                to the transfer function and its parameter, see
+                                                `transfer_table`, or to `None` if the channel
+                                                should be left unchanged
+        @return  :(?, ?, ?)                     The parameters for the channels, with `neutral`
+                                                for the channels that have been adjusted
+        '''
+        if g is ...:  g = r
+        if b is ...:  b = g
+        if self.ndarray:
+            return (r, g, b)
+        ret = []
+        for channel, (curve, value) in enumerate(zip((self.red, self.green, self.blue), (r, g, b))):
+            key = None if value is neutral else function(value)
+            if key is None:
+                ret.append(value)
+            elif self.pipeline is not None and len(self.pipeline.stages[channel]) > 0:
+                ret.append(value)
+            elif not curve == transfer_table('identity', None, len(curve), self.depth):
+                ret.append(value)
+            else:
+                curve[:] = transfer_table(*key, len(curve), self.depth)
+                ret.append(neutral)
+        return tuple(ret)
+    
+    
+    def evaluate(self):
+        '''
+        Apply all adjustments that have been recorded, but not yet
+        applied, because the ramps are lazy; does nothing otherwise
+        '''
+        if self.pipeline is not None and len(self.pipeline) > 0:
+            for channel, curve in enumerate((self.red, self.green, self.blue)):
+                self.pipeline.evaluate(channel, curve, self.ndarray)
+    
+    
     def temperature(self, temperature, algorithm):
         '''
         Change colour temperature according to the CIE illuminant series D using CIE sRBG
@@ -860,9 +1399,16 @@ class Ramps:
         @param  b:float|...?  The contrast parameter for the blue curve, defaults to `g` if `...`
         '''
         half = self.maximum / 2
-        for (curve, level) in self.__value(r, g, b):
+        if self.__lazy(r, g, b, lambda level : [] if level == 1.0 else [('affine', level, half - half * level)]):
+            return
+        for (curve, level) in self.__datum(r, g, b):
             if not level == 1.0:
-                curve[:] = [(y - half) * level + half for y in curve]
+                if self.ndarray:
+                    curve -= half
+                    curve *= level
+                    curve += half
+                else:
+                    curve[:] = [(y - half) * level + half for y in curve]
     
     
     def cie_contrast(self, r, g = ..., b = ...):
@@ -876,38 +1422,19 @@ class Ramps:
         @param  g:float|...?  The contrast parameter for the green curve, defaults to `r` if `...`
         @param  b:float|...?  The contrast parameter for the blue curve, defaults to `g` if `...`
         '''
+        self.evaluate()
         # Handle overloading
         if g is ...:  g = r
         if b is ...:  b = g
-        # Check if we can reduce the overhead, we can if the adjustments are identical
-        same = r == g == b
-        # Check we need to do any adjustment
-        if (not same) or (not r == 1.0):
-            if same:
-                if r is None:
-                    return
-                # Manipulate all curves in one step if their adjustments are identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    # Manipulate illumination and convert back to sRGB
-                    (r_, g_, b_) = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)
-                    if r:  self.red[i]   = r_ * self.maximum
-                    if g:  self.green[i] = g_ * self.maximum
-                    if b:  self.blue[i]  = b_ * self.maximum
-            else:
-                # Manipulate all curves individually if their adjustments are not identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    # Manipulate illumination and convert back to sRGB
-                    if r:  self.red[i]   = ciexyy_to_srgb(x, y, (Y - 0.5) * r + 0.5)[0] * self.maximum
-                    if g:  self.green[i] = ciexyy_to_srgb(x, y, (Y - 0.5) * g + 0.5)[1] * self.maximum
-                    if b:  self.blue[i]  = ciexyy_to_srgb(x, y, (Y - 0.5) * b + 0.5)[2] * self.maximum
+        # Do nothing if the adjustments are neutral
+        if (r == g == b) and ((r is None) or (r == 1.0)):
+            return
+        # Share the adjustment between the curves if their adjustments are identical
+        contrast = {}
+        for level in (r, g, b):
+            if level and (level not in contrast):
+                contrast[level] = lambda Y, level = level : (Y - 0.5) * level + 0.5
+        self.__cie(*[contrast[level] if level else None for level in (r, g, b)])
     
     
     def rgb_brightness(self, r, g = ..., b = ...):
@@ -920,9 +1447,14 @@ class Ramps:
         @param  g:float|...?  The brightness parameter for the green curve, defaults to `r` if `...`
         @param  b:float|...?  The brightness parameter for the blue curve, defaults to `g` if `...`
         '''
-        for (curve, level) in curves(r, g, b):
+        if self.__lazy(r, g, b, lambda level : [] if level == 1.0 else [('affine', level, 0)]):
+            return
+        for (curve, level) in self.__datum(r, g, b):
             if not level == 1.0:
-                curve[:] = [y * level for y in curve]
+                if self.ndarray:
+                    curve *= level
+                else:
+                    curve[:] = [y * level for y in curve]
     
     
     def cie_brightness(self, r, g = ..., b = ...):
@@ -935,37 +1467,19 @@ class Ramps:
         @param  g:float|...?  The brightness parameter for the green curve, defaults to `r` if `...`
         @param  b:float|...?  The brightness parameter for the blue curve, defaults to `g` if `...`
         '''
+        self.evaluate()
         # Handle overloading
         if g is ...:  g = r
         if b is ...:  b = g
-        # Check if we can reduce the overhead, we can if the adjustments are identical
-        same = r == g == b
-        # Check we need to do any adjustment
-        if (not same) or (not r == 1.0):
-            if same:
-                if r is None:
-                    return
-                # Manipulate all curves in one step if their adjustments are identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    (r_, g_, b_) = ciexyy_to_srgb(x, y, Y * r)
-                    if r:  self.red[i]   = r_ * self.maximum
-                    if g:  self.green[i] = g_ * self.maximum
-                    if b:  self.blue[i]  = b_ * self.maximum
-            else:
-                # Manipulate all curves individually if their adjustments are not identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    # Manipulate illumination and convert back to sRGB
-                    if r:  self.red[i]   = ciexyy_to_srgb(x, y, Y * r)[0] * self.maximum
-                    if g:  self.green[i] = ciexyy_to_srgb(x, y, Y * g)[1] * self.maximum
-                    if b:  self.blue[i]  = ciexyy_to_srgb(x, y, Y * b)[2] * self.maximum
+        # Do nothing if the adjustments are neutral
+        if (r == g == b) and ((r is None) or (r == 1.0)):
+            return
+        # Share the adjustment between the curves if their adjustments are identical
+        brightness = {}
+        for level in (r, g, b):
+            if level and (level not in brightness):
+                brightness[level] = lambda Y, level = level : Y * level
+        self.__cie(*[brightness[level] if level else None for level in (r, g, b)])
     
     
     def linearise(self, r = True, g = ..., b = ...):
@@ -976,19 +1490,9 @@ class Ramps:
         @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
         '''
-        # Handle overloading
-        if g is ...:  g = r
-        if b is ...:  b = g
-        # Convert colour space
-        if not r and not g and not b:
-            return
-        for i in range(i_size):
-            (r_, g_, b_) = standard_to_linear(self.red[i] / self.maximum,
-                                              self.green[i] / self.maximum,
-                                              self.blue[i] / self.maximum)
-            if r:  self.red[i]   = r_ * self.maximum
-            if g:  self.green[i] = g_ * self.maximum
-            if b:  self.blue[i]  = b_ * self.maximum
+        f = lambda c : standard_to_linear(c)[0]
+        v = lambda c : numpy.where(c <= 0.04045, c / 12.92, ((c + 0.055) / (1 + 0.055)) ** 2.4)
+        self.__transfer(r, g, b, 'linearise', f, v)
     
     
     def standardise(self, r = True, g = ..., b = ...):
@@ -999,19 +1503,32 @@ class Ramps:
         @param  g:bool|...  Whether to convert the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to convert the blue colour curve, defaults to `g` if `...`
         '''
-        # Handle overloading
-        if g is ...:  g = r
-        if b is ...:  b = g
-        # Convert colour space
-        if not r and not g and not b:
+        f = lambda c : linear_to_standard(c)[0]
+        v = lambda c : numpy.where(c <= 0.0031308, 12.92 * c, (1 + 0.055) * c ** (1 / 2.4) - 0.055)
+        self.__transfer(r, g, b, 'standardise', f, v)
+    
+    
+    def __transfer(self, r, g, b, function, f, v):
+        '''
+        Apply a transfer function on the colour curves
+        
+        @param  r:bool                The red colour curve should be converted
+        @param  g:bool|...            The green colour curve should be converted, defaults to `r` if `...`
+        @param  b:bool|...            The blue colour curve should be converted, defaults to `g` if `...`
+        @param  function:str          The name of the transfer function, see `transfer_table`
+        @param  f:(float)→float       The transfer function, on values in [0, 1]
+        @param  v:(ndarray)→ndarray   Vectorised version of `f`
+        '''
+        (r, g, b) = self.__tabulate(r, g, b, False, lambda on : (function, None) if on else None)
+        stages = lambda on : [('affine', 1 / self.maximum, 0), ('function', f, v), ('affine', self.maximum, 0)]
+        if self.__lazy(r, g, b, lambda on : stages(on) if on else []):
             return
-        for i in range(i_size):
-            (r_, g_, b_) = linear_to_standard(self.red[i] / self.maximum,
-                                              self.green[i] / self.maximum,
-                                              self.blue[i] / self.maximum)
-            if r:  self.red[i]   = r_ * self.maximum
-            if g:  self.green[i] = g_ * self.maximum
-            if b:  self.blue[i]  = b_ * self.maximum
+        for curve in self.__bool(r, g, b):
+            if self.ndarray:
+                with numpy.errstate(invalid = 'ignore'):
+                    curve[:] = v(curve / self.maximum) * self.maximum
+            else:
+                curve[:] = [f(y / self.maximum) * self.maximum for y in curve]
     
     
     def gamma(self, r, g = ..., b = ...):
@@ -1022,9 +1539,16 @@ class Ramps:
         @param  g:float|...?  The gamma parameter for the green colour curve, defaults to `r` if `...`
         @param  b:float|...?  The gamma parameter for the blue colour curve, defaults to `g` if `...`
         '''
-        for (curve, level) in self.__value(r, g, b):
+        (r, g, b) = self.__tabulate(r, g, b, None, lambda level : None if level == 1.0 else ('power', 1 / level))
+        stages = lambda level : [('affine', 1 / self.maximum, 0), ('power', 1 / level), ('affine', self.maximum, 0)]
+        if self.__lazy(r, g, b, lambda level : [] if level == 1.0 else stages(level)):
+            return
+        for (curve, level) in self.__datum(r, g, b):
             if not level == 1.0:
-                curve[:] = [(y / self.maximum) ** (1 / level) * self.maximum for y in curve]
+                if self.ndarray:
+                    curve[:] = (curve / self.maximum) ** (1 / level) * self.maximum
+                else:
+                    curve[:] = [(y / self.maximum) ** (1 / level) * self.maximum for y in curve]
     
     
     def negative(self, r = True, g = ..., b = ...):
@@ -1035,8 +1559,9 @@ class Ramps:
         @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
         '''
+        self.evaluate()
         for curve in self.__bool(r, g, b):
-            curve[:] = reversed(curve)
+            curve[:] = curve[::-1].copy() if self.ndarray else reversed(curve)
     
     
     def rgb_invert(self, r = True, g = ..., b = ...):
@@ -1047,8 +1572,13 @@ class Ramps:
         @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
         '''
+        if self.__lazy(r, g, b, lambda invert : [('affine', -1, self.maximum)] if invert else []):
+            return
         for curve in self.__bool(r, g, b):
-            curve[:] = [self.maximum - y for y in curve]
+            if self.ndarray:
+                numpy.subtract(self.maximum, curve, out = curve)
+            else:
+                curve[:] = [self.maximum - y for y in curve]
     
     
     def cie_invert(self, r = True, g = ..., b = ...):
@@ -1059,22 +1589,13 @@ class Ramps:
         @param  g:bool|...  Whether to invert the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to invert the blue colour curve, defaults to `g` if `...`
         '''
+        self.evaluate()
         # Handle overloading
         if g is ...:  g = r
         if b is ...:  b = g
         # Manipulate the colour curves if any curve should be manipulated
-        if r or g or b:
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                           self.green[i] / self.maximum,
-                                           self.blue[i]  / self.maximum)
-                # Invert illumination and convert to back sRGB
-                (r_, g_, b_) = ciexyy_to_srgb(x, y, 1 - Y)
-                # Apply the new values on the selected channels
-                if r:  self.red[i]   = r_ * self.maximum
-                if g:  self.green[i] = g_ * self.maximum
-                if b:  self.blue[i]  = b_ * self.maximum
+        invert = lambda Y : 1 - Y
+        self.__cie(*[invert if c else None for c in (r, g, b)])
     
     
     def sigmoid(self, r, g = ..., b = ...):
@@ -1091,15 +1612,28 @@ class Ramps:
         @param  g:float|...?  The sigmoid parameter for the green colour curve, defaults to `r` if `...`
         @param  b:float|...?  The sigmoid parameter for the blue colour curve, defaults to `g` if `...`
         '''
-        for (curve, level) in self.__value(r, g, b):
-            for i in range(i_size):
+        (r, g, b) = self.__tabulate(r, g, b, None, lambda level : ('sigmoid', level))
+        m = self.maximum
+        def stages(level):
+            def f(y):
                 try:
-                    curve[i] = (0.5 - math.log(self.maximum / curve[i] - 1) / level) * self.maximum
+                    return (0.5 - math.log(m / y - 1) / level) * m
                 except:
                     # Corner cases:
-                    #   curve[i] = 0 → 0                       -- Division by zero
-                    #   curve[i] = self.maximum → self.maximum -- Logarithm of zero
-                    pass
+                    #   y = 0 → 0                       -- Division by zero
+                    #   y = self.maximum → self.maximum -- Logarithm of zero
+                    return y
+            def v(curve):
+                with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+                    c = (0.5 - numpy.log(m / curve - 1) / level) * m
+                # Corner cases are left unchanged, as in the list implementation
+                return numpy.where(numpy.isfinite(c), c, curve)
+            return [('function', f, v)]
+        if self.__lazy(r, g, b, stages):
+            return
+        for (curve, level) in self.__datum(r, g, b):
+            (_, f, v) = stages(level)[0]
+            curve[:] = v(curve) if self.ndarray else [f(y) for y in curve]
     
     
     def rgb_limits(self, r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
@@ -1118,11 +1652,19 @@ class Ramps:
         if g_max is ...:  g_max = r_max
         if b_min is ...:  b_min = g_min
         if b_max is ...:  b_max = g_max
+        # Record the adjustments if the ramps are lazy
+        stages = lambda lim : [] if (lim[0] == 0) and (lim[1] == self.maximum) else [('affine', lim[1] - lim[0], lim[0])]
+        if self.__lazy((r_min, r_max), (g_min, g_max), (b_min, b_max), stages):
+            return
         # Manipulate the colour curves
-        for (curve, (level_min, level_max)) in self.__values((r_min, r_max), (g_min, g_max), (b_min, b_max)):
+        for (curve, (level_min, level_max)) in self.__datum((r_min, r_max), (g_min, g_max), (b_min, b_max)):
             # But not if the adjustments are neutral
             if (level_min != 0) or (level_max != self.maximum):
-                curve[:] = [y * (level_max - level_min) + level_min for y in curve]
+                if self.ndarray:
+                    curve *= level_max - level_min
+                    curve += level_min
+                else:
+                    curve[:] = [y * (level_max - level_min) + level_min for y in curve]
     
     
     def cie_limits(self, r_min, r_max, g_min = ..., g_max = ..., b_min = ..., b_max = ...):
@@ -1136,6 +1678,7 @@ class Ramps:
         @param  b_min:float|...  The blue component value of the black point, defaults to `g_min`
         @param  b_max:float|...  The blue component value of the white point, defaults to `g_max`
         '''
+        self.evaluate()
         # Handle overloading
         if g_min is ...:  g_min = r_min
         if g_max is ...:  g_max = r_max
@@ -1145,31 +1688,12 @@ class Ramps:
         same = (r_min == g_min == b_min) and (r_max == g_max == b_max)
         # Check we need to do any adjustment
         if (not same) or (not r_min == 0) or (not r_max == self.maximum):
-            if same:
-                # Manipulate all curves in one step if their adjustments are identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    # Manipulate illumination
-                    Y = Y * (r_max - r_min) + r_min
-                    # Convert back to sRGB
-                    (r_, g_, b_) = ciexyy_to_srgb(x, y, Y)
-                    self.red[i]   = r_ * self.maximum
-                    self.green[i] = g_ * self.maximum
-                    self.blue[i]  = b_ * self.maximum
-            else:
-                # Manipulate all curves individually if their adjustments are not identical
-                for i in range(i_size):
-                    # Convert to CIE xyY
-                    (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                               self.green[i] / self.maximum,
-                                               self.blue[i]  / self.maximum)
-                    # Manipulate illumination and convert back to sRGB
-                    self.red[i]   = ciexyy_to_srgb(x, y, Y * (r_max - r_min) + r_min)[0] * self.maximum
-                    self.green[i] = ciexyy_to_srgb(x, y, Y * (g_max - g_min) + g_min)[1] * self.maximum
-                    self.blue[i]  = ciexyy_to_srgb(x, y, Y * (b_max - b_min) + b_min)[2] * self.maximum
+            # Share the adjustment between the curves if their adjustments are identical
+            limits = {}
+            for lim in ((r_min, r_max), (g_min, g_max), (b_min, b_max)):
+                if lim not in limits:
+                    limits[lim] = lambda Y, lim = lim : Y * (lim[1] - lim[0]) + lim[0]
+            self.__cie(*[limits[lim] for lim in ((r_min, r_max), (g_min, g_max), (b_min, b_max))])
     
     
     def manipulate(self, r, g = ..., b = ...):
@@ -1186,8 +1710,10 @@ class Ramps:
         For example, if the red value 0.5 is already mapped to 0.25, then if the function
         maps 0.25 to 0.5, the red value 0.5 will revert back to being mapped to 0.5.
         '''
-        for (curve, f) in self.__values(r, g, b):
-            curve[:] = [f(y) for y in curve]
+        if self.__lazy(r, g, b, lambda f : [('function', f, None)]):
+            return
+        for (curve, f) in self.__datum(r, g, b):
+            curve[:] = [f(y) for y in (curve.tolist() if self.ndarray else curve)]
     
     
     def cie_manipulate(self, r, g = ..., b = ...):
@@ -1204,37 +1730,102 @@ class Ramps:
         For example, if the value 0.5 is already mapped to 0.25, then if the function
         maps 0.25 to 0.5, the value 0.5 will revert back to being mapped to 0.5.
         '''
+        self.evaluate()
         # Handle overloading
         if g is ...:  g = r
         if b is ...:  b = g
-        # Check if we can reduce the overhead, we can if the adjustments are identical
-        same = (r is g) and (g is b)
-        if same:
-            if r is None:
-                return
-            # Manipulate all curves in one step if their adjustments are identical
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                           self.green[i] / self.maximum,
-                                           self.blue[i]  / self.maximum)
-                # Manipulate and convert by to sRGB
-                (r_, g_, b_) = ciexyy_to_srgb(x, y, r(Y))
-                self.red[i]   = r_ * self.maximum
-                self.green[i] = g_ * self.maximum
-                self.blue[i]  = b_ * self.maximum
-        elif any(f is not None for f in (r, g, b)):
-            # Manipulate all curves individually if their adjustments are not identical
-            # if we are given a function for any curve
-            for i in range(i_size):
-                # Convert to CIE xyY
-                (x, y, Y) = srgb_to_ciexyy(self.red[i]   / self.maximum,
-                                           self.green[i] / self.maximum,
-                                           self.blue[i]  / self.maximum)
-                # Manipulate and convert by to sRGB for selected channels individually
-                if r is not None:  self.red[i]   = ciexyy_to_srgb(x, y, r(Y))[0] * self.maximum
-                if g is not None:  self.green[i] = ciexyy_to_srgb(x, y, g(Y))[1] * self.maximum
-                if b is not None:  self.blue[i]  = ciexyy_to_srgb(x, y, b(Y))[2] * self.maximum
+        # Manipulate the curves, the functions are only evaluated once per
+        # stop for each distinct function, so identical adjustments are cheap
+        self.__cie(r, g, b, elementwise = True)
+    
+    
+    def __ciexyy(self):
+        '''
+        Convert the colour curves to CIE xyY, in a form where converting back is cheap
+        
+        Converting from CIE xyY to linear RGB is a linear transformation of the
+        chromaticity that is scaled by the illumination, Y. Therefore the
+        chromaticity of each stop is transformed once, when converting to CIE xyY,
+        and converting back to sRGB only requires a multiplication with the new
+        illumination and the sRGB transfer function, for the channel that is needed
+        
+        @return  :(Y:list<float>|ndarray, chroma:(red:list<float>|ndarray,
+                   green:list<float>|ndarray, blue:list<float>|ndarray))
+                   The illumination of each stop, and for each channel, the linear
+                   RGB value of each stop's chromaticity at unit illumination
+        '''
+        m = self.maximum
+        # The chromaticity of black, and of stops without any defined chromaticity
+        (x, y) = (0.312857, 0.328993)
+        black = ciexyz_to_linear(x / y, 1, (1 - x - y) / y)
+        degenerate = ciexyz_to_linear(1, 1, 1)
+        if self.ndarray:
+            rgb = numpy.array([self.red, self.green, self.blue]) / m
+            with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+                linear = numpy.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / (1 + 0.055)) ** 2.4)
+                xyz = numpy.array(linear_to_ciexyz_matrix) @ linear
+                chroma = numpy.array(ciexyz_to_linear_matrix) @ (xyz / xyz[1])
+            (Y, s) = (xyz[1], xyz.sum(axis = 0))
+            is_black = (rgb == 0).all(axis = 0)
+            is_degenerate = ~is_black & ((s == 0) | (Y == 0))
+            chroma[:, is_black] = numpy.array(black)[:, None]
+            chroma[:, is_degenerate] = numpy.array(degenerate)[:, None]
+            return (numpy.where(s == 0, 0, Y), tuple(chroma))
+        (Y, chroma) = ([], ([], [], []))
+        for stop in zip(self.red, self.green, self.blue):
+            stop = [c / m for c in stop]
+            xyz = linear_to_ciexyz(*standard_to_linear(*stop))
+            s = sum(xyz)
+            if stop[0] == stop[1] == stop[2] == 0:
+                (y, c) = (0, black)
+            elif (s == 0) or (xyz[1] == 0):
+                (y, c) = (0, degenerate)
+            else:
+                (y, c) = (xyz[1], ciexyz_to_linear(*[v / xyz[1] for v in xyz]))
+            Y.append(y)
+            for channel, value in zip(chroma, c):
+                channel.append(value)
+        return (Y, chroma)
+    
+    
+    def __cie(self, r, g, b, elementwise = False):
+        '''
+        Manipulate the illumination of the colour curves using CIE xyY
+        
+        @param  r:(float)?→float  Function that maps the illumination of a stop to the new
+                                  illumination for the red curve, `None` to leave it as is
+        @param  g:(float)?→float  Function that maps the illumination of a stop to the new
+                                  illumination for the green curve, `None` to leave it as is
+        @param  b:(float)?→float  Function that maps the illumination of a stop to the new
+                                  illumination for the blue curve, `None` to leave it as is
+        @param  elementwise:bool  Whether the functions must be invoked once per stop, rather
+                                  than once with the illumination of all stops in a NumPy
+                                  array, when the ramps are stored in NumPy arrays
+        '''
+        if (r is None) and (g is None) and (b is None):
+            return
+        (Y, chroma) = self.__ciexyy()
+        # Each distinct function is only evaluated once
+        illumination = {}
+        for curve, f, c in zip((self.red, self.green, self.blue), (r, g, b), chroma):
+            if f is None:
+                continue
+            if f not in illumination:
+                if self.ndarray and not elementwise:
+                    illumination[f] = f(Y)
+                elif self.ndarray:
+                    illumination[f] = numpy.array([f(y) for y in Y.tolist()])
+                else:
+                    illumination[f] = [f(y) for y in Y]
+            Y_ = illumination[f]
+            # Convert back to sRGB, but only the channel that is needed
+            if self.ndarray:
+                linear = Y_ * c
+                with numpy.errstate(invalid = 'ignore'):
+                    curve[:] = numpy.where(linear <= 0.0031308, 12.92 * linear,
+                                           (1 + 0.055) * linear ** (1 / 2.4) - 0.055) * self.maximum
+            else:
+                curve[:] = [linear_to_standard(y * c_)[0] * self.maximum for y, c_ in zip(Y_, c)]
     
     
     def lower_resolution(self, rx_colours = None, ry_colours = None, gx_colours = ..., gy_colours = ..., bx_colours = ..., by_colours = ...):
@@ -1248,39 +1839,50 @@ class Ramps:
         @param  bx_colours:int|...?  The number of colours to emulate on the blue encoding axis, `gx_colours` if `...`
         @param  by_colours:int|...?  The number of colours to emulate on the blue output axis, `gy_colours` if `...`
         
-        Where `None` is used the default value will be used, for *x_colours:es that is `i_size`,
-        and for *y_colours:es that is `o_size`
+        Where `None` is used the default value will be used, for *x_colours:es that is the
+        number of stops in the ramp, and for *y_colours:es that is no emulation at all
         '''
+        self.evaluate()
         # Handle overloading
         if gx_colours is ...:  gx_colours = rx_colours
         if gy_colours is ...:  gy_colours = ry_colours
         if bx_colours is ...:  bx_colours = gx_colours
         if by_colours is ...:  by_colours = gy_colours
-        # Select default values where default is requested
-        if rx_colours is None:  rx_colours = i_size
-        if ry_colours is None:  ry_colours = o_size
-        if gx_colours is None:  gx_colours = i_size
-        if gy_colours is None:  gy_colours = o_size
-        if bx_colours is None:  bx_colours = i_size
-        if by_colours is None:  by_colours = o_size
         # Combine pair X and Y parameters for each channel
         r_colours = (rx_colours, ry_colours)
         g_colours = (gx_colours, gy_colours)
         b_colours = (bx_colours, by_colours)
         # Manipulate colour curves
-        for i_curve, (x_colours, y_colours) in self.__values(r_colours, g_colours, b_colours):
+        for i_curve, (x_colours, y_colours) in self.__datum(r_colours, g_colours, b_colours):
+            i_size = len(i_curve)
+            # Select default values where default is requested
+            if x_colours is None:  x_colours = i_size
             # But not if adjustment is neutral
-            if (x_colours == i_size) and (y_colours == o_size):
+            if (x_colours == i_size) and (y_colours is None):
+                continue
+            x_, i_ = x_colours - 1, i_size - 1
+            if self.ndarray:
+                # Scale encoding
+                x = numpy.arange(i_size) * x_colours // i_size
+                x = x * i_ // x_
+                o_curve = i_curve[x]
+                # Scale output
+                if y_colours is not None:
+                    y_ = y_colours - 1
+                    o_curve = numpy.floor(o_curve / self.maximum * y_ + 0.5) / y_ * self.maximum
+                i_curve[:] = o_curve
                 continue
             o_curve = [0] * i_size
-            x_, y_, i_ = x_colours - 1, y_colours - 1, i_size - 1
             for i in range(i_size):
                 # Scale encoding
                 x = int(i * x_colours / i_size)
                 x = int(x * i_ / x_)
+                y = i_curve[x]
                 # Scale output
-                y = int(i_curve[x] / self.maximum * y_ + 0.5)
-                o_curve[i] = y / y_ * self.maximum
+                if y_colours is not None:
+                    y = int(y / self.maximum * (y_colours - 1) + 0.5)
+                    y = y / (y_colours - 1) * self.maximum
+                o_curve[i] = y
             i_curve[:] = o_curve
     
     
@@ -1292,14 +1894,13 @@ class Ramps:
         @param  g:bool|...  Whether to reset the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to reset the blue colour curve, defaults to `g` if `...`
         '''
-        if self.depth > 0:
-            def make_ramp(size):
-                return [int(x * self.maximum / (size - 1) + 0.5) for x in range(size)]
-        else:
-            def make_ramp(size):
-                return [x / (size - 1) for x in range(size)]
+        # Pending adjustments on reset curves will not have any effect
+        if self.pipeline is not None:
+            for channel, reset in enumerate((r, r if g is ... else g, (r if g is ... else g) if b is ... else b)):
+                if reset:
+                    self.pipeline.discard(channel)
         for curve in self.__bool(r, g, b):
-            curve[:] = make_ramp(len(curve))
+            curve[:] = self.__make_ramp(len(curve))
     
     
     def clip_below(self, r = True, g = ..., b = ...):
@@ -1310,8 +1911,13 @@ class Ramps:
         @param  g:bool|...  Whether to clip the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to clip the blue colour curve, defaults to `g` if `...`
         '''
+        if self.__lazy(r, g, b, lambda clip : [('clamp', 0, None)] if clip else []):
+            return
         for curve in self.__bool(r, g, b):
-            curve[:] = [max(0, y) for y in curve]
+            if self.ndarray:
+                numpy.maximum(curve, 0, out = curve)
+            else:
+                curve[:] = [max(0, y) for y in curve]
     
     
     def clip_above(self, r = True, g = ..., b = ...):
@@ -1322,8 +1928,13 @@ class Ramps:
         @param  g:bool|...  Whether to clip the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to clip the blue colour curve, defaults to `g` if `...`
         '''
+        if self.__lazy(r, g, b, lambda clip : [('clamp', None, self.maximum)] if clip else []):
+            return
         for curve in self.__bool(r, g, b):
-            curve[:] = [min(y, self.maximum) for y in curve]
+            if self.ndarray:
+                numpy.minimum(curve, self.maximum, out = curve)
+            else:
+                curve[:] = [min(y, self.maximum) for y in curve]
     
     
     def clip(self, r = True, g = ..., b = ...):
@@ -1334,13 +1945,154 @@ class Ramps:
         @param  g:bool|...  Whether to clip the green colour curve, defaults to `r` if `...`
         @param  b:bool|...  Whether to clip the blue colour curve, defaults to `g` if `...`
         '''
+        if self.__lazy(r, g, b, lambda clip : [('clamp', 0, self.maximum)] if clip else []):
+            return
         for curve in self.__bool(r, g, b):
-            curve[:] = [min(max(0, y), self.maximum) for y in curve]
+            if self.ndarray:
+                numpy.clip(curve, 0, self.maximum, out = curve)
+            else:
+                curve[:] = [min(max(0, y), self.maximum) for y in curve]
+    
+    
+    def pack(self):
+        '''
+        Get the ramps quantised and laid out as C arrays of the gamma depth, so that
+        they can be written to the display server without any per-element conversion
+        
+        Values are rounded to the nearest integer (if the depth is an integer depth)
+        and clipped to [0, `.maximum`]
+        
+        @return  :(red:array|ndarray, green:array|ndarray, blue:array|ndarray)
+                   The ramps as `array.array`:s, or as NumPy arrays if the
+                   ramps are stored in NumPy arrays
+        '''
+        self.evaluate()
+        if self.ndarray:
+            dtype = {8 : numpy.uint8, 16 : numpy.uint16, 32 : numpy.uint32, 64 : numpy.uint64,
+                     -1 : numpy.float32, -2 : numpy.float64}[self.depth]
+            if self.depth < 0:
+                return tuple(curve.astype(dtype) for curve in (self.red, self.green, self.blue))
+            # The largest double below 2⁶⁴, 2⁶⁴ - 1 cannot be represented
+            top = float(self.maximum) if self.depth < 64 else math.ldexp(1 - 2 ** -53, 64)
+            return tuple(numpy.clip(numpy.floor(curve + 0.5), 0, top).astype(dtype)
+                         for curve in (self.red, self.green, self.blue))
+        typecode = {8 : 'B', 16 : 'H', 32 : 'I' if array.array('I').itemsize == 4 else 'L',
+                    64 : 'Q', -1 : 'f', -2 : 'd'}[self.depth]
+        if self.depth < 0:
+            return tuple(array.array(typecode, curve) for curve in (self.red, self.green, self.blue))
+        m = self.maximum
+        return tuple(array.array(typecode, [min(max(0, int(y + 0.5)), m) for y in curve])
+                     for curve in (self.red, self.green, self.blue))
+    
+    
+    def fingerprint(self):
+        '''
+        Get a fingerprint of the ramps as they would be applied,
+        that is, of the ramps returned by `pack`
+        
+        @return  :bytes  The fingerprint, see `ramps_fingerprint`
+        '''
+        return ramps_fingerprint(self.depth, self.pack())
+
+
+class Plan:
+    '''
+    An adjustment chain compiled into a memoised plan
+    
+    The ramps that the chain produces are kept in a bounded least-recently-used
+    cache keyed by the format of the CRTC's gamma ramps and the quantised
+    parameters, so evaluating the plan again with parameters that have been
+    used recently only costs a dictionary lookup
+    
+    @variable  adjust:(Ramps, *?)→void                  The adjustment chain, it is applied to identity
+                                                        ramps together with the plan's parameters
+    @variable  quantum:float?                           The step with which float parameters are
+                                                        quantised, `None` to use them as is
+    @variable  capacity:int                             The maximum number of cached ramps
+    @variable  cache:OrderedDict<tuple, Ramps>          The cached ramps, in order of last use
+    @variable  hits:int                                 The number of evaluations served from the cache
+    @variable  misses:int                               The number of evaluations that were computed
+    '''
+    def __init__(self, adjust, quantum = 1 / 1024, capacity = 64):
+        '''
+        Constructor
+        
+        @param  adjust:(Ramps, *?)→void  The adjustment chain, for example
+                                         `lambda ramps, dayness : ramps.gamma(1 + dayness / 4)`
+        @param  quantum:float?           The step with which float parameters are quantised, `None`
+                                         to use them as is. The chain is applied to the quantised
+                                         values so that the cached ramps only depend on the key
+        @param  capacity:int             The maximum number of cached ramps
+        '''
+        self.adjust = adjust
+        self.quantum = quantum
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    
+    def quantise(self, parameters):
+        '''
+        Quantise parameters
+        
+        @param   parameters:tuple<?>  The parameters, floats are quantised, all other values
+                                      are used as is and must be hashable
+        @return  :tuple<?>            The quantised parameters, floats are replaced with
+                                      their number of quanta
+        '''
+        if self.quantum is None:
+            return parameters
+        q = lambda p : int(math.floor(p / self.quantum + 0.5)) if isinstance(p, float) and math.isfinite(p) else p
+        return tuple(q(p) for p in parameters)
+    
+    
+    def __call__(self, crtc, *parameters):
+        '''
+        Evaluate the plan
+        
+        @param   crtc:CRTC         The CRTC whose gamma ramp format the ramps shall have
+        @param   parameters:*?     The parameters of the adjustment chain
+        @return  :Ramps            The ramps, they are shared with the cache and must not be
+                                   modified, use `Ramps.copy` if you need to modify them
+        '''
+        quanta = self.quantise(parameters)
+        key = (crtc.gamma_depth, crtc.red_gamma_size, crtc.green_gamma_size,
+               crtc.blue_gamma_size, use_numpy) + quanta
+        ramps = self.cache.get(key, None)
+        if ramps is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return ramps
+        self.misses += 1
+        # Apply the chain to the quantised parameters, fused where possible
+        if self.quantum is not None:
+            parameters = tuple(q * self.quantum if isinstance(p, float) and math.isfinite(p) else p
+                               for p, q in zip(parameters, quanta))
+        ramps = Ramps(crtc, lazy = True)
+        self.adjust(ramps, *parameters)
+        ramps.evaluate()
+        ramps.pipeline = None
+        self.cache[key] = ramps
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last = False)
+        return ramps
+    
+    
+    def clear(self):
+        '''
+        Discard all cached ramps, this is required if `adjust` depends on
+        anything other than its parameters and that has been changed
+        '''
+        self.cache.clear()
 
 
 class LibgammaCRTC(CRTC):
     '''
     A CRTC using the libgamma backend
+    
+    Information about the CRTC is retrieved from the display server when it is first
+    used, one group of related information at a time, see `LibgammaCRTC.information_groups`
     '''
     def __init__(self, screen, crtc):
         '''
@@ -1355,11 +2107,125 @@ class LibgammaCRTC(CRTC):
         CRTC.__init__(self)
         self.crtc = libgamma.CRTC(screen.screen, crtc)
         self.screen = screen
+        self.index = crtc
+        self.__fetched = set()
+        # The ways of writing ramps that failed, by type of libgamma ramp
+        self.__handoff_failures = set()
         if screen.display.caps.crtc_restore:
-            self.restore = self.crtc.restore
+            self.restore = self.__restore
         else:
             self.restore = None
-        info = self.crtc.information(~0)[0]
+        # Information about the CRTC is retrieved when it is first used
+        for name in LibgammaCRTC.information_groups:
+            delattr(self, name)
+    
+    
+    def __getattr__(self, name):
+        '''
+        Retrieve information about the CRTC when it is first used
+        
+        Only the group of information that the requested attribute belongs
+        to is retrieved, see `LibgammaCRTC.information_groups`, and it is
+        retrieved at most once. Attributes that have been assigned, for
+        example by the user to correct the display server, are kept
+        
+        @param   name:str  The name of the attribute
+        @return  :?         The value of the attribute
+        '''
+        if name not in LibgammaCRTC.information_groups:
+            raise AttributeError(name)
+        group = LibgammaCRTC.information_groups[name]
+        for field, value in self.__information(group).items():
+            if field not in self.__dict__:
+                setattr(self, field, value)
+                self.__fetched.add(field)
+        return self.__dict__[name]
+    
+    
+    def __setattr__(self, name, value):
+        '''
+        Assign an attribute
+        
+        Retrieved information that is assigned, for example by the user to correct
+        the display server, is no longer considered retrieved, so it is kept by `reload`
+        
+        @param  name:str  The name of the attribute
+        @param  value:?   The value of the attribute
+        '''
+        if name in self.__dict__.get('_LibgammaCRTC__fetched', ()):
+            self.__fetched.discard(name)
+        CRTC.__setattr__(self, name, value)
+    
+    
+    def reload(self, partition = None):
+        '''
+        Discard the retrieved information about the CRTC, so that it is retrieved
+        again when it is used, for example because a monitor has been connected
+        
+        Attributes that have been assigned by the user are kept
+        
+        @param  partition:libgamma.Partition?  If not `None`, the partition the screen has been
+                                               reopened with, the CRTC is reopened on it
+        '''
+        if partition is not None:
+            import libgamma
+            self.crtc = libgamma.CRTC(partition, self.index)
+        for field in self.__fetched:
+            if field in self.__dict__:
+                delattr(self, field)
+        self.__fetched.clear()
+        self.fingerprint = None
+    
+    
+    def __information(self, group):
+        '''
+        Retrieve a group of information about the CRTC
+        
+        @param   group:str          The group of information: 'edid', 'viewport',
+                                    'ramps', 'subpixel_order', 'active', or 'connector'
+        @return  :dict<str, ?>      The value of each attribute in the group
+        '''
+        import libgamma
+        flags = {
+            'edid'           : libgamma.LIBGAMMA_CRTC_INFO_EDID,
+            'viewport'       : libgamma.LIBGAMMA_CRTC_INFO_WIDTH_MM | libgamma.LIBGAMMA_CRTC_INFO_HEIGHT_MM,
+            'ramps'          : libgamma.LIBGAMMA_CRTC_INFO_GAMMA_SIZE | libgamma.LIBGAMMA_CRTC_INFO_GAMMA_DEPTH |
+                               libgamma.LIBGAMMA_CRTC_INFO_GAMMA_SUPPORT,
+            'subpixel_order' : libgamma.LIBGAMMA_CRTC_INFO_SUBPIXEL_ORDER,
+            'active'         : libgamma.LIBGAMMA_CRTC_INFO_ACTIVE,
+            'connector'      : libgamma.LIBGAMMA_CRTC_INFO_CONNECTOR_NAME | libgamma.LIBGAMMA_CRTC_INFO_CONNECTOR_TYPE
+        }[group]
+        info = self.crtc.information(flags)[0]
+        if group == 'edid':
+            return {'edid' : None if info.edid_error else libgamma.behex_edid_uppercase(info.edid)}
+        if group == 'viewport':
+            return {'width_mm'  : None if info.width_mm_error  else info.width_mm,
+                    'height_mm' : None if info.height_mm_error else info.height_mm}
+        if group == 'ramps':
+            ret = {'red_gamma_size'   : None if info.gamma_size_error    else info.red_gamma_size,
+                   'green_gamma_size' : None if info.gamma_size_error    else info.green_gamma_size,
+                   'blue_gamma_size'  : None if info.gamma_size_error    else info.blue_gamma_size,
+                   'gamma_depth'      : None if info.gamma_depth_error   else info.gamma_depth,
+                   'gamma_support'    : None if info.gamma_support_error else info.gamma_support,
+                   'ramps'            : None}
+            if not info.gamma_size_error and not info.gamma_depth_error:
+                ret['ramps'] = libgamma.GammaRamps(info.red_gamma_size, info.green_gamma_size,
+                                                   info.blue_gamma_size, depth = info.gamma_depth)
+            return ret
+        if group == 'subpixel_order':
+            subpixel_orders = {
+                libgamma.LIBGAMMA_SUBPIXEL_ORDER_HORIZONTAL_BGR : 'BGR',
+                libgamma.LIBGAMMA_SUBPIXEL_ORDER_HORIZONTAL_RGB : 'RGB',
+                libgamma.LIBGAMMA_SUBPIXEL_ORDER_NONE           : 'None',
+                libgamma.LIBGAMMA_SUBPIXEL_ORDER_VERTICAL_BGR   : 'vBGR',
+                libgamma.LIBGAMMA_SUBPIXEL_ORDER_VERTICAL_RGB   : 'vRGB'
+            }
+            subpixel_order = None if info.subpixel_order_error else info.subpixel_order
+            if subpixel_order in subpixel_orders:
+                subpixel_order = subpixel_orders[subpixel_order]
+            return {'subpixel_order' : subpixel_order}
+        if group == 'active':
+            return {'active' : None if info.active_error else info.active}
         connector_types = {
             libgamma.LIBGAMMA_CONNECTOR_TYPE_9PinDIN     : '9PinDIN',
             libgamma.LIBGAMMA_CONNECTOR_TYPE_Component   : 'Component',
@@ -1381,32 +2247,11 @@ class LibgammaCRTC(CRTC):
             libgamma.LIBGAMMA_CONNECTOR_TYPE_VIRTUAL     : 'VIRTUAL',
             libgamma.LIBGAMMA_CONNECTOR_TYPE_eDP         : 'eDP'
         }
-        subpixel_orders = {
-            libgamma.LIBGAMMA_SUBPIXEL_ORDER_HORIZONTAL_BGR : 'BGR',
-            libgamma.LIBGAMMA_SUBPIXEL_ORDER_HORIZONTAL_RGB : 'RGB',
-            libgamma.LIBGAMMA_SUBPIXEL_ORDER_NONE           : 'None',
-            libgamma.LIBGAMMA_SUBPIXEL_ORDER_VERTICAL_BGR   : 'vBGR',
-            libgamma.LIBGAMMA_SUBPIXEL_ORDER_VERTICAL_RGB   : 'vRGB'
-        }
-        self.edid = None if info.edid_error else libgamma.behex_edid_uppercase(info.edid)
-        self.width_mm = None if info.width_mm_error else info.width_mm
-        self.height_mm = None if info.height_mm_error else info.height_mm
-        self.red_gamma_size = None if info.gamma_size_error else info.red_gamma_size
-        self.green_gamma_size = None if info.gamma_size_error else info.green_gamma_size
-        self.blue_gamma_size = None if info.gamma_size_error else info.blue_gamma_size
-        self.gamma_depth = None if info.gamma_depth_error else info.gamma_depth
-        self.gamma_support = None if info.gamma_support_error else info.gamma_support
-        self.subpixel_order = None if info.subpixel_order_error else info.subpixel_order
-        if self.subpixel_order in subpixel_orders:
-            self.subpixel_order = subpixel_orders[self.subpixel_order]
-        self.active = None if info.active_error else info.active
-        self.connector_name = None if info.connector_name_error else info.connector_name
-        self.connector_type = None if info.connector_type_error else info.connector_type
-        if self.connector_type in connector_types:
-            self.connector_type = connector_types[self.connector_type]
-        if not info.gamma_size_error and not info.gamma_depth_error:
-            self.ramps = libgamma.GammaRamps(self.red_gamma_size, self.green_gamma_size,
-                                             self.blue_gamma_size, depth = self.gamma_depth)
+        connector_type = None if info.connector_type_error else info.connector_type
+        if connector_type in connector_types:
+            connector_type = connector_types[connector_type]
+        return {'connector_name' : None if info.connector_name_error else info.connector_name,
+                'connector_type' : connector_type}
     
     
     @property
@@ -1420,6 +2265,14 @@ class LibgammaCRTC(CRTC):
         return 'libgamma'
     
     
+    def __restore(self):
+        '''
+        Restore the CLUT:s to the (configured) system defaults
+        '''
+        self.crtc.restore()
+        self.fingerprint = None
+    
+    
     def get_gamma(self, low_priority = None, high_priority = None, coalesce = True):
         '''
         Get the gamma ramps on the CRTC or the table of applied adjustments
@@ -1444,13 +2297,18 @@ class LibgammaCRTC(CRTC):
         if low_priority is not None or high_priority is not None or not coalesce:
             raise Exception('Cooperative gamma is not supported')
         self.crtc.get_gamma(self.ramps)
+        ramps = (self.ramps.red, self.ramps.green, self.ramps.blue)
+        self.fingerprint = ramps_fingerprint(self.gamma_depth, ramps)
         return Ramps.copy(self.ramps)
     
     
-    def set_gamma(self, ramps, priority = None, rule = None, lifespan = 1):
+    def set_gamma(self, ramps, priority = None, rule = None, lifespan = 1, force = False):
         '''
         Set the gamma ramps on the CRTC
         
+        The write is skipped if the ramps, as they would be applied, are identical
+        to the last applied ramps
+        
         @param   ramps:Ramps    The gamma ramps
         @param   priority:int?  The priority of the adjustment, `None` for the default.
                                 Must be `None` (default) if cooperative gamma is not supported.
@@ -1461,6 +2319,9 @@ class LibgammaCRTC(CRTC):
                                 Must be `None` (default) if cooperative gamma is not supported.
         @param   lifespan:int   The lifespan of the algorithm: `Lifespan.UNTIL_DEATH`,
                                 `Lifespan.UNTIL_REMOVAL` (default), or `Lifespan.REMOVE`
+        @param   force:bool     Whether to write the ramps even if they are identical to the
+                                last applied ramps, for example if another program may have
+                                changed the ramps
         @return                 The ramps which the adjustments are written to, this will
                                 either be `ramps` or `self.ramps`
         '''
@@ -1468,7 +2329,12 @@ class LibgammaCRTC(CRTC):
         if priority is not None or rule is not None or lifespan != 1:
             raise Exception('Cooperative gamma is not supported')
         if ramps is self.ramps:
+            samples = self.__unchanged((ramps.red, ramps.green, ramps.blue), force)
+            if samples is None:
+                return ramps
+            fingerprint = samples[0]
             self.crtc.set_gamma(ramps)
+            (self.fingerprint, self.samples) = (fingerprint, samples)
             return ramps
         match = ramps.depth == self.gamma_depth
         match = match and len(ramps.red) == self.red_gamma_size
@@ -1478,16 +2344,105 @@ class LibgammaCRTC(CRTC):
             ramps = Ramps.copy(ramps, self.gamma_depth,
                                (self.red_gamma_size, self.green_gamma_size, self.blue_gamma_size))
         if isinstance(ramps, libgamma.GammaRamps):
+            samples = self.__unchanged((ramps.red, ramps.green, ramps.blue), force)
+            if samples is None:
+                return ramps
+            fingerprint = samples[0]
             self.crtc.set_gamma(ramps)
-            return
-        for i in range(len(ramps.red)):
-            self.ramps.red[i] = ramps.red[i]
-        for i in range(len(ramps.green)):
-            self.ramps.green[i] = ramps.green[i]
-        for i in range(len(ramps.blue)):
-            self.ramps.blue[i] = ramps.blue[i]
+            (self.fingerprint, self.samples) = (fingerprint, samples)
+            return ramps
+        packed = ramps.pack()
+        samples = self.__unchanged(packed, force)
+        if samples is None:
+            return ramps
+        fingerprint = samples[0]
+        for dest, src in zip((self.ramps.red, self.ramps.green, self.ramps.blue), packed):
+            self.__write_ramp(dest, src)
         self.crtc.set_gamma(self.ramps)
+        (self.fingerprint, self.samples) = (fingerprint, samples)
         return self.ramps
+    
+    
+    def __unchanged(self, packed, force):
+        '''
+        Check whether a write can be skipped because the ramps are identical to the
+        last applied ramps, or differ imperceptibly from them if `change_threshold` is used
+        
+        Nothing is recorded, the caller shall assign the fingerprint to `self.fingerprint`,
+        and the samples to `self.samples`, once the ramps have been applied, so that a
+        failed write is not skipped when retried
+        
+        @param   packed:(red, green, blue)  The ramps as they would be applied
+        @param   force:bool                 Whether the write must not be skipped
+        @return  :(bytes, list<float>, list<float>, list<float>)?|(bytes, None, None, None)?
+                                            The fingerprint of the ramps, and their samples, see
+                                            `ramps_samples`, or `None`:s if `change_threshold` is not
+                                            used, `None` if the write shall be skipped
+        '''
+        global applied_count, skipped_count
+        fingerprint = ramps_fingerprint(self.gamma_depth, packed)
+        if not force and fingerprint == self.fingerprint:
+            self.skipped_writes += 1
+            return None
+        threshold = change_threshold
+        if threshold is None:
+            # The ramps will not be known when the threshold is used again
+            return (fingerprint, None, None, None)
+        samples = (fingerprint,) + ramps_samples(self.gamma_depth, packed)
+        last = self.samples
+        if not force and (last is not None) and (last[1] is not None) and (last[0] == self.fingerprint):
+            distance = max((l1 - l2) ** 2 + (a1 - a2) ** 2 + (b1 - b2) ** 2
+                           for l1, a1, b1, l2, a2, b2 in zip(*samples[1:], *last[1:]))
+            if distance < threshold ** 2:
+                skipped_count += 1
+                return None
+        applied_count += 1
+        return samples
+    
+    
+    def __write_ramp(self, dest, src):
+        '''
+        Write a packed ramp into one of the ramps in `self.ramps`
+        
+        The ramp is copied as one block of memory if libgamma's ramps support the
+        buffer protocol, otherwise by slice assignment if supported, and only as a
+        last resort one element at a time
+        
+        @param  dest:libgamma.Ramp     The ramp to write to
+        @param  src:array|ndarray      The ramp to write, as returned by `Ramps.pack`
+        '''
+        failures = self.__handoff_failures
+        if (type(dest), 'buffer') not in failures:
+            try:
+                memoryview(dest).cast('B')[:] = memoryview(src).cast('B')
+                return
+            except (TypeError, ValueError):
+                failures.add((type(dest), 'buffer'))
+        if (type(dest), 'slice') not in failures:
+            try:
+                dest[:] = src
+                return
+            except (TypeError, ValueError, IndexError):
+                failures.add((type(dest), 'slice'))
+        for i in range(len(src)):
+            dest[i] = src[i]
+
+
+LibgammaCRTC.information_groups = {
+    'edid'             : 'edid',
+    'width_mm'         : 'viewport',
+    'height_mm'        : 'viewport',
+    'red_gamma_size'   : 'ramps',
+    'green_gamma_size' : 'ramps',
+    'blue_gamma_size'  : 'ramps',
+    'gamma_depth'      : 'ramps',
+    'gamma_support'    : 'ramps',
+    'ramps'            : 'ramps',
+    'subpixel_order'   : 'subpixel_order',
+    'active'           : 'active',
+    'connector_name'   : 'connector',
+    'connector_type'   : 'connector'
+}
 
 
 class LibgammaScreen(Screen):
@@ -1507,24 +2462,76 @@ class LibgammaScreen(Screen):
         import libgamma
         self.screen = libgamma.Partition(display.display, screen)
         self.display = display
+        self.index = screen
+        self.crtc_filter = None if crtcs is None else list(crtcs)
         if display.caps.partition_restore:
-            self.restore = self.screen.restore
+            self.restore = self.__restore_partition
         elif display.caps.crtc_restore:
             self.restore = self.__restore_all_crtcs
         else:
             self.restore = None
         self.crtcs = []
-        if crtcs is not None:
-            crtcs = list(crtcs)
         for i in range(self.screen.crtcs_available):
             crtc = LibgammaCRTC(self, i)
-            if (crtcs is None) or (i in crtcs) or (crtc.connector_name in crtcs):
-                self.crtcs.append(crtc)
-            elif isinstance(crtc.edid, str) and (crtc.edid.upper() in crtcs):
+            if self.__included(crtc):
                 self.crtcs.append(crtc)
             else:
                 del crtc
-
+    
+    
+    def __included(self, crtc):
+        '''
+        Check whether a CRTC passes the filter given to the constructor
+        
+        @param   crtc:LibgammaCRTC  The CRTC
+        @return  :bool              Whether the CRTC shall be included
+        '''
+        crtcs = self.crtc_filter
+        if (crtcs is None) or (crtc.index in crtcs) or (crtc.connector_name in crtcs):
+            return True
+        return isinstance(crtc.edid, str) and (crtc.edid.upper() in crtcs)
+    
+    
+    def refresh(self):
+        '''
+        Update the screen after monitors have been connected or disconnected
+        
+        CRTC:s that still exist are kept, but their information is retrieved
+        again when used, and CRTC:s are added and removed as they appear,
+        disappear, or start or stop passing the filter given to the constructor
+        
+        @return  :(added:list<LibgammaCRTC>, removed:list<LibgammaCRTC>)
+                   The CRTC:s that have been added and removed
+        '''
+        import libgamma
+        # Keep the old partition, which the CRTC:s are opened on, unless the
+        # number of CRTC:s has changed, in which case they are all reopened
+        partition = libgamma.Partition(self.display.display, self.index)
+        if partition.crtcs_available == self.screen.crtcs_available:
+            del partition
+            partition = None
+        else:
+            self.screen = partition
+        known = dict((crtc.index, crtc) for crtc in self.crtcs)
+        (added, removed, crtcs) = ([], [], [])
+        for i in range(self.screen.crtcs_available):
+            crtc = known.pop(i, None)
+            new = crtc is None
+            if new:
+                crtc = LibgammaCRTC(self, i)
+            else:
+                crtc.reload(partition)
+            if self.__included(crtc):
+                crtcs.append(crtc)
+                if new:
+                    added.append(crtc)
+            elif not new:
+                removed.append(crtc)
+        removed.extend(known.values())
+        self.crtcs[:] = crtcs
+        self.generation += 1
+        return (added, removed)
+    
     
     @property
     def backend(self):
@@ -1537,6 +2544,15 @@ class LibgammaScreen(Screen):
         return 'libgamma'
     
     
+    def __restore_partition(self):
+        '''
+        Restore the CLUT:s to the (configured) system defaults, for the whole screen
+        '''
+        self.screen.restore()
+        for crtc in self.crtcs:
+            crtc.fingerprint = None
+    
+    
     def __restore_all_crtcs(self):
         '''
         Restore the CLUT:s to the (configured) system defaults, for each CRTC
@@ -1572,7 +2588,7 @@ class LibgammaDisplay(Display):
         self.display = libgamma.Site(method, display)
         self.caps = libgamma.method_capabilities(method)
         if self.caps.site_restore:
-            self.restore = self.display.restore
+            self.restore = self.__restore_site
         elif self.caps.partition_restore or self.caps.crtc_restore:
             self.restore = self.__restore_all_partitions
         else:
@@ -1629,6 +2645,64 @@ class LibgammaDisplay(Display):
         return None
     
     
+    def alive(self):
+        '''
+        Check whether the connection to the display is still usable, it
+        is not, for example, if the X server has been restarted
+        
+        @return  :bool  Whether the connection is alive
+        '''
+        import libgamma
+        try:
+            # Opening a screen requires a round trip to the display server
+            if self.display.partitions_available > 0:
+                libgamma.Partition(self.display, 0)
+            return True
+        except Exception:
+            return False
+    
+    
+    def refresh(self):
+        '''
+        Update the display after monitors have been connected or disconnected,
+        without recreating screens or CRTC:s that still exist
+        
+        @return  :(added:list<LibgammaCRTC>, removed:list<LibgammaCRTC>)
+                   The CRTC:s that have been added and removed
+        '''
+        (added, removed) = ([], [])
+        for screen in self.screens:
+            (screen_added, screen_removed) = screen.refresh()
+            added.extend(screen_added)
+            removed.extend(screen_removed)
+        self.crtcs[:] = [crtc for screen in self.screens for crtc in screen.crtcs]
+        self.generation += 1
+        return (added, removed)
+    
+    
+    def close(self):
+        '''
+        Release the display's connection, screens and CRTC:s, libgamma frees
+        them once they are no longer referenced, the display, its screens
+        and its CRTC:s must not be used afterwards
+        '''
+        for screen in self.screens:
+            for crtc in screen.crtcs:
+                crtc.crtc = None
+            screen.screen = None
+        self.display = None
+    
+    
+    def __restore_site(self):
+        '''
+        Restore the CLUT:s to the (configured) system defaults, for the whole display
+        '''
+        self.display.restore()
+        for screen in self.screens:
+            for crtc in screen.crtcs:
+                crtc.fingerprint = None
+    
+    
     def __restore_all_partitions(self):
         '''
         Restore the CLUT:s to the (configured) system defaults, for each screen
@@ -1637,6 +2711,462 @@ class LibgammaDisplay(Display):
             screen.restore()
 
 
+class DisplayPool:
+    '''
+    A bounded, thread-safe, pool of connections to displays, so that the
+    same display does not have to be connected to over and over again
+    
+    Before a pooled display is reused, it is checked that its connection is
+    still alive, if the last check is too old, and if it is not, for example
+    because the X server has been restarted, the display is reconnected to
+    
+    Displays that are removed from the pool, because they are evicted,
+    invalidated, or dead, are closed, see `LibgammaDisplay.close`
+    
+    @variable  capacity:int                     The maximum number of pooled displays
+    @variable  probe_interval:float             The minimum number of seconds between two
+                                                liveness checks of the same display
+    @variable  displays:OrderedDict<tuple, (Display, float)>
+                                                The pooled displays, and the time they were last
+                                                known to be alive, keyed by the arguments for
+                                                `get_outputs`, in order of last use
+    @variable  lock:RLock                       Lock that protects `displays`, it is not held
+                                                while displays are checked or connected to
+    '''
+    def __init__(self, capacity = 8, probe_interval = 5):
+        '''
+        Constructor
+        
+        @param  capacity:int          The maximum number of pooled displays
+        @param  probe_interval:float  The minimum number of seconds between two liveness
+                                      checks of the same display, 0 to always check
+        '''
+        self.capacity = capacity
+        self.probe_interval = probe_interval
+        self.displays = OrderedDict()
+        self.lock = threading.RLock()
+    
+    
+    def __key(self, method, display, screens, crtcs):
+        '''
+        Create the key of a pooled display
+        
+        @param   method:str?                                 See `get_outputs`
+        @param   display:str?                                See `get_outputs`
+        @param   screens:set<int>?                           See `get_outputs`
+        @param   crtcs:set<int|str>|dict<int,set<int|str>>?  See `get_outputs`
+        @return  :tuple                                      The key
+        '''
+        freeze = lambda elements : None if elements is None else frozenset(elements)
+        if isinstance(crtcs, dict):
+            crtcs = frozenset((screen, freeze(cs)) for screen, cs in crtcs.items())
+        else:
+            crtcs = freeze(crtcs)
+        return (method, display, freeze(screens), crtcs)
+    
+    
+    def get(self, method = None, display = None, screens = None, crtcs = None):
+        '''
+        Get a display, connecting to it unless it is pooled and alive
+        
+        @param   method:str?                                 See `get_outputs`
+        @param   display:str?                                See `get_outputs`
+        @param   screens:set<int>?                           See `get_outputs`
+        @param   crtcs:set<int|str>|dict<int,set<int|str>>?  See `get_outputs`
+        @return  :Display                                    The display
+        '''
+        key = self.__key(method, display, screens, crtcs)
+        with self.lock:
+            entry = self.displays.get(key, None)
+            if entry is not None:
+                self.displays.move_to_end(key)
+        # The display is probed and connected to without holding the lock,
+        # so that a slow or hung display does not stall other users of the pool
+        if entry is not None:
+            (pooled, checked) = entry
+            now = time.monotonic()
+            if now - checked < self.probe_interval:
+                return pooled
+            alive = pooled.alive()
+            with self.lock:
+                current = self.displays.get(key, None) is entry
+                if current and alive:
+                    self.displays[key] = (pooled, now)
+                elif current:
+                    del self.displays[key]
+            if alive:
+                return pooled
+            if current:
+                # Reconnect, the connection has died
+                pooled.close()
+        pooled = get_outputs(method, display, screens, crtcs)
+        evicted = []
+        with self.lock:
+            entry = self.displays.get(key, None)
+            if entry is not None:
+                # Another thread has connected to the display meanwhile
+                self.displays.move_to_end(key)
+                (evicted, pooled) = ([pooled], entry[0])
+            else:
+                self.displays[key] = (pooled, time.monotonic())
+                while len(self.displays) > self.capacity:
+                    evicted.append(self.displays.popitem(last = False)[1][0])
+        for closed in evicted:
+            closed.close()
+        return pooled
+    
+    
+    def invalidate(self, method = None, display = None, screens = None, crtcs = None):
+        '''
+        Remove a display from the pool, so that it is reconnected to the
+        next time it is requested, for example because it has failed
+        
+        @param  method:str?                                 See `get_outputs`
+        @param  display:str?                                See `get_outputs`
+        @param  screens:set<int>?                           See `get_outputs`
+        @param  crtcs:set<int|str>|dict<int,set<int|str>>?  See `get_outputs`
+        '''
+        key = self.__key(method, display, screens, crtcs)
+        with self.lock:
+            entry = self.displays.pop(key, None)
+        if entry is not None:
+            entry[0].close()
+    
+    
+    def clear(self):
+        '''
+        Remove all displays from the pool
+        '''
+        with self.lock:
+            displays = [display for display, _checked in self.displays.values()]
+            self.displays.clear()
+        for display in displays:
+            display.close()
+
+
+class UeventHotplugSource:
+    '''
+    Notifications about connected and disconnected monitors, from the
+    kernel's DRM uevents, which are received over a netlink socket
+    
+    @variable  socket:socket  The netlink socket
+    '''
+    def __init__(self):
+        '''
+        Constructor
+        
+        @throws  OSError  If netlink sockets are not supported, for example
+                          if the operating system is not Linux
+        '''
+        # 15 is NETLINK_KOBJECT_UEVENT, and 1 is the multicast group of kernel uevents
+        self.socket = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, 15)
+        try:
+            self.socket.bind((0, 1))
+            self.socket.setblocking(False)
+        except:
+            self.socket.close()
+            raise
+    
+    
+    def poll(self, timeout = 0):
+        '''
+        Check whether monitors may have been connected or disconnected
+        
+        @param   timeout:float  The number of seconds to wait for a change
+        @return  :bool          Whether a change has been detected
+        '''
+        changed = False
+        while len(select.select([self.socket], [], [], 0 if changed else timeout)[0]) > 0:
+            try:
+                fields = self.socket.recv(1 << 16).split(b'\0')
+            except (BlockingIOError, InterruptedError):
+                break
+            if (b'SUBSYSTEM=drm' in fields) and (b'HOTPLUG=1' in fields):
+                changed = True
+        return changed
+    
+    
+    def close(self):
+        '''
+        Close the socket
+        '''
+        self.socket.close()
+
+
+class SysfsHotplugSource:
+    '''
+    Notifications about connected and disconnected monitors, by polling
+    the status of the connectors in sysfs
+    
+    @variable  path:str                  The directory with the DRM devices' connectors
+    @variable  interval:float            The number of seconds between each poll while waiting
+    @variable  snapshot:dict<str, str>   The status of each connector, as last seen
+    '''
+    def __init__(self, path = '/sys/class/drm', interval = 1):
+        '''
+        Constructor
+        
+        @param  path:str        The directory with the DRM devices' connectors, this can be
+                                changed to a directory with the same layout for testing, where
+                                each connector is a directory with a file named 'status'
+        @param  interval:float  The number of seconds between each poll while waiting
+        '''
+        self.path = path
+        self.interval = interval
+        self.snapshot = self.__status()
+    
+    
+    def __status(self):
+        '''
+        Read the status of each connector
+        
+        @return  :dict<str, str>  The status of each connector, by the connector's name
+        '''
+        status = {}
+        try:
+            connectors = os.listdir(self.path)
+        except OSError:
+            return status
+        for connector in connectors:
+            try:
+                with open(os.path.join(self.path, connector, 'status'), 'rb') as file:
+                    status[connector] = file.read().decode('utf-8', 'replace').strip()
+            except OSError:
+                pass
+        return status
+    
+    
+    def poll(self, timeout = 0):
+        '''
+        Check whether monitors may have been connected or disconnected
+        
+        @param   timeout:float  The number of seconds to wait for a change
+        @return  :bool          Whether a change has been detected
+        '''
+        end = time.monotonic() + timeout
+        while True:
+            status = self.__status()
+            if status != self.snapshot:
+                self.snapshot = status
+                return True
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+    
+    
+    def close(self):
+        '''
+        Stop watching, this does nothing
+        '''
+        pass
+
+
+class FakeHotplugSource:
+    '''
+    Notifications about connected and disconnected monitors, that are
+    triggered manually, for testing
+    
+    @variable  pending:bool  Whether a change has been triggered but not yet reported
+    '''
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.pending = False
+    
+    
+    def trigger(self):
+        '''
+        Report that monitors have been connected or disconnected
+        '''
+        self.pending = True
+    
+    
+    def poll(self, timeout = 0):
+        '''
+        Check whether monitors may have been connected or disconnected
+        
+        @param   timeout:float  Ignored
+        @return  :bool          Whether `trigger` has been called since the last poll
+        '''
+        (changed, self.pending) = (self.pending, False)
+        return changed
+    
+    
+    def close(self):
+        '''
+        Stop watching, this does nothing
+        '''
+        pass
+
+
+class HotplugWatcher:
+    '''
+    Keeps a display up to date when monitors are connected and disconnected
+    
+    Nothing is torn down and rebuilt, the display's screens and CRTC:s are updated
+    in place when a change is detected, and the callbacks are invoked for each
+    CRTC that has been added, removed, or changed; so that, for example, a
+    `MultiCRTC` can be updated with `MultiCRTC.add` and `MultiCRTC.remove`
+    
+    @variable  display:LibgammaDisplay  The display
+    @variable  source:UeventHotplugSource|SysfsHotplugSource|FakeHotplugSource
+                                        The source of notifications about changes
+    @variable  callbacks:list<(event:str, crtc:LibgammaCRTC)→void>
+                                        Functions that are invoked for each change, `event`
+                                        is either 'added', 'removed', or 'changed'
+    @variable  states:dict<LibgammaCRTC, tuple>
+                                        The connection state of each CRTC, as last seen
+    '''
+    def __init__(self, display, source = None, callbacks = None):
+        '''
+        Constructor
+        
+        @param  display:LibgammaDisplay  The display
+        @param  source:UeventHotplugSource|SysfsHotplugSource|FakeHotplugSource?
+                                         The source of notifications about changes, `None` to
+                                         use DRM uevents if supported and sysfs polling otherwise
+        @param  callbacks:itr<(event:str, crtc:LibgammaCRTC)→void>?
+                                         Functions to invoke for each change
+        '''
+        if source is None:
+            try:
+                source = UeventHotplugSource()
+            except OSError:
+                source = SysfsHotplugSource()
+        self.display = display
+        self.source = source
+        self.callbacks = [] if callbacks is None else list(callbacks)
+        self.states = dict((crtc, self.state(crtc)) for crtc in display.crtcs)
+    
+    
+    def state(self, crtc):
+        '''
+        Get the connection state of a CRTC, it changes if
+        its monitor has been connected or replaced
+        
+        Only the information needed for this is retrieved, the EDID is only
+        retrieved if the CRTC is active, and the other information about the
+        CRTC, such as the sizes of its gamma ramps, is retrieved when it is used
+        
+        @param   crtc:LibgammaCRTC  The CRTC
+        @return  :tuple             The connection state
+        '''
+        active = crtc.active
+        return (active, crtc.connector_name, crtc.connector_type, crtc.edid if active else None)
+    
+    
+    def check(self, timeout = 0):
+        '''
+        Update the display if monitors have been connected or disconnected
+        
+        This is cheap unless a change is detected, and is intended to
+        be called from `periodically` in the configuration script
+        
+        @param   timeout:float                       The number of seconds to wait for a change
+        @return  :list<(event:str, LibgammaCRTC)>    The changes, see `refresh`
+        '''
+        if not self.source.poll(timeout):
+            return []
+        return self.refresh()
+    
+    
+    def refresh(self):
+        '''
+        Update the display, and invoke the callbacks for each change
+        
+        @return  :list<(event:str, LibgammaCRTC)>  The changes, `event` is either
+                                                   'added', 'removed', or 'changed'
+        '''
+        (added, removed) = self.display.refresh()
+        events = [('removed', crtc) for crtc in removed]
+        for crtc in removed:
+            self.states.pop(crtc, None)
+        for crtc in self.display.crtcs:
+            state = self.state(crtc)
+            if crtc in added:
+                events.append(('added', crtc))
+            elif self.states.get(crtc, None) != state:
+                events.append(('changed', crtc))
+            self.states[crtc] = state
+        for event, crtc in events:
+            for callback in self.callbacks:
+                callback(event, crtc)
+        return events
+    
+    
+    def close(self):
+        '''
+        Stop watching for changes
+        '''
+        self.source.close()
+
+
+def parse_edid(edid):
+    '''
+    Parse an EDID, reusing the result if the same EDID has already been parsed
+    
+    @param   edid:str  The EDID in hexadecimal representation
+    @return  :EDID     The parsed EDID, it is shared by all users
+                       of the same EDID and must not be modified
+    '''
+    key = edid.upper()
+    parsed = edid_cache.get(key, None)
+    if parsed is None:
+        parsed = edid_cache.setdefault(key, EDID(edid))
+    return parsed
+
+
+def ramps_fingerprint(depth, ramps):
+    '''
+    Calculate a fingerprint of gamma ramps as they would be applied
+    
+    Two fingerprints are equal if, and for all practical purposes only if,
+    the ramps are identical
+    
+    @param   depth:int                 The gamma depth of the ramps
+    @param   ramps:(red, green, blue)  The ramps, as returned by `Ramps.pack`,
+                                       or any other sequences of stops
+    @return  :bytes                    The fingerprint
+    '''
+    typecode = {8 : 'B', 16 : 'H', 32 : 'I' if array.array('I').itemsize == 4 else 'L',
+                64 : 'Q', -1 : 'f', -2 : 'd'}[depth]
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(str(depth).encode('utf-8'))
+    for ramp in ramps:
+        digest.update(len(ramp).to_bytes(8, 'little'))
+        # Hash the memory of the ramp, unless it is not laid out as a C array of the depth
+        try:
+            view = memoryview(ramp)
+            if view.itemsize == array.array(typecode).itemsize and view.c_contiguous:
+                digest.update(view.cast('B'))
+                continue
+        except TypeError:
+            pass
+        digest.update(array.array(typecode, ramp))
+    return digest.digest()
+
+
+def ramps_samples(depth, ramps):
+    '''
+    Sample gamma ramps, as they would be applied, for `change_threshold`
+    
+    @param   depth:int                 The gamma depth of the ramps
+    @param   ramps:(red, green, blue)  The ramps, as returned by `Ramps.pack`,
+                                       or any other sequences of stops
+    @return  :(list<float>, list<float>, list<float>)  The L*, a* and b* components of
+                                                       `change_samples` evenly spaced
+                                                       stops, clipped to [0, 1]
+    '''
+    n = max(change_samples, 2)
+    maximum = 2 ** depth - 1 if depth > 0 else 1
+    def sample(ramp):
+        stops = [int(j * (len(ramp) - 1) / (n - 1) + 0.5) for j in range(n)]
+        return [min(max(0.0, float(ramp[i]) / maximum), 1.0) for i in stops]
+    return tuple(srgb_to_cielab_many(*(sample(ramp) for ramp in ramps)))
+
+
 def get_adjustment_methods(libgamma_level = 0):
     '''
     Returns a list of available adjustment methods
@@ -1706,4 +3236,12 @@ def get_outputs(method = None, display = None, screens = None, crtcs = None):
         #    pass
         #raise Exception("Adjustment method %s is not available" % method)
     else:
-        return LibgammaDisplay(method, display, screen, crtc)
+        return LibgammaDisplay(method, display, screens, crtcs)
+
+
+display_pool = DisplayPool()
+'''
+:DisplayPool  The pool of display connections shared by the deprecated
+              `monitor` module and any other user that wants to reuse
+              connections
+'''